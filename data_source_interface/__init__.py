@@ -13,7 +13,7 @@ from .database_interface import DatabaseInterface
 from .database_interface import MongoDBInterface
 from .elasticsearch_interface import ElasticsearchInterface
 from .postgresql_interface import PostgreSQLInterface
-from .mcp_server import DataSourceMCPServer
+from .mcp_server import DataSourceMCPServer, install_uvloop
 from .mcp_client import DataSourceMCPClient
 
 __version__ = "1.0.0"
@@ -30,5 +30,8 @@ __all__ = [
     "DatabaseInterface", "MongoDBInterface", "ElasticsearchInterface", "PostgreSQLInterface",
     
     # MCP Components
-    "DataSourceMCPServer", "DataSourceMCPClient"
+    "DataSourceMCPServer", "DataSourceMCPClient",
+    
+    # Runtime
+    "install_uvloop"
 ]
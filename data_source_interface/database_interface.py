@@ -3,8 +3,10 @@ Database interface layer with abstract base classes and concrete implementations
 for MongoDB, Elasticsearch, and PostgreSQL.
 """
 
+import asyncio
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, Union
+from itertools import islice
+from typing import AsyncIterator, Iterable, List, Dict, Any, Optional, Union
 import json
 import uuid
 from datetime import datetime
@@ -12,13 +14,46 @@ from datetime import datetime
 from .models import (
     Person, Student, Teacher, Class, ClassEnrollment, 
     TeacherAssignment, Score, BulkOperation, AggregateQuery,
-    PersonResponse, ClassResponse, BulkOperationResponse, AggregateResponse
+    PersonResponse, ClassResponse, BulkOperationResponse, AggregateResponse,
+    utcnow
 )
 
 
+# Keys of get_class_overview's data, one per per-class aggregate
+CLASS_OVERVIEW_KEYS = ("students_per_class", "avg_score_per_class", "teachers_per_class", "subjects_per_class")
+
+
+
+def next_page_cursor(results: List[Dict[str, Any]], query: AggregateQuery, id_key: str = 'id') -> Optional[List[Any]]:
+    """
+    Keyset cursor for the page after results, to pass back as query.after;
+    None when results did not fill a page, so there is nothing after them.
+    """
+    if not query.limit or len(results) < query.limit:
+        return None
+    last = results[-1]
+    last_id = str(last[id_key])
+    return [last[query.sort_by], last_id] if query.sort_by else [last_id]
+
+
+# Sortable timestamp columns; their cursor value comes back as an ISO 8601
+# string once a page's next_after has been through JSON
+_TIMESTAMP_COLUMNS = frozenset(('created_at', 'updated_at', 'enrollment_date', 'date_of_birth'))
+
+
+def cursor_sort_value(sort_by: str, value: Any) -> Any:
+    """The sort_by value of a keyset cursor, as the type the column holds."""
+    if sort_by in _TIMESTAMP_COLUMNS and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    return value
+
+
 class DatabaseInterface(ABC):
     """Abstract base class for database operations."""
     
+    # Whether bulk_operation can roll a failing batch back (on_error="abort")
+    supports_bulk_abort = False
+    
     @abstractmethod
     async def connect(self) -> bool:
         """Connect to the database."""
@@ -29,6 +64,15 @@ class DatabaseInterface(ABC):
         """Disconnect from the database."""
         pass
     
+    @abstractmethod
+    async def ping(self) -> bool:
+        """Run a trivial round trip on one pooled connection."""
+        pass
+    
+    async def warm_up(self, connections: int) -> None:
+        """Open up to `connections` pooled connections by pinging concurrently."""
+        await asyncio.gather(*[self.ping() for _ in range(connections)])
+    
     async def initialize(self) -> bool:
         """Initialize the database connection."""
         return await self.connect()
@@ -37,6 +81,10 @@ class DatabaseInterface(ABC):
         """Cleanup database connections."""
         return await self.disconnect()
     
+    def clear_cache(self) -> None:
+        """Drop cached reads; backends that cache entities override this."""
+        pass
+    
     @abstractmethod
     async def create_person(self, person: Person) -> PersonResponse:
         """Create a new person."""
@@ -77,6 +125,16 @@ class DatabaseInterface(ABC):
         """Get a class by ID."""
         pass
     
+    async def get_students_by_ids(self, student_ids: List[str]) -> Dict[str, Student]:
+        """
+        Fetch several students at once, keyed by id; unknown ids are omitted.
+
+        Backends override this with a single query; the default runs the
+        lookups concurrently.
+        """
+        responses = await asyncio.gather(*(self.get_student(student_id) for student_id in student_ids))
+        return {response.data.id: response.data for response in responses if response.success}
+    
     @abstractmethod
     async def update_person(self, person_id: str, person: Person) -> PersonResponse:
         """Update a person."""
@@ -127,24 +185,163 @@ class DatabaseInterface(ABC):
         """Add a teacher to a class for a specific subject."""
         pass
     
+    async def add_teacher_subjects(self, class_id: str, teacher_id: str, subjects: List[str]) -> BulkOperationResponse:
+        """
+        Assign a teacher to a class for several subjects.
+
+        Backends with a bulk write API override this to write every
+        assignment in one request; the default runs add_teacher_to_class
+        for each subject concurrently.
+        """
+        responses = await asyncio.gather(
+            *[self.add_teacher_to_class(class_id, teacher_id, subject) for subject in subjects]
+        )
+        errors = [error for response in responses if not response.success for error in (response.errors or [])]
+        successful = sum(1 for response in responses if response.success)
+        return BulkOperationResponse(
+            success=successful == len(subjects),
+            message=f"Assigned {successful} of {len(subjects)} subjects",
+            total_processed=len(subjects),
+            successful=successful,
+            failed=len(subjects) - successful,
+            errors=errors or None
+        )
+    
+    async def create_class_with_roster(self, class_obj: Class, student_ids: List[str],
+                                       teacher_id: Optional[str] = None,
+                                       subject: Optional[str] = None) -> ClassResponse:
+        """
+        Create a class, enroll students in it and optionally assign a teacher.
+
+        The default creates the class, then runs the enrollment and the
+        teacher assignment concurrently. Backends that can apply all three
+        atomically override this.
+        """
+        response = await self.create_class(class_obj)
+        if not response.success:
+            return response
+        
+        class_id = response.data.id
+        writes = [self.add_students_to_class(class_id, student_ids)]
+        if teacher_id:
+            writes.append(self.add_teacher_to_class(class_id, teacher_id, subject))
+        results = await asyncio.gather(*writes)
+        errors = [error for result in results if not result.success for error in (result.errors or [])]
+        return ClassResponse(
+            success=not errors,
+            message="Class created with roster" if not errors else "Class created; roster partially applied",
+            data=response.data,
+            errors=errors or None
+        )
+    
     @abstractmethod
-    async def add_scores_to_students(self, scores: List[Score]) -> BulkOperationResponse:
-        """Add scores to students."""
+    async def add_scores_to_students(self, scores: List[Score], batch_size: int = 500) -> BulkOperationResponse:
+        """Add scores to students, submitting at most batch_size scores per round trip."""
         pass
     
+    async def create_students(self, students: List[Student], concurrency: int = 10) -> BulkOperationResponse:
+        """
+        Create many students at once.
+
+        Backends with a bulk write API override this; the default runs
+        create_student concurrently, at most `concurrency` at a time so the
+        connection pool is not exhausted.
+        """
+        semaphore = asyncio.Semaphore(max(1, min(len(students), concurrency)))
+        
+        async def create(student: Student) -> PersonResponse:
+            async with semaphore:
+                return await self.create_student(student)
+        
+        responses = await asyncio.gather(*[create(student) for student in students])
+        errors = [error for response in responses if not response.success for error in (response.errors or [])]
+        successful = sum(1 for response in responses if response.success)
+        return BulkOperationResponse(
+            success=successful == len(students),
+            message=f"Created {successful} of {len(students)} students",
+            total_processed=len(students),
+            successful=successful,
+            failed=len(students) - successful,
+            errors=errors or None
+        )
+    
     @abstractmethod
     async def bulk_operation(self, operation: BulkOperation) -> BulkOperationResponse:
         """Perform bulk operations."""
         pass
     
+    def _unsupported_on_error(self, operation: BulkOperation) -> Optional[BulkOperationResponse]:
+        """
+        Failed response for on_error="abort" on a backend that cannot roll a
+        batch back, or None when the operation can go ahead.
+
+        Such backends write row by row and keep the rows that succeed, which
+        is what "split_retry" asks for, so only "abort" is refused.
+        """
+        if operation.on_error != "abort" or self.supports_bulk_abort:
+            return None
+        error = f"on_error='abort' needs transactional batches, which {type(self).__name__} does not support"
+        return BulkOperationResponse(
+            success=False,
+            message=error,
+            total_processed=len(operation.data),
+            successful=0,
+            failed=len(operation.data),
+            errors=[error]
+        )
+    
+    async def bulk_operation_iter(self, operation_type: str, entity_type: str,
+                                  rows: Iterable[Dict[str, Any]], batch_size: int = 100,
+                                  on_error: Optional[str] = None,
+                                  ignore_missing: bool = False) -> BulkOperationResponse:
+        """
+        Run a bulk operation over any iterable of rows, e.g. a generator.
+
+        Rows are taken batch_size at a time and each batch goes through
+        bulk_operation, so only one batch is held in memory however long
+        the iterable is; the per-batch results are summed into one response.
+        """
+        total = successful = failed = 0
+        errors = []
+        rows = iter(rows)
+        while batch := list(islice(rows, batch_size)):
+            response = await self.bulk_operation(BulkOperation(
+                operation_type=operation_type,
+                entity_type=entity_type,
+                data=batch,
+                batch_size=batch_size,
+                on_error=on_error,
+                ignore_missing=ignore_missing
+            ))
+            errors.extend(f"Batch at row {total}: {error}" for error in response.errors or [])
+            total += response.total_processed
+            successful += response.successful
+            failed += response.failed
+        
+        return BulkOperationResponse(
+            success=failed == 0,
+            message=f"Bulk {operation_type} operation completed",
+            total_processed=total,
+            successful=successful,
+            failed=failed,
+            errors=errors or None
+        )
+    
     @abstractmethod
     async def aggregate_query(self, query: AggregateQuery) -> AggregateResponse:
         """Perform aggregate queries."""
         pass
     
     @abstractmethod
-    async def get_students_per_class(self, class_id: Optional[str] = None) -> AggregateResponse:
-        """Get students per class."""
+    async def get_students_per_class(self, class_id: Optional[str] = None, *,
+                                     count_only: bool = False) -> AggregateResponse:
+        """
+        Get students per class.
+
+        With count_only, each class row carries only the class id and its
+        student_count, with no class_name or student documents, for callers
+        that just need the cardinality.
+        """
         pass
     
     @abstractmethod
@@ -161,14 +358,90 @@ class DatabaseInterface(ABC):
     async def get_subjects_per_class(self, class_id: Optional[str] = None) -> AggregateResponse:
         """Get subjects per class."""
         pass
+    
+    async def get_class_overview(self, class_id: Optional[str] = None) -> AggregateResponse:
+        """
+        Get the students, average score, teachers and subjects per class at once.
+
+        data holds each aggregate's results under "students_per_class",
+        "avg_score_per_class", "teachers_per_class" and "subjects_per_class".
+        Backends that can compute them in one query override this; the
+        default runs the four aggregates concurrently.
+        """
+        responses = await asyncio.gather(
+            self.get_students_per_class(class_id),
+            self.get_avg_score_per_class(class_id),
+            self.get_teachers_per_class(class_id),
+            self.get_subjects_per_class(class_id)
+        )
+        errors = [error for response in responses if not response.success for error in (response.errors or [])]
+        if errors:
+            return AggregateResponse(
+                success=False,
+                message="Failed to get class overview",
+                errors=errors
+            )
+        data = {key: response.data["results"] for key, response in zip(CLASS_OVERVIEW_KEYS, responses)}
+        return AggregateResponse(
+            success=True,
+            message="Class overview retrieved successfully",
+            data=data,
+            count=responses[0].count
+        )
+    
+    async def get_avg_score_per_class_async(self, class_id: Optional[str] = None,
+                                            wait_for_completion_timeout: str = "200ms") -> AggregateResponse:
+        """
+        Start the average-score aggregation without waiting for it to finish.
+
+        data carries search_id and is_running alongside the results; while
+        is_running, pass search_id to poll_async_search. Backends without
+        background searches run get_avg_score_per_class and return its
+        finished results.
+        """
+        response = await self.get_avg_score_per_class(class_id)
+        if not response.success:
+            return response
+        return AggregateResponse(
+            success=True,
+            message=response.message,
+            data={"search_id": None, "is_running": False, "is_partial": False, **response.data},
+            count=response.count
+        )
+    
+    async def poll_async_search(self, search_id: str) -> AggregateResponse:
+        """Fetch the current state of a search started by get_avg_score_per_class_async."""
+        error = f"{type(self).__name__} runs no background searches; unknown search id {search_id}"
+        return AggregateResponse(success=False, message=error, errors=[error])
+    
+    async def iter_per_class_buckets(self, aggregate: str, class_id: Optional[str] = None,
+                                     page_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the rows of a per-class aggregate (one of CLASS_OVERVIEW_KEYS)
+        one at a time.
+
+        Backends that can page through classes override this to keep memory
+        bounded by page_size; the default runs get_<aggregate> and yields its
+        results. Raises RuntimeError if the aggregate fails.
+        """
+        if aggregate not in CLASS_OVERVIEW_KEYS:
+            raise ValueError(f"Unknown per-class aggregate: {aggregate}")
+        response = await getattr(self, f"get_{aggregate}")(class_id)
+        if not response.success:
+            raise RuntimeError(response.message)
+        for row in response.data["results"]:
+            yield row
 
 
 class MongoDBInterface(DatabaseInterface):
     """MongoDB implementation of the database interface."""
     
-    def __init__(self, connection_string: str, database_name: str):
+    def __init__(self, connection_string: str, database_name: str,
+                 min_pool_size: int = 0, max_pool_size: int = 100):
         self.connection_string = connection_string
         self.database_name = database_name
+        self.min_pool_size = min_pool_size
+        self.max_pool_size = max_pool_size
         self.client = None
         self.db = None
     
@@ -176,7 +449,11 @@ class MongoDBInterface(DatabaseInterface):
         """Connect to MongoDB."""
         try:
             from motor.motor_asyncio import AsyncIOMotorClient
-            self.client = AsyncIOMotorClient(self.connection_string)
+            self.client = AsyncIOMotorClient(
+                self.connection_string,
+                minPoolSize=self.min_pool_size,
+                maxPoolSize=self.max_pool_size
+            )
             self.db = self.client[self.database_name]
             # Test connection
             await self.client.admin.command('ping')
@@ -195,17 +472,37 @@ class MongoDBInterface(DatabaseInterface):
             print(f"MongoDB disconnection error: {e}")
             return False
     
+    async def ping(self) -> bool:
+        """Ping MongoDB."""
+        await self.client.admin.command('ping')
+        return True
+    
     def _generate_id(self) -> str:
         """Generate a unique ID."""
         return str(uuid.uuid4())
     
     def _prepare_document(self, obj: Any) -> Dict[str, Any]:
         """Prepare a Pydantic model for MongoDB storage."""
-        doc = obj.dict()
+        doc = obj.model_dump()
+        if not doc.get('id'):
+            doc['id'] = self._generate_id()
+        doc['_id'] = doc['id']
+        doc['updated_at'] = utcnow()
+        return doc
+    
+    def _prepare_score_document(self, score: Score, now: datetime) -> Dict[str, Any]:
+        """
+        Prepare a Score for MongoDB storage.
+
+        Score only holds scalar fields, so copying its __dict__ gives the same
+        document as model_dump() without the serializer walk; score uploads
+        run this once per row.
+        """
+        doc = dict(score.__dict__)
         if not doc.get('id'):
             doc['id'] = self._generate_id()
         doc['_id'] = doc['id']
-        doc['updated_at'] = datetime.utcnow()
+        doc['updated_at'] = now
         return doc
     
     async def create_person(self, person: Person) -> PersonResponse:
@@ -320,6 +617,12 @@ class MongoDBInterface(DatabaseInterface):
                 errors=[str(e)]
             )
     
+    async def get_students_by_ids(self, student_ids: List[str]) -> Dict[str, Student]:
+        """Fetch several students with one $in query, keyed by id; unknown ids are omitted."""
+        cursor = self.db.students.find({"_id": {"$in": list(student_ids)}})
+        students = [Student(**doc) async for doc in cursor]
+        return {student.id: student for student in students}
+    
     async def get_teacher(self, teacher_id: str) -> PersonResponse:
         """Get a teacher by ID from MongoDB."""
         try:
@@ -600,30 +903,133 @@ class MongoDBInterface(DatabaseInterface):
                 errors=[str(e)]
             )
     
-    async def add_scores_to_students(self, scores: List[Score]) -> BulkOperationResponse:
-        """Add scores to students in MongoDB."""
+    @staticmethod
+    def _bulk_write_failure(action: str, total: int, successful: int, error: Exception) -> BulkOperationResponse:
+        """Failed response for an insert_many whose BulkWriteError left successful documents written."""
+        errors = [write_error.get('errmsg', str(write_error)) for write_error in error.details.get('writeErrors', [])]
+        return BulkOperationResponse(
+            success=False,
+            message=f"Failed to {action}: {len(errors)} of {total} documents were rejected",
+            total_processed=total,
+            successful=successful,
+            failed=total - successful,
+            errors=errors or [str(error)]
+        )
+    
+    async def add_teacher_subjects(self, class_id: str, teacher_id: str, subjects: List[str]) -> BulkOperationResponse:
+        """Assign a teacher to a class for several subjects with one unordered insert_many."""
+        from pymongo.errors import BulkWriteError
+        if not subjects:
+            return BulkOperationResponse(
+                success=True,
+                message="No teacher subjects to add",
+                total_processed=0,
+                successful=0,
+                failed=0
+            )
+        try:
+            docs = [
+                self._prepare_document(TeacherAssignment(
+                    id=self._generate_id(),
+                    teacher_id=teacher_id,
+                    class_id=class_id,
+                    subject=subject
+                ))
+                for subject in subjects
+            ]
+            result = await self.db.teacher_assignments.insert_many(docs, ordered=False)
+            return BulkOperationResponse(
+                success=True,
+                message="Teacher subjects added successfully",
+                total_processed=len(subjects),
+                successful=len(result.inserted_ids),
+                failed=0
+            )
+        except BulkWriteError as e:
+            return self._bulk_write_failure("add teacher subjects", len(subjects), e.details.get('nInserted', 0), e)
+        except Exception as e:
+            return BulkOperationResponse(
+                success=False,
+                message=f"Failed to add teacher subjects: {str(e)}",
+                total_processed=len(subjects),
+                successful=0,
+                failed=len(subjects),
+                errors=[str(e)]
+            )
+    
+    async def add_scores_to_students(self, scores: List[Score], batch_size: int = 500) -> BulkOperationResponse:
+        """
+        Add scores to students in MongoDB.
+
+        Chunks are committed as they go, so a failure reports the scores
+        already written as successful.
+        """
+        from pymongo.errors import BulkWriteError
+        successful = 0
         try:
-            score_docs = [self._prepare_document(score) for score in scores]
-            result = await self.db.scores.insert_many(score_docs)
+            now = utcnow()
+            for start in range(0, len(scores), batch_size):
+                score_docs = [self._prepare_score_document(score, now) for score in scores[start:start + batch_size]]
+                result = await self.db.scores.insert_many(score_docs)
+                successful += len(result.inserted_ids)
             return BulkOperationResponse(
                 success=True,
                 message="Scores added successfully",
                 total_processed=len(scores),
-                successful=len(result.inserted_ids),
+                successful=successful,
                 failed=0
             )
+        except BulkWriteError as e:
+            successful += e.details.get('nInserted', 0)
+            return self._bulk_write_failure("add scores", len(scores), successful, e)
         except Exception as e:
             return BulkOperationResponse(
                 success=False,
                 message=f"Failed to add scores: {str(e)}",
                 total_processed=len(scores),
+                successful=successful,
+                failed=len(scores) - successful,
+                errors=[str(e)]
+            )
+    
+    async def create_students(self, students: List[Student], concurrency: int = 10) -> BulkOperationResponse:
+        """Create many students in MongoDB with a single insert_many."""
+        from pymongo.errors import BulkWriteError
+        if not students:
+            return BulkOperationResponse(
+                success=True,
+                message="No students to create",
+                total_processed=0,
+                successful=0,
+                failed=0
+            )
+        try:
+            docs = [self._prepare_document(student) for student in students]
+            result = await self.db.students.insert_many(docs, ordered=False)
+            return BulkOperationResponse(
+                success=True,
+                message="Students created successfully",
+                total_processed=len(students),
+                successful=len(result.inserted_ids),
+                failed=len(students) - len(result.inserted_ids)
+            )
+        except BulkWriteError as e:
+            return self._bulk_write_failure("create students", len(students), e.details.get('nInserted', 0), e)
+        except Exception as e:
+            return BulkOperationResponse(
+                success=False,
+                message=f"Failed to create students: {str(e)}",
+                total_processed=len(students),
                 successful=0,
-                failed=len(scores),
+                failed=len(students),
                 errors=[str(e)]
             )
     
     async def bulk_operation(self, operation: BulkOperation) -> BulkOperationResponse:
         """Perform bulk operations in MongoDB."""
+        rejected = self._unsupported_on_error(operation)
+        if rejected:
+            return rejected
         try:
             collection_name = f"{operation.entity_type}s"
             collection = self.db[collection_name]
@@ -631,6 +1037,8 @@ class MongoDBInterface(DatabaseInterface):
             successful = 0
             failed = 0
             errors = []
+            # One timestamp for the whole operation rather than per row
+            now = utcnow()
             
             if operation.operation_type == "create":
                 for item in operation.data:
@@ -638,8 +1046,7 @@ class MongoDBInterface(DatabaseInterface):
                         if not item.get('id'):
                             item['id'] = self._generate_id()
                         item['_id'] = item['id']
-                        item['created_at'] = datetime.utcnow()
-                        item['updated_at'] = datetime.utcnow()
+                        item['created_at'] = item['updated_at'] = now
                         await collection.insert_one(item)
                         successful += 1
                     except Exception as e:
@@ -651,7 +1058,7 @@ class MongoDBInterface(DatabaseInterface):
                     try:
                         item_id = item.get('id')
                         if item_id:
-                            item['updated_at'] = datetime.utcnow()
+                            item['updated_at'] = now
                             result = await collection.replace_one({"_id": item_id}, item)
                             if result.matched_count:
                                 successful += 1
@@ -671,7 +1078,7 @@ class MongoDBInterface(DatabaseInterface):
                         item_id = item.get('id')
                         if item_id:
                             result = await collection.delete_one({"_id": item_id})
-                            if result.deleted_count:
+                            if result.deleted_count or operation.ignore_missing:
                                 successful += 1
                             else:
                                 failed += 1
@@ -713,16 +1120,34 @@ class MongoDBInterface(DatabaseInterface):
             
             # Add group stage if group_by is provided
             if query.group_by:
+                if query.after:
+                    raise ValueError("Keyset pagination is not supported with group_by")
                 group_stage = {"$group": {"_id": {}}}
                 for field in query.group_by:
                     group_stage["$group"]["_id"][field] = f"${field}"
                 group_stage["$group"]["count"] = {"$sum": 1}
                 pipeline.append(group_stage)
             
+            # Resume after the previous page's last row: rows past its
+            # (sort_by, _id) pair in sort order, _id breaking ties
+            sort_order = 1 if query.sort_order == "asc" else -1
+            if query.after:
+                past = "$gt" if sort_order == 1 else "$lt"
+                if query.sort_by:
+                    last_value, last_id = query.after
+                    last_value = cursor_sort_value(query.sort_by, last_value)
+                    pipeline.append({"$match": {"$or": [
+                        {query.sort_by: {past: last_value}},
+                        {query.sort_by: last_value, "_id": {past: last_id}}
+                    ]}})
+                else:
+                    pipeline.append({"$match": {"_id": {past: query.after[-1]}}})
+            
             # Add sort stage if sort_by is provided
             if query.sort_by:
-                sort_order = 1 if query.sort_order == "asc" else -1
-                pipeline.append({"$sort": {query.sort_by: sort_order}})
+                pipeline.append({"$sort": {query.sort_by: sort_order, "_id": sort_order}})
+            elif query.after:
+                pipeline.append({"$sort": {"_id": sort_order}})
             
             # Add limit stage if limit is provided
             if query.limit:
@@ -737,7 +1162,7 @@ class MongoDBInterface(DatabaseInterface):
             return AggregateResponse(
                 success=True,
                 message="Aggregate query executed successfully",
-                data={"results": results},
+                data={"results": results, "next_after": next_page_cursor(results, query, '_id')},
                 count=len(results)
             )
         except Exception as e:
@@ -747,35 +1172,40 @@ class MongoDBInterface(DatabaseInterface):
                 errors=[str(e)]
             )
     
-    async def get_students_per_class(self, class_id: Optional[str] = None) -> AggregateResponse:
+    async def get_students_per_class(self, class_id: Optional[str] = None, *,
+                                     count_only: bool = False) -> AggregateResponse:
         """Get students per class from MongoDB."""
         try:
-            pipeline = [
-                {
-                    "$lookup": {
-                        "from": "students",
-                        "localField": "student_id",
-                        "foreignField": "_id",
-                        "as": "student"
-                    }
-                },
-                {
-                    "$lookup": {
-                        "from": "classes",
-                        "localField": "class_id",
-                        "foreignField": "_id",
-                        "as": "class"
-                    }
-                },
-                {
-                    "$group": {
-                        "_id": "$class_id",
-                        "class_name": {"$first": {"$arrayElemAt": ["$class.name", 0]}},
-                        "student_count": {"$sum": 1},
-                        "students": {"$push": {"$arrayElemAt": ["$student", 0]}}
+            if count_only:
+                # Counting needs neither lookup; only one small document per class comes back
+                pipeline = [{"$group": {"_id": "$class_id", "student_count": {"$sum": 1}}}]
+            else:
+                pipeline = [
+                    {
+                        "$lookup": {
+                            "from": "students",
+                            "localField": "student_id",
+                            "foreignField": "_id",
+                            "as": "student"
+                        }
+                    },
+                    {
+                        "$lookup": {
+                            "from": "classes",
+                            "localField": "class_id",
+                            "foreignField": "_id",
+                            "as": "class"
+                        }
+                    },
+                    {
+                        "$group": {
+                            "_id": "$class_id",
+                            "class_name": {"$first": {"$arrayElemAt": ["$class.name", 0]}},
+                            "student_count": {"$sum": 1},
+                            "students": {"$push": {"$arrayElemAt": ["$student", 0]}}
+                        }
                     }
-                }
-            ]
+                ]
             
             if class_id:
                 pipeline.insert(0, {"$match": {"class_id": class_id}})
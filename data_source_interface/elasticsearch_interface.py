@@ -4,24 +4,175 @@ Elasticsearch implementation of the database interface.
 
 import json
 import uuid
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Union
 
 from .database_interface import DatabaseInterface
 from .models import (
     Person, Student, Teacher, Class, ClassEnrollment, 
     TeacherAssignment, Score, BulkOperation, AggregateQuery,
-    PersonResponse, ClassResponse, BulkOperationResponse, AggregateResponse
+    PersonResponse, ClassResponse, BulkOperationResponse, AggregateResponse,
+    utcnow
 )
 
 
+# Upper bound on the payload of a single _bulk request (10 MB)
+MAX_BULK_CHUNK_BYTES = 10 * 1024 * 1024
+
+# Static aggregation bodies for the per-class aggregate queries. These are
+# shared across calls and must never be mutated; use _with_class_filter to
+# restrict one to a single class.
+_STUDENTS_PER_CLASS_BODY = {
+    "size": 0,
+    "track_total_hits": False,
+    "aggs": {
+        "classes": {
+            "terms": {
+                "field": "class_id",
+                "size": 100
+            },
+            "aggs": {
+                "student_count": {
+                    "value_count": {
+                        "field": "student_id"
+                    }
+                }
+            }
+        }
+    }
+}
+
+_AVG_SCORE_PER_CLASS_BODY = {
+    "size": 0,
+    "track_total_hits": False,
+    "aggs": {
+        "classes": {
+            "terms": {
+                "field": "class_id",
+                "size": 100
+            },
+            "aggs": {
+                "average_score": {
+                    "avg": {
+                        "field": "score"
+                    }
+                }
+            }
+        }
+    }
+}
+
+_TEACHERS_PER_CLASS_BODY = {
+    "size": 0,
+    "track_total_hits": False,
+    "aggs": {
+        "classes": {
+            "terms": {
+                "field": "class_id",
+                "size": 100
+            },
+            "aggs": {
+                "teacher_count": {
+                    "cardinality": {
+                        "field": "teacher_id"
+                    }
+                }
+            }
+        }
+    }
+}
+
+_TEACHERS_WITH_SUBJECTS_PER_CLASS_BODY = {
+    "size": 0,
+    "track_total_hits": False,
+    "aggs": {
+        "classes": {
+            "terms": {
+                "field": "class_id",
+                "size": 100
+            },
+            "aggs": {
+                "teacher_count": {
+                    "cardinality": {
+                        "field": "teacher_id"
+                    }
+                },
+                "subjects": {
+                    "terms": {
+                        "field": "subject",
+                        "size": 20
+                    }
+                }
+            }
+        }
+    }
+}
+
+_SUBJECTS_PER_CLASS_BODY = {
+    "size": 0,
+    "track_total_hits": False,
+    "aggs": {
+        "classes": {
+            "terms": {
+                "field": "class_id",
+                "size": 100
+            },
+            "aggs": {
+                "subjects": {
+                    "terms": {
+                        "field": "subject",
+                        "size": 20
+                    }
+                }
+            }
+        }
+    }
+}
+
+
+# Per-class aggregations keyed by stored search template id, mapped to the
+# index they run against and the static body the template is rendered from
+_PER_CLASS_TEMPLATES = {
+    "students_per_class": ('class_enrollments', _STUDENTS_PER_CLASS_BODY),
+    "avg_score_per_class": ('scores', _AVG_SCORE_PER_CLASS_BODY),
+    "teachers_per_class": ('teacher_assignments', _TEACHERS_PER_CLASS_BODY),
+    "teachers_with_subjects_per_class": ('teacher_assignments', _TEACHERS_WITH_SUBJECTS_PER_CLASS_BODY),
+    "subjects_per_class": ('teacher_assignments', _SUBJECTS_PER_CLASS_BODY),
+}
+
+
+def _with_class_filter(body: Dict[str, Any], class_id: Optional[str]) -> Dict[str, Any]:
+    """Return body restricted to class_id, without mutating the template."""
+    if not class_id:
+        return body
+    # constant_score skips relevance scoring and lets the term filter be
+    # cached as a bitset shared by concurrent aggregations
+    return {
+        **body,
+        "track_scores": False,
+        "query": {"constant_score": {"filter": {"term": {"class_id": class_id}}}}
+    }
+
+
+def _class_filter_template_source(body: Dict[str, Any]) -> str:
+    """Render a mustache template source that adds the class filter only when class_id is set."""
+    class_filter = json.dumps(_with_class_filter({}, "{{class_id}}"))[1:-1]
+    # The newline keeps the opening brace from being read as a "{{{" tag
+    return "{\n{{#class_id}}" + class_filter + ",{{/class_id}}" + json.dumps(body)[1:]
+
+
 class ElasticsearchInterface(DatabaseInterface):
     """Elasticsearch implementation of the database interface."""
     
-    def __init__(self, hosts: List[str], index_prefix: str = "school"):
+    def __init__(self, hosts: Union[str, List[str]], index_prefix: str = "school",
+                 connections_per_node: int = 64, http_compress: bool = True,
+                 request_timeout: float = 30):
         self.hosts = hosts
         self.index_prefix = index_prefix
+        self.connections_per_node = connections_per_node
+        self.http_compress = http_compress
+        self.request_timeout = request_timeout
         self.client = None
+        self.templates_registered = False
         self.indices = {
             'persons': f"{index_prefix}_persons",
             'students': f"{index_prefix}_students", 
@@ -36,10 +187,18 @@ class ElasticsearchInterface(DatabaseInterface):
         """Connect to Elasticsearch."""
         try:
             from elasticsearch import AsyncElasticsearch
-            self.client = AsyncElasticsearch(hosts=self.hosts)
+            # Keep-alive connections are pooled per node; raise the ceiling so
+            # bursts of concurrent aggregations don't queue client-side
+            self.client = AsyncElasticsearch(
+                hosts=self.hosts,
+                connections_per_node=self.connections_per_node,
+                http_compress=self.http_compress,
+                request_timeout=self.request_timeout
+            )
             # Test connection
             await self.client.ping()
             await self._create_indices()
+            await self._register_search_templates()
             return True
         except Exception as e:
             print(f"Elasticsearch connection error: {e}")
@@ -55,6 +214,10 @@ class ElasticsearchInterface(DatabaseInterface):
             print(f"Elasticsearch disconnection error: {e}")
             return False
     
+    async def ping(self) -> bool:
+        """Ping Elasticsearch."""
+        return await self.client.ping()
+    
     async def _create_indices(self):
         """Create indices with appropriate mappings."""
         mappings = {
@@ -183,16 +346,92 @@ class ElasticsearchInterface(DatabaseInterface):
             except Exception as e:
                 print(f"Error creating index {index_name}: {e}")
     
+    async def _register_search_templates(self):
+        """Store the per-class aggregation bodies as mustache search templates."""
+        try:
+            for template_id, (_, body) in _PER_CLASS_TEMPLATES.items():
+                await self.client.put_script(
+                    id=template_id,
+                    script={"lang": "mustache", "source": _class_filter_template_source(body)}
+                )
+            self.templates_registered = True
+        except Exception as e:
+            # Fall back to sending the full aggregation body on every search
+            print(f"Error registering search templates: {e}")
+            self.templates_registered = False
+    
+    async def _search_per_class(self, template_id: str, class_id: Optional[str]) -> Dict[str, Any]:
+        """Run a per-class aggregation, by stored template id when available."""
+        index_key, body = _PER_CLASS_TEMPLATES[template_id]
+        if self.templates_registered:
+            params = {"class_id": class_id} if class_id else {}
+            return await self.client.search_template(
+                index=self.indices[index_key],
+                id=template_id,
+                params=params
+            )
+        return await self.client.search(
+            index=self.indices[index_key],
+            body=_with_class_filter(body, class_id)
+        )
+    
+    async def iter_per_class_buckets(self, aggregate: str, class_id: Optional[str] = None,
+                                     page_size: int = 1000) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yield the buckets of a per-class aggregation one at a time.
+
+        Pages through a composite aggregation with after_key instead of a
+        single terms aggregation, so memory stays bounded by page_size no
+        matter how many classes exist. Buckets have the same shape as the
+        ones returned by get_*_per_class.
+        """
+        if aggregate not in _PER_CLASS_TEMPLATES:
+            raise ValueError(f"Unknown per-class aggregate: {aggregate}")
+        index_key, body = _PER_CLASS_TEMPLATES[aggregate]
+        terms_agg = body["aggs"]["classes"]
+        composite = {
+            "size": page_size,
+            "sources": [{"class_id": {"terms": {"field": terms_agg["terms"]["field"]}}}]
+        }
+        while True:
+            page_body = _with_class_filter({
+                "size": 0,
+                "track_total_hits": False,
+                "aggs": {"classes": {"composite": composite, "aggs": terms_agg["aggs"]}}
+            }, class_id)
+            result = await self.client.search(index=self.indices[index_key], body=page_body)
+            classes = result['aggregations']['classes']
+            for bucket in classes['buckets']:
+                bucket['key'] = bucket['key']['class_id']
+                yield bucket
+            after_key = classes.get('after_key')
+            if not after_key or len(classes['buckets']) < page_size:
+                break
+            composite = {**composite, "after": after_key}
+    
     def _generate_id(self) -> str:
         """Generate a unique ID."""
         return str(uuid.uuid4())
     
     def _prepare_document(self, obj: Any) -> Dict[str, Any]:
         """Prepare a Pydantic model for Elasticsearch storage."""
-        doc = obj.dict()
+        doc = obj.model_dump()
+        if not doc.get('id'):
+            doc['id'] = self._generate_id()
+        doc['updated_at'] = utcnow().isoformat()
+        return doc
+    
+    def _prepare_score_document(self, score: Score, now: str) -> Dict[str, Any]:
+        """
+        Prepare a Score for Elasticsearch storage.
+
+        Score only holds scalar fields, so copying its __dict__ gives the same
+        document as model_dump() without the serializer walk.
+        """
+        doc = dict(score.__dict__)
         if not doc.get('id'):
             doc['id'] = self._generate_id()
-        doc['updated_at'] = datetime.utcnow().isoformat()
+        doc['updated_at'] = now
         return doc
     
     async def create_person(self, person: Person) -> PersonResponse:
@@ -333,6 +572,12 @@ class ElasticsearchInterface(DatabaseInterface):
                 errors=[str(e)]
             )
     
+    async def get_students_by_ids(self, student_ids: List[str]) -> Dict[str, Student]:
+        """Fetch several students with one mget, keyed by id; unknown ids are omitted."""
+        result = await self.client.mget(index=self.indices['students'], ids=list(student_ids))
+        students = [Student(**doc['_source']) for doc in result['docs'] if doc.get('found')]
+        return {student.id: student for student in students}
+    
     async def get_teacher(self, teacher_id: str) -> PersonResponse:
         """Get a teacher by ID from Elasticsearch."""
         try:
@@ -606,12 +851,50 @@ class ElasticsearchInterface(DatabaseInterface):
                 errors=[str(e)]
             )
     
-    async def add_scores_to_students(self, scores: List[Score]) -> BulkOperationResponse:
+    async def add_teacher_subjects(self, class_id: str, teacher_id: str, subjects: List[str]) -> BulkOperationResponse:
+        """Assign a teacher to a class for several subjects in one _bulk request."""
+        try:
+            actions = []
+            for subject in subjects:
+                doc = self._prepare_document(TeacherAssignment(
+                    id=self._generate_id(),
+                    teacher_id=teacher_id,
+                    class_id=class_id,
+                    subject=subject
+                ))
+                actions.append({
+                    "_index": self.indices['teacher_assignments'],
+                    "_id": doc['id'],
+                    "_source": doc
+                })
+            
+            from elasticsearch.helpers import async_bulk
+            success_count, failed_items = await async_bulk(self.client, actions, raise_on_error=False)
+            
+            return BulkOperationResponse(
+                success=len(failed_items) == 0,
+                message="Teacher subjects added successfully",
+                total_processed=len(subjects),
+                successful=success_count,
+                failed=len(failed_items)
+            )
+        except Exception as e:
+            return BulkOperationResponse(
+                success=False,
+                message=f"Failed to add teacher subjects: {str(e)}",
+                total_processed=len(subjects),
+                successful=0,
+                failed=len(subjects),
+                errors=[str(e)]
+            )
+    
+    async def add_scores_to_students(self, scores: List[Score], batch_size: int = 500) -> BulkOperationResponse:
         """Add scores to students in Elasticsearch."""
         try:
             actions = []
+            now = utcnow().isoformat()
             for score in scores:
-                doc = self._prepare_document(score)
+                doc = self._prepare_score_document(score, now)
                 actions.append({
                     "_index": self.indices['scores'],
                     "_id": doc['id'],
@@ -619,14 +902,21 @@ class ElasticsearchInterface(DatabaseInterface):
                 })
             
             from elasticsearch.helpers import async_bulk
-            success_count, failed_items = await async_bulk(self.client, actions)
+            success_count, failed_items = await async_bulk(
+                self.client,
+                actions,
+                chunk_size=batch_size,
+                max_chunk_bytes=MAX_BULK_CHUNK_BYTES,
+                raise_on_error=False
+            )
             
             return BulkOperationResponse(
                 success=len(failed_items) == 0,
                 message="Scores added successfully",
                 total_processed=len(scores),
                 successful=success_count,
-                failed=len(failed_items)
+                failed=len(failed_items),
+                errors=[str(item) for item in failed_items] or None
             )
         except Exception as e:
             return BulkOperationResponse(
@@ -638,8 +928,49 @@ class ElasticsearchInterface(DatabaseInterface):
                 errors=[str(e)]
             )
     
+    async def create_students(self, students: List[Student], concurrency: int = 10) -> BulkOperationResponse:
+        """Create many students in Elasticsearch with the bulk helper."""
+        try:
+            actions = []
+            for student in students:
+                doc = self._prepare_document(student)
+                actions.append({
+                    "_index": self.indices['students'],
+                    "_id": doc['id'],
+                    "_source": doc
+                })
+            
+            from elasticsearch.helpers import async_bulk
+            success_count, failed_items = await async_bulk(
+                self.client,
+                actions,
+                max_chunk_bytes=MAX_BULK_CHUNK_BYTES,
+                raise_on_error=False
+            )
+            
+            return BulkOperationResponse(
+                success=len(failed_items) == 0,
+                message="Students created successfully",
+                total_processed=len(students),
+                successful=success_count,
+                failed=len(failed_items),
+                errors=[str(item) for item in failed_items] or None
+            )
+        except Exception as e:
+            return BulkOperationResponse(
+                success=False,
+                message=f"Failed to create students: {str(e)}",
+                total_processed=len(students),
+                successful=0,
+                failed=len(students),
+                errors=[str(e)]
+            )
+    
     async def bulk_operation(self, operation: BulkOperation) -> BulkOperationResponse:
         """Perform bulk operations in Elasticsearch."""
+        rejected = self._unsupported_on_error(operation)
+        if rejected:
+            return rejected
         try:
             index_name = self.indices.get(f"{operation.entity_type}s")
             if not index_name:
@@ -653,19 +984,20 @@ class ElasticsearchInterface(DatabaseInterface):
                 )
             
             actions = []
+            # One timestamp for the whole operation rather than per row
+            now = utcnow().isoformat()
             for item in operation.data:
                 if operation.operation_type == "create":
                     if not item.get('id'):
                         item['id'] = self._generate_id()
-                    item['created_at'] = datetime.utcnow().isoformat()
-                    item['updated_at'] = datetime.utcnow().isoformat()
+                    item['created_at'] = item['updated_at'] = now
                     actions.append({
                         "_index": index_name,
                         "_id": item['id'],
                         "_source": item
                     })
                 elif operation.operation_type == "update":
-                    item['updated_at'] = datetime.utcnow().isoformat()
+                    item['updated_at'] = now
                     actions.append({
                         "_index": index_name,
                         "_id": item['id'],
@@ -679,7 +1011,14 @@ class ElasticsearchInterface(DatabaseInterface):
                     })
             
             from elasticsearch.helpers import async_bulk
-            success_count, failed_items = await async_bulk(self.client, actions)
+            ignore_missing = operation.operation_type == "delete" and operation.ignore_missing
+            success_count, failed_items = await async_bulk(
+                self.client, actions, ignore_status=(404,) if ignore_missing else ()
+            )
+            if ignore_missing:
+                # Any other failure raises, so what is left are ids already gone
+                success_count += len(failed_items)
+                failed_items = []
             
             return BulkOperationResponse(
                 success=len(failed_items) == 0,
@@ -740,189 +1079,105 @@ class ElasticsearchInterface(DatabaseInterface):
                 errors=[str(e)]
             )
     
-    async def get_students_per_class(self, class_id: Optional[str] = None) -> AggregateResponse:
-        """Get students per class from Elasticsearch."""
+    async def _run_terms_agg(self, template_id: str, class_id: Optional[str],
+                             description: str) -> AggregateResponse:
+        """Run a per-class terms aggregation and wrap its buckets in a response."""
         try:
-            body = {
-                "size": 0,
-                "aggs": {
-                    "classes": {
-                        "terms": {
-                            "field": "class_id",
-                            "size": 100
-                        },
-                        "aggs": {
-                            "student_count": {
-                                "value_count": {
-                                    "field": "student_id"
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-            
-            if class_id:
-                body["query"] = {
-                    "term": {"class_id": class_id}
-                }
-            
-            result = await self.client.search(
-                index=self.indices['class_enrollments'],
-                body=body
-            )
-            
+            result = await self._search_per_class(template_id, class_id)
+            buckets = result['aggregations']['classes']['buckets']
             return AggregateResponse(
                 success=True,
-                message="Students per class retrieved successfully",
-                data={"results": result['aggregations']['classes']['buckets']},
-                count=len(result['aggregations']['classes']['buckets'])
+                message=f"{description.capitalize()} retrieved successfully",
+                data={"results": buckets},
+                count=len(buckets)
             )
         except Exception as e:
             return AggregateResponse(
                 success=False,
-                message=f"Failed to get students per class: {str(e)}",
+                message=f"Failed to get {description}: {str(e)}",
                 errors=[str(e)]
             )
     
+    async def get_students_per_class(self, class_id: Optional[str] = None, *,
+                                     count_only: bool = False) -> AggregateResponse:
+        """
+        Get students per class from Elasticsearch.
+
+        The buckets only ever carry student_count, so count_only changes nothing here.
+        """
+        return await self._run_terms_agg("students_per_class", class_id, "students per class")
+    
     async def get_avg_score_per_class(self, class_id: Optional[str] = None) -> AggregateResponse:
         """Get average score per class from Elasticsearch."""
+        return await self._run_terms_agg("avg_score_per_class", class_id, "average scores per class")
+
+    def _async_search_response(self, result: Dict[str, Any], message: str) -> AggregateResponse:
+        """Convert an async search payload into an aggregate response."""
+        is_running = result.get('is_running', False)
+        data = {
+            "search_id": result.get('id'),
+            "is_running": is_running,
+            "is_partial": result.get('is_partial', False)
+        }
+        buckets = None
+        aggregations = result.get('response', {}).get('aggregations')
+        if aggregations:
+            buckets = aggregations['classes']['buckets']
+        data["results"] = buckets
+        return AggregateResponse(
+            success=True,
+            message=message if not is_running else "Aggregation still running",
+            data=data,
+            count=len(buckets) if buckets is not None else None
+        )
+
+    async def get_avg_score_per_class_async(self, class_id: Optional[str] = None,
+                                            wait_for_completion_timeout: str = "200ms") -> AggregateResponse:
+        """
+        Submit the average-score aggregation as an async search.
+
+        Returns immediately with whatever is available after
+        wait_for_completion_timeout; if the search is still running, the
+        returned search_id can be passed to poll_async_search.
+        """
         try:
-            body = {
-                "size": 0,
-                "aggs": {
-                    "classes": {
-                        "terms": {
-                            "field": "class_id",
-                            "size": 100
-                        },
-                        "aggs": {
-                            "average_score": {
-                                "avg": {
-                                    "field": "score"
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-            
-            if class_id:
-                body["query"] = {
-                    "term": {"class_id": class_id}
-                }
-            
-            result = await self.client.search(
+            result = await self.client.async_search.submit(
                 index=self.indices['scores'],
-                body=body
-            )
-            
-            return AggregateResponse(
-                success=True,
-                message="Average scores per class retrieved successfully",
-                data={"results": result['aggregations']['classes']['buckets']},
-                count=len(result['aggregations']['classes']['buckets'])
+                body=_with_class_filter(_AVG_SCORE_PER_CLASS_BODY, class_id),
+                wait_for_completion_timeout=wait_for_completion_timeout
             )
+            return self._async_search_response(result, "Average scores per class retrieved successfully")
         except Exception as e:
             return AggregateResponse(
                 success=False,
-                message=f"Failed to get average scores per class: {str(e)}",
+                message=f"Failed to submit average scores per class: {str(e)}",
                 errors=[str(e)]
             )
-    
-    async def get_teachers_per_class(self, class_id: Optional[str] = None) -> AggregateResponse:
-        """Get teachers per class from Elasticsearch."""
+
+    async def poll_async_search(self, search_id: str) -> AggregateResponse:
+        """Fetch the current state of a previously submitted async search."""
         try:
-            body = {
-                "size": 0,
-                "aggs": {
-                    "classes": {
-                        "terms": {
-                            "field": "class_id",
-                            "size": 100
-                        },
-                        "aggs": {
-                            "teacher_count": {
-                                "cardinality": {
-                                    "field": "teacher_id"
-                                }
-                            },
-                            "subjects": {
-                                "terms": {
-                                    "field": "subject",
-                                    "size": 20
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-            
-            if class_id:
-                body["query"] = {
-                    "term": {"class_id": class_id}
-                }
-            
-            result = await self.client.search(
-                index=self.indices['teacher_assignments'],
-                body=body
-            )
-            
-            return AggregateResponse(
-                success=True,
-                message="Teachers per class retrieved successfully",
-                data={"results": result['aggregations']['classes']['buckets']},
-                count=len(result['aggregations']['classes']['buckets'])
-            )
+            result = await self.client.async_search.get(id=search_id)
+            return self._async_search_response(result, "Async search completed")
         except Exception as e:
             return AggregateResponse(
                 success=False,
-                message=f"Failed to get teachers per class: {str(e)}",
+                message=f"Failed to poll async search: {str(e)}",
                 errors=[str(e)]
             )
+
+    async def get_teachers_per_class(self, class_id: Optional[str] = None, *,
+                                     include_subjects: bool = True) -> AggregateResponse:
+        """
+        Get teachers per class from Elasticsearch.
+
+        Each class bucket carries its subjects breakdown, as the other
+        backends return each teacher's subject. Callers of this backend that
+        only need the teachers may pass include_subjects=False to skip it.
+        """
+        template_id = "teachers_with_subjects_per_class" if include_subjects else "teachers_per_class"
+        return await self._run_terms_agg(template_id, class_id, "teachers per class")
     
     async def get_subjects_per_class(self, class_id: Optional[str] = None) -> AggregateResponse:
         """Get subjects per class from Elasticsearch."""
-        try:
-            body = {
-                "size": 0,
-                "aggs": {
-                    "classes": {
-                        "terms": {
-                            "field": "class_id",
-                            "size": 100
-                        },
-                        "aggs": {
-                            "subjects": {
-                                "terms": {
-                                    "field": "subject",
-                                    "size": 20
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-            
-            if class_id:
-                body["query"] = {
-                    "term": {"class_id": class_id}
-                }
-            
-            result = await self.client.search(
-                index=self.indices['teacher_assignments'],
-                body=body
-            )
-            
-            return AggregateResponse(
-                success=True,
-                message="Subjects per class retrieved successfully",
-                data={"results": result['aggregations']['classes']['buckets']},
-                count=len(result['aggregations']['classes']['buckets'])
-            )
-        except Exception as e:
-            return AggregateResponse(
-                success=False,
-                message=f"Failed to get subjects per class: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._run_terms_agg("subjects_per_class", class_id, "subjects per class")
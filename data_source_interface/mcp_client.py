@@ -8,7 +8,7 @@ import json
 from typing import Any, Dict, List, Optional
 from datetime import datetime
 
-from .mcp_server import DataSourceMCPServer
+from .mcp_server import DataSourceMCPServer, install_uvloop
 
 
 class DataSourceMCPClient:
@@ -25,6 +25,10 @@ class DataSourceMCPClient:
         """Cleanup connections."""
         await self.server.cleanup()
     
+    async def reset_state(self):
+        """Forget cached reads so the next calls see the database as it is now."""
+        self.server.reset_state()
+    
     # Person operations
     async def create_person(self, first_name: str, last_name: str, email: str, 
                           phone: Optional[str] = None, date_of_birth: Optional[str] = None,
@@ -48,6 +52,10 @@ class DataSourceMCPClient:
         """Get a person by ID."""
         return await self.server.get_person(person_id)
     
+    async def get_person_json(self, person_id: str) -> bytes:
+        """Get a person by ID as a JSON-encoded result."""
+        return await self.server.get_person_json(person_id)
+    
     async def update_person(self, person_id: str, **kwargs) -> Dict[str, Any]:
         """Update a person."""
         return await self.server.update_person(person_id, kwargs)
@@ -86,6 +94,10 @@ class DataSourceMCPClient:
         """Get a student by ID."""
         return await self.server.get_student(student_id)
     
+    async def get_student_json(self, student_id: str) -> bytes:
+        """Get a student by ID as a JSON-encoded result."""
+        return await self.server.get_student_json(student_id)
+    
     async def update_student(self, student_id: str, **kwargs) -> Dict[str, Any]:
         """Update a student."""
         return await self.server.update_student(student_id, kwargs)
@@ -127,6 +139,10 @@ class DataSourceMCPClient:
         """Get a teacher by ID."""
         return await self.server.get_teacher(teacher_id)
     
+    async def get_teacher_json(self, teacher_id: str) -> bytes:
+        """Get a teacher by ID as a JSON-encoded result."""
+        return await self.server.get_teacher_json(teacher_id)
+    
     async def update_teacher(self, teacher_id: str, **kwargs) -> Dict[str, Any]:
         """Update a teacher."""
         return await self.server.update_teacher(teacher_id, kwargs)
@@ -164,6 +180,10 @@ class DataSourceMCPClient:
         """Get a class by ID."""
         return await self.server.get_class(class_id)
     
+    async def get_class_json(self, class_id: str) -> bytes:
+        """Get a class by ID as a JSON-encoded result."""
+        return await self.server.get_class_json(class_id)
+    
     async def update_class(self, class_id: str, **kwargs) -> Dict[str, Any]:
         """Update a class."""
         return await self.server.update_class(class_id, kwargs)
@@ -181,31 +201,58 @@ class DataSourceMCPClient:
         """Add a teacher to a class for a specific subject."""
         return await self.server.add_teacher_to_class(class_id, teacher_id, subject)
     
-    async def add_scores_to_students(self, scores_data: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Add scores to students."""
-        return await self.server.add_scores_to_students(scores_data)
+    async def add_teacher_subjects(self, class_id: str, teacher_id: str, subjects: List[str]) -> Dict[str, Any]:
+        """Add a teacher to a class for several subjects in one backend write."""
+        return await self.server.add_teacher_subjects(class_id, teacher_id, subjects)
+    
+    async def add_scores_to_students(self, scores_data: List[Dict[str, Any]], batch_size: int = 500) -> Dict[str, Any]:
+        """Add scores to students in chunks of batch_size per bulk request."""
+        return await self.server.add_scores_to_students(scores_data, batch_size)
+    
+    async def create_class_with_roster(self, class_data: Dict[str, Any], student_ids: List[str],
+                                       teacher_id: Optional[str] = None,
+                                       subject: Optional[str] = None) -> Dict[str, Any]:
+        """Create a class, enroll students and optionally assign a teacher in one call."""
+        return await self.server.create_class_with_roster(class_data, student_ids, teacher_id, subject)
     
     # Bulk operations
+    async def bulk_create_students(self, students_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create many students in one backend bulk write."""
+        return await self.server.bulk_create_students(students_data)
+    
     async def bulk_operation(self, operation_type: str, entity_type: str, 
-                           data: List[Dict[str, Any]], batch_size: int = 100) -> Dict[str, Any]:
+                           data: List[Dict[str, Any]], batch_size: int = 100,
+                           on_error: Optional[str] = None, ignore_missing: bool = False) -> Dict[str, Any]:
         """Perform bulk operations."""
         operation_data = {
             "operation_type": operation_type,
             "entity_type": entity_type,
             "data": data,
-            "batch_size": batch_size
+            "batch_size": batch_size,
+            "on_error": on_error,
+            "ignore_missing": ignore_missing
         }
         return await self.server.bulk_operation(operation_data)
     
     # Aggregate operations
-    async def get_students_per_class(self, class_id: Optional[str] = None) -> Dict[str, Any]:
-        """Get students per class."""
-        return await self.server.get_students_per_class(class_id)
+    async def get_students_per_class(self, class_id: Optional[str] = None,
+                                     count_only: bool = False) -> Dict[str, Any]:
+        """Get students per class, or only their counts with count_only."""
+        return await self.server.get_students_per_class(class_id, count_only)
     
     async def get_avg_score_per_class(self, class_id: Optional[str] = None) -> Dict[str, Any]:
         """Get average score per class."""
         return await self.server.get_avg_score_per_class(class_id)
     
+    async def get_avg_score_per_class_async(self, class_id: Optional[str] = None,
+                                            wait_for_completion_timeout: str = "200ms") -> Dict[str, Any]:
+        """Start the average-score aggregation; poll its search_id while is_running."""
+        return await self.server.get_avg_score_per_class_async(class_id, wait_for_completion_timeout)
+    
+    async def poll_async_search(self, search_id: str) -> Dict[str, Any]:
+        """Fetch the current state of a search started by get_avg_score_per_class_async."""
+        return await self.server.poll_async_search(search_id)
+    
     async def get_teachers_per_class(self, class_id: Optional[str] = None) -> Dict[str, Any]:
         """Get teachers per class."""
         return await self.server.get_teachers_per_class(class_id)
@@ -214,10 +261,15 @@ class DataSourceMCPClient:
         """Get subjects per class."""
         return await self.server.get_subjects_per_class(class_id)
     
+    async def get_class_overview(self, class_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get students, average score, teachers and subjects per class in one call."""
+        return await self.server.get_class_overview(class_id)
+    
     async def aggregate_query(self, query_type: str, filters: Optional[Dict[str, Any]] = None,
                             group_by: Optional[List[str]] = None, sort_by: Optional[str] = None,
-                            sort_order: str = "asc", limit: Optional[int] = None) -> Dict[str, Any]:
-        """Perform custom aggregate queries."""
+                            sort_order: str = "asc", limit: Optional[int] = None,
+                            after: Optional[List[Any]] = None) -> Dict[str, Any]:
+        """Perform custom aggregate queries; pass a page's next_after as after to get the next page."""
         query_data = {
             "query_type": query_type,
             "sort_order": sort_order
@@ -230,8 +282,29 @@ class DataSourceMCPClient:
             query_data["sort_by"] = sort_by
         if limit:
             query_data["limit"] = limit
+        if after:
+            query_data["after"] = after
         
         return await self.server.aggregate_query(query_data)
+    
+    async def aggregate_query_json(self, query_type: str, filters: Optional[Dict[str, Any]] = None,
+                                 sort_by: Optional[str] = None, sort_order: str = "asc",
+                                 limit: Optional[int] = None, after: Optional[List[Any]] = None) -> bytes:
+        """Perform a custom aggregate query, returning the JSON-encoded result."""
+        query_data = {
+            "query_type": query_type,
+            "sort_order": sort_order
+        }
+        if filters:
+            query_data["filters"] = filters
+        if sort_by:
+            query_data["sort_by"] = sort_by
+        if limit:
+            query_data["limit"] = limit
+        if after:
+            query_data["after"] = after
+        
+        return await self.server.aggregate_query_json(query_data)
 
 
 async def main():
@@ -290,4 +363,5 @@ async def main():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
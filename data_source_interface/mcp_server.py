@@ -4,49 +4,267 @@ Provides tools and resources for CRUD operations, bulk operations, and aggregati
 """
 
 import asyncio
-import json
+import copy
+import functools
+import inspect
+import logging
+import logging.handlers
 import os
+import queue
+import signal
 import sys
-from typing import Any, Dict, List, Optional
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+import orjson
+from cachetools import TTLCache
+from pydantic import BaseModel, TypeAdapter
 
 from .models import (
-    Person, Student, Teacher, Class, Score, BulkOperation, AggregateQuery,
-    SubjectEnum
+    Person, Student, Teacher, Class, Score, BulkOperation, AggregateQuery
 )
 from .database_interface import DatabaseInterface, MongoDBInterface
 from .elasticsearch_interface import ElasticsearchInterface
 from .postgresql_interface import PostgreSQLInterface
 
+log = logging.getLogger(__name__)
+
+ModelT = TypeVar('ModelT', bound=BaseModel)
+
+# Set MCP_TRUST_INPUT=1 when every caller already sends schema-checked data;
+# inbound models are then built without running field validation.
+TRUST_INPUT = os.getenv('MCP_TRUST_INPUT', '0') == '1'
+
+
+_ADAPTERS: Dict[type, TypeAdapter] = {
+    model_cls: TypeAdapter(model_cls)
+    for model_cls in (Person, Student, Teacher, Class, Score, BulkOperation, AggregateQuery)
+}
+
+
+def _build(model_cls: Type[ModelT], data: Dict[str, Any]) -> ModelT:
+    """Build an inbound request model, skipping validation for trusted input."""
+    if TRUST_INPUT:
+        return model_cls.model_construct(**data)
+    return _ADAPTERS[model_cls].validate_python(data)
+
+
+# get_*_json encodes a class on a worker thread once its schedule has more
+# top-level entries than this.
+OFFLOAD_SCHEDULE_ENTRIES = int(os.getenv('MCP_OFFLOAD_SCHEDULE_ENTRIES', '64'))
+
+# Score uploads can carry thousands of rows; one adapter call validates the
+# whole list instead of constructing each Score separately.
+SCORE_LIST_ADAPTER = TypeAdapter(List[Score])
+
+
+def _build_scores(scores_data: List[Dict[str, Any]]) -> List[Score]:
+    """Build the Score models for a score upload."""
+    if TRUST_INPUT:
+        return [Score.model_construct(**score_data) for score_data in scores_data]
+    return SCORE_LIST_ADAPTER.validate_python(scores_data)
+
+
+def _dump(model: BaseModel) -> Dict[str, Any]:
+    """
+    Convert an entity model into a response dict.
+
+    Person, Student, Teacher and Class only hold scalar, datetime, enum-list
+    and plain-dict fields, so copying the field values, with the lists and
+    dicts copied too, matches .dict() without its recursive conversion pass.
+    The copies keep callers from mutating a model held in the read cache.
+    """
+    return {
+        key: list(value) if isinstance(value, list)
+        else copy.deepcopy(value) if isinstance(value, dict)
+        else value
+        for key, value in model.__dict__.items()
+    }
+
+
+def _json_default(obj: Any) -> Any:
+    """Encode the values orjson has no native support for."""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, BaseModel):
+        return _dump(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(result: Dict[str, Any]) -> bytes:
+    """
+    Serialize an MCP result dict to JSON bytes.
+
+    orjson encodes datetimes (as ISO 8601), enums and UUIDs natively, so
+    only Decimal aggregates and nested models go through _json_default.
+    Naive datetimes (as some backends return them) are written as UTC.
+    """
+    return orjson.dumps(result, default=_json_default, option=orjson.OPT_NAIVE_UTC)
+
+
+# Result shapes. Each builder returns a dict display with constant keys,
+# which CPython compiles to BUILD_CONST_KEY_MAP over a prebuilt key tuple;
+# dict(zip(keys, values)) measured roughly 2.5x slower, so keep literals.
+def _entity_result(response) -> Dict[str, Any]:
+    return {
+        "success": response.success,
+        "message": response.message,
+        "data": _dump(response.data) if response.data else None,
+        "errors": response.errors
+    }
+
+
+def _status_result(response) -> Dict[str, Any]:
+    return {
+        "success": response.success,
+        "message": response.message,
+        "errors": response.errors
+    }
+
+
+def _bulk_result(response) -> Dict[str, Any]:
+    return {
+        "success": response.success,
+        "message": response.message,
+        "total_processed": response.total_processed,
+        "successful": response.successful,
+        "failed": response.failed,
+        "errors": response.errors
+    }
+
+
+def _aggregate_result(response) -> Dict[str, Any]:
+    return {
+        "success": response.success,
+        "message": response.message,
+        "data": response.data,
+        "count": response.count,
+        "errors": response.errors
+    }
+
+
+async def _entity_json_result(response) -> bytes:
+    """Entity result as JSON bytes, with the model written by pydantic-core directly."""
+    data = None
+    if response.data:
+        schedule = getattr(response.data, 'schedule', None)
+        if schedule and len(schedule) > OFFLOAD_SCHEDULE_ENTRIES:
+            # A large class schedule takes long enough to encode that it
+            # would stall other requests; encode it on a worker thread.
+            loop = asyncio.get_running_loop()
+            data = await loop.run_in_executor(None, response.data.model_dump_json)
+        else:
+            data = response.data.model_dump_json()
+    return dumps({
+        "success": response.success,
+        "message": response.message,
+        "data": orjson.Fragment(data) if data else None,
+        "errors": response.errors
+    })
+
+
+def _aggregate_json_result(response) -> bytes:
+    """Aggregate result as JSON bytes, so large result lists are encoded by orjson in C."""
+    return dumps(_aggregate_result(response))
+
+
+_RESULT_BUILDERS: Dict[str, Callable[[Any], Any]] = {
+    "entity": _entity_result,
+    "entity_json": _entity_json_result,
+    "status": _status_result,
+    "bulk": _bulk_result,
+    "aggregate": _aggregate_result,
+    "aggregate_json": _aggregate_json_result,
+}
+
+
+def mcp_response(kind: str, action: str):
+    """
+    Turn a handler returning an interface response into an MCP result dict.
+
+    kind picks the result shape ("entity", "status", "bulk" or "aggregate", or
+    "entity_json"/"aggregate_json" for a result already serialized to JSON bytes);
+    action completes the "Failed to ..." message returned if the handler raises.
+    """
+    to_result = _RESULT_BUILDERS[kind]
+    as_json = kind.endswith("_json")
+    awaits_result = inspect.iscoroutinefunction(to_result)
+    
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            try:
+                result = to_result(await func(*args, **kwargs))
+                return await result if awaits_result else result
+            except Exception as e:
+                result = {
+                    "success": False,
+                    "message": f"Failed to {action}: {str(e)}",
+                    "errors": [str(e)]
+                }
+                return dumps(result) if as_json else result
+        return wrapper
+    return decorator
+
+
+# Backend factories keyed by DATABASE_TYPE; each takes the configured server.
+_DB_FACTORIES: Dict[str, Callable[["DataSourceMCPServer"], DatabaseInterface]] = {
+    'mongodb': lambda server: MongoDBInterface(
+        server.connection_string, server.database_name,
+        min_pool_size=server.min_pool_size, max_pool_size=server.max_pool_size
+    ),
+    'elasticsearch': lambda server: ElasticsearchInterface(
+        server.connection_string, server.database_name,
+        connections_per_node=int(os.getenv('ES_MAX_CONN', '20')),
+        request_timeout=float(os.getenv('ES_REQUEST_TIMEOUT', '60'))
+    ),
+    'postgresql': lambda server: PostgreSQLInterface(
+        server.connection_string,
+        min_size=int(os.getenv('POSTGRES_POOL_MIN', '10')),
+        max_size=int(os.getenv('POSTGRES_POOL_MAX', '25')),
+        max_cached_statement_lifetime=float(os.getenv('POSTGRES_STATEMENT_LIFETIME', '300'))
+    ),
+}
+
 
 class DataSourceMCPServer:
     """MCP Server for Data Source Interface operations."""
     
     def __init__(self):
         self.db_interface: Optional[DatabaseInterface] = None
-        self.db_type = os.getenv('DATABASE_TYPE', 'mongodb')
+        self.db_type = os.getenv('DATABASE_TYPE', 'mongodb').lower()
         self.connection_string = os.getenv('DATABASE_CONNECTION_STRING', 'mongodb://localhost:27017')
         self.database_name = os.getenv('DATABASE_NAME', 'school_management')
+        self.min_pool_size = int(os.getenv('DB_MIN_POOL_SIZE', '5'))
+        self.max_pool_size = int(os.getenv('DB_MAX_POOL_SIZE', '20'))
+        # Short-lived cache of get_* responses; MCP_CACHE_TTL=0 disables it
+        cache_ttl = float(os.getenv('MCP_CACHE_TTL', '5'))
+        self._read_cache: Optional[TTLCache] = (
+            TTLCache(maxsize=int(os.getenv('MCP_CACHE_SIZE', '4096')), ttl=cache_ttl)
+            if cache_ttl > 0 else None
+        )
+        # Marker of the newest in-flight fetch per cache key; _invalidate drops
+        # it so a fetch that raced a write does not cache its stale response
+        self._pending_reads: Dict[Tuple[str, str], object] = {}
     
     async def initialize(self):
         """Initialize the database connection."""
         try:
-            if self.db_type.lower() == 'mongodb':
-                self.db_interface = MongoDBInterface(self.connection_string, self.database_name)
-            elif self.db_type.lower() == 'elasticsearch':
-                hosts = [self.connection_string]
-                self.db_interface = ElasticsearchInterface(hosts, self.database_name)
-            elif self.db_type.lower() == 'postgresql':
-                self.db_interface = PostgreSQLInterface(self.connection_string)
-            else:
+            factory = _DB_FACTORIES.get(self.db_type)
+            if factory is None:
                 raise ValueError(f"Unsupported database type: {self.db_type}")
+            self.db_interface = factory(self)
             
             connected = await self.db_interface.connect()
             if not connected:
                 raise Exception("Failed to connect to database")
             
-            print(f"Connected to {self.db_type} database successfully")
+            # Open the pool's connections now so early requests skip the handshake
+            await self.db_interface.warm_up(self.min_pool_size)
+            
+            log.info("Connected to %s database successfully", self.db_type)
         except Exception as e:
-            print(f"Database initialization error: {e}")
+            log.error("Database initialization error: %s", e)
             raise
     
     async def cleanup(self):
@@ -54,477 +272,317 @@ class DataSourceMCPServer:
         if self.db_interface:
             await self.db_interface.disconnect()
     
+    async def _cached_get(self, entity: str, entity_id: str, fetch: Callable[[str], Awaitable[Any]]):
+        """Return a recent successful get_* response for this id, or fetch and cache it."""
+        if self._read_cache is None:
+            return await fetch(entity_id)
+        key = (entity, entity_id)
+        response = self._read_cache.get(key)
+        if response is None:
+            marker = self._pending_reads[key] = object()
+            try:
+                response = await fetch(entity_id)
+            finally:
+                # Only the newest fetch, with no write since it started, may cache
+                current = self._pending_reads.get(key) is marker
+                if current:
+                    del self._pending_reads[key]
+            if response.success and current:
+                self._read_cache[key] = response
+        return response
+    
+    def _invalidate(self, entity: str, entity_id: str):
+        """Drop a cached get_* response, and any fetch in flight, after the entity is written."""
+        if self._read_cache is not None:
+            self._read_cache.pop((entity, entity_id), None)
+            self._pending_reads.pop((entity, entity_id), None)
+    
+    def reset_state(self):
+        """Drop every cached read, here and in the backend, without reconnecting."""
+        if self._read_cache is not None:
+            self._read_cache.clear()
+            self._pending_reads.clear()
+        if self.db_interface:
+            self.db_interface.clear_cache()
+    
     # Person operations
+    @mcp_response("entity", "create person")
     async def create_person(self, person_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new person."""
-        try:
-            person = Person(**person_data)
-            response = await self.db_interface.create_person(person)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data.dict() if response.data else None,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to create person: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self.db_interface.create_person(_build(Person, person_data))
     
+    @mcp_response("entity", "get person")
     async def get_person(self, person_id: str) -> Dict[str, Any]:
         """Get a person by ID."""
-        try:
-            response = await self.db_interface.get_person(person_id)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data.dict() if response.data else None,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to get person: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self._cached_get('person', person_id, self.db_interface.get_person)
     
+    @mcp_response("entity_json", "get person")
+    async def get_person_json(self, person_id: str) -> bytes:
+        """Get a person by ID as a JSON-encoded result."""
+        return await self._cached_get('person', person_id, self.db_interface.get_person)
+    
+    @mcp_response("entity", "update person")
     async def update_person(self, person_id: str, person_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a person."""
-        try:
-            person = Person(**person_data)
-            response = await self.db_interface.update_person(person_id, person)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data.dict() if response.data else None,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to update person: {str(e)}",
-                "errors": [str(e)]
-            }
+        response = await self.db_interface.update_person(person_id, _build(Person, person_data))
+        self._invalidate('person', person_id)
+        return response
     
+    @mcp_response("status", "delete person")
     async def delete_person(self, person_id: str) -> Dict[str, Any]:
         """Delete a person."""
-        try:
-            response = await self.db_interface.delete_person(person_id)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to delete person: {str(e)}",
-                "errors": [str(e)]
-            }
+        response = await self.db_interface.delete_person(person_id)
+        self._invalidate('person', person_id)
+        return response
     
     # Student operations
+    @mcp_response("entity", "create student")
     async def create_student(self, student_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new student."""
-        try:
-            student = Student(**student_data)
-            response = await self.db_interface.create_student(student)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data.dict() if response.data else None,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to create student: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self.db_interface.create_student(_build(Student, student_data))
     
+    @mcp_response("entity", "get student")
     async def get_student(self, student_id: str) -> Dict[str, Any]:
         """Get a student by ID."""
-        try:
-            response = await self.db_interface.get_student(student_id)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data.dict() if response.data else None,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to get student: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self._cached_get('student', student_id, self.db_interface.get_student)
     
+    @mcp_response("entity_json", "get student")
+    async def get_student_json(self, student_id: str) -> bytes:
+        """Get a student by ID as a JSON-encoded result."""
+        return await self._cached_get('student', student_id, self.db_interface.get_student)
+    
+    @mcp_response("entity", "update student")
     async def update_student(self, student_id: str, student_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a student."""
-        try:
-            student = Student(**student_data)
-            response = await self.db_interface.update_student(student_id, student)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data.dict() if response.data else None,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to update student: {str(e)}",
-                "errors": [str(e)]
-            }
+        response = await self.db_interface.update_student(student_id, _build(Student, student_data))
+        self._invalidate('student', student_id)
+        return response
     
+    @mcp_response("status", "delete student")
     async def delete_student(self, student_id: str) -> Dict[str, Any]:
         """Delete a student."""
-        try:
-            response = await self.db_interface.delete_student(student_id)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to delete student: {str(e)}",
-                "errors": [str(e)]
-            }
+        response = await self.db_interface.delete_student(student_id)
+        self._invalidate('student', student_id)
+        return response
     
     # Teacher operations
+    @mcp_response("entity", "create teacher")
     async def create_teacher(self, teacher_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new teacher."""
-        try:
-            teacher = Teacher(**teacher_data)
-            response = await self.db_interface.create_teacher(teacher)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data.dict() if response.data else None,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to create teacher: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self.db_interface.create_teacher(_build(Teacher, teacher_data))
     
+    @mcp_response("entity", "get teacher")
     async def get_teacher(self, teacher_id: str) -> Dict[str, Any]:
         """Get a teacher by ID."""
-        try:
-            response = await self.db_interface.get_teacher(teacher_id)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data.dict() if response.data else None,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to get teacher: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self._cached_get('teacher', teacher_id, self.db_interface.get_teacher)
+    
+    @mcp_response("entity_json", "get teacher")
+    async def get_teacher_json(self, teacher_id: str) -> bytes:
+        """Get a teacher by ID as a JSON-encoded result."""
+        return await self._cached_get('teacher', teacher_id, self.db_interface.get_teacher)
     
+    @mcp_response("entity", "update teacher")
     async def update_teacher(self, teacher_id: str, teacher_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a teacher."""
-        try:
-            teacher = Teacher(**teacher_data)
-            response = await self.db_interface.update_teacher(teacher_id, teacher)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data.dict() if response.data else None,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to update teacher: {str(e)}",
-                "errors": [str(e)]
-            }
+        response = await self.db_interface.update_teacher(teacher_id, _build(Teacher, teacher_data))
+        self._invalidate('teacher', teacher_id)
+        return response
     
+    @mcp_response("status", "delete teacher")
     async def delete_teacher(self, teacher_id: str) -> Dict[str, Any]:
         """Delete a teacher."""
-        try:
-            response = await self.db_interface.delete_teacher(teacher_id)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to delete teacher: {str(e)}",
-                "errors": [str(e)]
-            }
+        response = await self.db_interface.delete_teacher(teacher_id)
+        self._invalidate('teacher', teacher_id)
+        return response
     
     # Class operations
+    @mcp_response("entity", "create class")
     async def create_class(self, class_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create a new class."""
-        try:
-            class_obj = Class(**class_data)
-            response = await self.db_interface.create_class(class_obj)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data.dict() if response.data else None,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to create class: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self.db_interface.create_class(_build(Class, class_data))
     
+    @mcp_response("entity", "get class")
     async def get_class(self, class_id: str) -> Dict[str, Any]:
         """Get a class by ID."""
-        try:
-            response = await self.db_interface.get_class(class_id)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data.dict() if response.data else None,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to get class: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self._cached_get('class', class_id, self.db_interface.get_class)
+    
+    @mcp_response("entity_json", "get class")
+    async def get_class_json(self, class_id: str) -> bytes:
+        """Get a class by ID as a JSON-encoded result."""
+        return await self._cached_get('class', class_id, self.db_interface.get_class)
     
+    @mcp_response("entity", "update class")
     async def update_class(self, class_id: str, class_data: Dict[str, Any]) -> Dict[str, Any]:
         """Update a class."""
-        try:
-            class_obj = Class(**class_data)
-            response = await self.db_interface.update_class(class_id, class_obj)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data.dict() if response.data else None,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to update class: {str(e)}",
-                "errors": [str(e)]
-            }
+        response = await self.db_interface.update_class(class_id, _build(Class, class_data))
+        self._invalidate('class', class_id)
+        return response
     
+    @mcp_response("status", "delete class")
     async def delete_class(self, class_id: str) -> Dict[str, Any]:
         """Delete a class."""
-        try:
-            response = await self.db_interface.delete_class(class_id)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to delete class: {str(e)}",
-                "errors": [str(e)]
-            }
+        response = await self.db_interface.delete_class(class_id)
+        self._invalidate('class', class_id)
+        return response
     
     # Relationship operations
+    @mcp_response("bulk", "add students to class")
     async def add_students_to_class(self, class_id: str, student_ids: List[str]) -> Dict[str, Any]:
         """Add students to a class."""
-        try:
-            response = await self.db_interface.add_students_to_class(class_id, student_ids)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "total_processed": response.total_processed,
-                "successful": response.successful,
-                "failed": response.failed,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to add students to class: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self.db_interface.add_students_to_class(class_id, student_ids)
     
+    @mcp_response("status", "add teacher to class")
     async def add_teacher_to_class(self, class_id: str, teacher_id: str, subject: str) -> Dict[str, Any]:
         """Add a teacher to a class for a specific subject."""
-        try:
-            response = await self.db_interface.add_teacher_to_class(class_id, teacher_id, subject)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to add teacher to class: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self.db_interface.add_teacher_to_class(class_id, teacher_id, subject)
     
-    async def add_scores_to_students(self, scores_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+    @mcp_response("bulk", "add teacher subjects")
+    async def add_teacher_subjects(self, class_id: str, teacher_id: str, subjects: List[str]) -> Dict[str, Any]:
+        """Add a teacher to a class for several subjects in one backend write."""
+        return await self.db_interface.add_teacher_subjects(class_id, teacher_id, subjects)
+    
+    @mcp_response("bulk", "add scores")
+    async def add_scores_to_students(self, scores_data: List[Dict[str, Any]], batch_size: int = 500) -> Dict[str, Any]:
         """Add scores to students."""
-        try:
-            scores = [Score(**score_data) for score_data in scores_data]
-            response = await self.db_interface.add_scores_to_students(scores)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "total_processed": response.total_processed,
-                "successful": response.successful,
-                "failed": response.failed,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to add scores: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self.db_interface.add_scores_to_students(_build_scores(scores_data), batch_size)
+    
+    @mcp_response("entity", "create class with roster")
+    async def create_class_with_roster(self, class_data: Dict[str, Any], student_ids: List[str],
+                                       teacher_id: Optional[str] = None,
+                                       subject: Optional[str] = None) -> Dict[str, Any]:
+        """Create a class, enroll students and optionally assign a teacher in one call."""
+        return await self.db_interface.create_class_with_roster(
+            _build(Class, class_data), student_ids, teacher_id, subject
+        )
     
     # Bulk operations
+    @mcp_response("bulk", "create students")
+    async def bulk_create_students(self, students_data: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Create many students in one backend bulk write."""
+        students = [_build(Student, student_data) for student_data in students_data]
+        return await self.db_interface.create_students(students)
+    
+    @mcp_response("bulk", "perform bulk operation")
     async def bulk_operation(self, operation_data: Dict[str, Any]) -> Dict[str, Any]:
         """Perform bulk operations."""
+        operation = _build(BulkOperation, operation_data)
         try:
-            operation = BulkOperation(**operation_data)
-            response = await self.db_interface.bulk_operation(operation)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "total_processed": response.total_processed,
-                "successful": response.successful,
-                "failed": response.failed,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to perform bulk operation: {str(e)}",
-                "errors": [str(e)]
-            }
+            return await self.db_interface.bulk_operation(operation)
+        finally:
+            # Part of a failed batch may still have been written, so evict
+            # every id the operation touched whatever its outcome
+            if operation.operation_type in ('update', 'delete'):
+                for item in operation.data:
+                    if 'id' in item:
+                        self._invalidate(operation.entity_type, str(item['id']))
     
     # Aggregate operations
-    async def get_students_per_class(self, class_id: Optional[str] = None) -> Dict[str, Any]:
-        """Get students per class."""
-        try:
-            response = await self.db_interface.get_students_per_class(class_id)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data,
-                "count": response.count,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to get students per class: {str(e)}",
-                "errors": [str(e)]
-            }
+    @mcp_response("aggregate", "get students per class")
+    async def get_students_per_class(self, class_id: Optional[str] = None,
+                                     count_only: bool = False) -> Dict[str, Any]:
+        """Get students per class, or only their counts with count_only."""
+        return await self.db_interface.get_students_per_class(class_id, count_only=count_only)
     
+    @mcp_response("aggregate", "get average scores per class")
     async def get_avg_score_per_class(self, class_id: Optional[str] = None) -> Dict[str, Any]:
         """Get average score per class."""
-        try:
-            response = await self.db_interface.get_avg_score_per_class(class_id)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data,
-                "count": response.count,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to get average scores per class: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self.db_interface.get_avg_score_per_class(class_id)
     
+    @mcp_response("aggregate", "get teachers per class")
     async def get_teachers_per_class(self, class_id: Optional[str] = None) -> Dict[str, Any]:
         """Get teachers per class."""
-        try:
-            response = await self.db_interface.get_teachers_per_class(class_id)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data,
-                "count": response.count,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to get teachers per class: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self.db_interface.get_teachers_per_class(class_id)
     
+    @mcp_response("aggregate", "get subjects per class")
     async def get_subjects_per_class(self, class_id: Optional[str] = None) -> Dict[str, Any]:
         """Get subjects per class."""
-        try:
-            response = await self.db_interface.get_subjects_per_class(class_id)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data,
-                "count": response.count,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to get subjects per class: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self.db_interface.get_subjects_per_class(class_id)
     
+    @mcp_response("aggregate", "submit average scores per class")
+    async def get_avg_score_per_class_async(self, class_id: Optional[str] = None,
+                                            wait_for_completion_timeout: str = "200ms") -> Dict[str, Any]:
+        """Start the average-score aggregation; poll its search_id while is_running."""
+        return await self.db_interface.get_avg_score_per_class_async(class_id, wait_for_completion_timeout)
+    
+    @mcp_response("aggregate", "poll async search")
+    async def poll_async_search(self, search_id: str) -> Dict[str, Any]:
+        """Fetch the current state of a search started by get_avg_score_per_class_async."""
+        return await self.db_interface.poll_async_search(search_id)
+    
+    @mcp_response("aggregate", "get class overview")
+    async def get_class_overview(self, class_id: Optional[str] = None) -> Dict[str, Any]:
+        """Get students, average score, teachers and subjects per class in one call."""
+        return await self.db_interface.get_class_overview(class_id)
+    
+    @mcp_response("aggregate", "perform aggregate query")
     async def aggregate_query(self, query_data: Dict[str, Any]) -> Dict[str, Any]:
         """Perform custom aggregate queries."""
-        try:
-            query = AggregateQuery(**query_data)
-            response = await self.db_interface.aggregate_query(query)
-            return {
-                "success": response.success,
-                "message": response.message,
-                "data": response.data,
-                "count": response.count,
-                "errors": response.errors
-            }
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"Failed to perform aggregate query: {str(e)}",
-                "errors": [str(e)]
-            }
+        return await self.db_interface.aggregate_query(_build(AggregateQuery, query_data))
+    
+    @mcp_response("aggregate_json", "perform aggregate query")
+    async def aggregate_query_json(self, query_data: Dict[str, Any]) -> bytes:
+        """Perform a custom aggregate query and return the JSON-encoded result."""
+        return await self.db_interface.aggregate_query(_build(AggregateQuery, query_data))
 
 
 # Global server instance
 server = DataSourceMCPServer()
 
 
+def _start_logging() -> logging.handlers.QueueListener:
+    """
+    Route log records through a queue to a stdout handler on a background
+    thread, so a slow stdout never blocks the event loop.
+    """
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    root = logging.getLogger()
+    root.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(asctime)s %(levelname)s %(name)s: %(message)s'))
+    listener = logging.handlers.QueueListener(log_queue, handler, respect_handler_level=True)
+    listener.start()
+    return listener
+
+
 async def main():
     """Main function to run the MCP server."""
+    listener = _start_logging()
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            # Windows event loops have no signal handlers; Ctrl+C still
+            # cancels main() with KeyboardInterrupt there.
+            pass
+    
     try:
         await server.initialize()
-        print("Data Source MCP Server initialized successfully")
+        log.info("Data Source MCP Server initialized successfully")
         
-        # Keep the server running
-        while True:
-            await asyncio.sleep(1)
-            
-    except KeyboardInterrupt:
-        print("Shutting down server...")
+        # Idle until a shutdown signal arrives
+        await stop.wait()
+        log.info("Shutting down server...")
     except Exception as e:
-        print(f"Server error: {e}")
+        log.exception("Server error: %s", e)
     finally:
         await server.cleanup()
+        listener.stop()
+
+
+def install_uvloop() -> None:
+    """Use uvloop's event loop when it is available (it has no Windows build)."""
+    if sys.platform == 'win32':
+        return
+    try:
+        import uvloop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(main())
@@ -3,12 +3,17 @@ Pydantic models for the Data Source Interface application.
 Defines the schema for Person, Student, Teacher, Class, and related entities.
 """
 
-from typing import List, Optional, Dict, Any, Union
-from datetime import datetime
-from pydantic import BaseModel, Field, validator
+from typing import Any, Literal
+from datetime import datetime, timezone
+from pydantic import BaseModel, Field, field_validator
 from enum import Enum
 
 
+def utcnow() -> datetime:
+    """Return the current time as a timezone-aware UTC datetime."""
+    return datetime.now(timezone.utc)
+
+
 class SubjectEnum(str, Enum):
     MATHEMATICS = "mathematics"
     SCIENCE = "science"
@@ -33,155 +38,169 @@ class GatheringTypeEnum(str, Enum):
 
 class Person(BaseModel):
     """Base model for a person."""
-    id: Optional[str] = Field(None, description="Unique identifier")
+    id: str | None = Field(None, description="Unique identifier")
     first_name: str = Field(..., description="First name of the person")
     last_name: str = Field(..., description="Last name of the person")
     email: str = Field(..., description="Email address")
-    phone: Optional[str] = Field(None, description="Phone number")
-    date_of_birth: Optional[datetime] = Field(None, description="Date of birth")
-    address: Optional[str] = Field(None, description="Physical address")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    phone: str | None = Field(None, description="Phone number")
+    date_of_birth: datetime | None = Field(None, description="Date of birth")
+    address: str | None = Field(None, description="Physical address")
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
-    @validator('email')
+    @field_validator('email')
+    @classmethod
     def validate_email(cls, v):
         if '@' not in v:
             raise ValueError('Invalid email format')
         return v.lower()
-    
-    class Config:
-        json_encoders = {
-            datetime: lambda v: v.isoformat()
-        }
 
 
 class Student(Person):
     """Student model extending Person."""
-    student_id: Optional[str] = Field(None, description="Student ID number")
-    grade_level: Optional[int] = Field(None, ge=1, le=12, description="Grade level (1-12)")
-    enrollment_date: datetime = Field(default_factory=datetime.utcnow)
+    student_id: str | None = Field(None, description="Student ID number")
+    grade_level: int | None = Field(None, ge=1, le=12, description="Grade level (1-12)")
+    enrollment_date: datetime = Field(default_factory=utcnow)
     is_active: bool = Field(True, description="Whether student is currently active")
-    guardian_contact: Optional[str] = Field(None, description="Guardian contact information")
+    guardian_contact: str | None = Field(None, description="Guardian contact information")
 
 
 class Teacher(Person):
     """Teacher model extending Person."""
-    employee_id: Optional[str] = Field(None, description="Employee ID number")
-    subjects: List[SubjectEnum] = Field(default_factory=list, description="Subjects taught")
-    hire_date: datetime = Field(default_factory=datetime.utcnow)
+    employee_id: str | None = Field(None, description="Employee ID number")
+    subjects: list[SubjectEnum] = Field(default_factory=list, description="Subjects taught")
+    hire_date: datetime = Field(default_factory=utcnow)
     is_active: bool = Field(True, description="Whether teacher is currently active")
-    department: Optional[str] = Field(None, description="Department")
-    qualification: Optional[str] = Field(None, description="Educational qualification")
+    department: str | None = Field(None, description="Department")
+    qualification: str | None = Field(None, description="Educational qualification")
 
 
 class Gathering(BaseModel):
     """Base model for gatherings (classes, workshops, etc.)."""
-    id: Optional[str] = Field(None, description="Unique identifier")
+    id: str | None = Field(None, description="Unique identifier")
     name: str = Field(..., description="Name of the gathering")
-    description: Optional[str] = Field(None, description="Description")
+    description: str | None = Field(None, description="Description")
     gathering_type: GatheringTypeEnum = Field(..., description="Type of gathering")
-    capacity: Optional[int] = Field(None, ge=1, description="Maximum capacity")
-    location: Optional[str] = Field(None, description="Location")
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    capacity: int | None = Field(None, ge=1, description="Maximum capacity")
+    location: str | None = Field(None, description="Location")
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
 
 
 class Class(Gathering):
     """Class model extending Gathering."""
-    class_code: Optional[str] = Field(None, description="Class code")
-    grade_level: Optional[int] = Field(None, ge=1, le=12, description="Grade level")
+    class_code: str | None = Field(None, description="Class code")
+    grade_level: int | None = Field(None, ge=1, le=12, description="Grade level")
     academic_year: str = Field(..., description="Academic year (e.g., 2024-2025)")
-    semester: Optional[str] = Field(None, description="Semester")
-    schedule: Optional[Dict[str, Any]] = Field(None, description="Class schedule")
-    
-    def __init__(self, **data):
-        if 'gathering_type' not in data:
-            data['gathering_type'] = GatheringTypeEnum.CLASS
-        super().__init__(**data)
+    semester: str | None = Field(None, description="Semester")
+    gathering_type: GatheringTypeEnum = Field(GatheringTypeEnum.CLASS, description="Type of gathering")
+    schedule: dict[str, Any] | None = Field(None, description="Class schedule")
 
 
 class ClassEnrollment(BaseModel):
     """Model for student enrollment in classes."""
-    id: Optional[str] = Field(None, description="Unique identifier")
+    id: str | None = Field(None, description="Unique identifier")
     student_id: str = Field(..., description="Student ID")
     class_id: str = Field(..., description="Class ID")
-    enrollment_date: datetime = Field(default_factory=datetime.utcnow)
+    enrollment_date: datetime = Field(default_factory=utcnow)
     is_active: bool = Field(True, description="Whether enrollment is active")
 
 
 class TeacherAssignment(BaseModel):
     """Model for teacher assignment to classes and subjects."""
-    id: Optional[str] = Field(None, description="Unique identifier")
+    id: str | None = Field(None, description="Unique identifier")
     teacher_id: str = Field(..., description="Teacher ID")
     class_id: str = Field(..., description="Class ID")
     subject: SubjectEnum = Field(..., description="Subject taught")
-    assignment_date: datetime = Field(default_factory=datetime.utcnow)
+    assignment_date: datetime = Field(default_factory=utcnow)
     is_active: bool = Field(True, description="Whether assignment is active")
 
 
 class Score(BaseModel):
     """Model for student scores/grades."""
-    id: Optional[str] = Field(None, description="Unique identifier")
+    id: str | None = Field(None, description="Unique identifier")
     student_id: str = Field(..., description="Student ID")
     class_id: str = Field(..., description="Class ID")
     subject: SubjectEnum = Field(..., description="Subject")
     score: float = Field(..., ge=0, le=100, description="Score (0-100)")
     max_score: float = Field(100, ge=1, description="Maximum possible score")
     assessment_type: str = Field(..., description="Type of assessment (exam, quiz, assignment, etc.)")
-    assessment_date: datetime = Field(default_factory=datetime.utcnow)
-    teacher_id: Optional[str] = Field(None, description="Teacher who assigned the score")
-    comments: Optional[str] = Field(None, description="Additional comments")
+    assessment_date: datetime = Field(default_factory=utcnow)
+    teacher_id: str | None = Field(None, description="Teacher who assigned the score")
+    comments: str | None = Field(None, description="Additional comments")
 
 
 class BulkOperation(BaseModel):
     """Model for bulk operations."""
     operation_type: str = Field(..., description="Type of operation (create, update, delete)")
     entity_type: str = Field(..., description="Type of entity (student, teacher, class, etc.)")
-    data: List[Dict[str, Any]] = Field(..., description="List of data for bulk operation")
+    data: list[dict[str, Any]] = Field(..., description="List of data for bulk operation")
     batch_size: int = Field(100, ge=1, le=1000, description="Batch size for processing")
+    on_error: Literal["abort", "split_retry"] | None = Field(
+        None,
+        description=(
+            "When a batch fails: 'abort' rolls the whole batch back (PostgreSQL only), "
+            "'split_retry' retries it in halves to keep the good rows. Unset uses the "
+            "backend's own behaviour: abort on PostgreSQL, row by row on MongoDB and Elasticsearch"
+        )
+    )
+    ignore_missing: bool = Field(
+        False, description="For deletes, count ids that no longer exist as deleted instead of failed"
+    )
 
 
 class AggregateQuery(BaseModel):
     """Model for aggregate queries."""
     query_type: str = Field(..., description="Type of aggregate query")
-    filters: Optional[Dict[str, Any]] = Field(None, description="Filters to apply")
-    group_by: Optional[List[str]] = Field(None, description="Fields to group by")
-    sort_by: Optional[str] = Field(None, description="Field to sort by")
+    filters: dict[str, Any] | None = Field(None, description="Filters to apply")
+    group_by: list[str] | None = Field(None, description="Fields to group by")
+    sort_by: str | None = Field(None, description="Field to sort by")
     sort_order: str = Field("asc", description="Sort order (asc/desc)")
-    limit: Optional[int] = Field(None, ge=1, description="Limit results")
+    limit: int | None = Field(None, ge=1, description="Limit results")
+    after: list[Any] | None = Field(
+        None, description="Keyset cursor from the previous page: [sort_by value, id], or [id] when unsorted"
+    )
 
 
 # Response models
+#
+# Response objects are created for every call, so they declare empty
+# __slots__: pydantic keeps field values in its own storage, and this drops
+# the per-instance __weakref__ slot a plain subclass would add.
 class PersonResponse(BaseModel):
     """Response model for person operations."""
+    __slots__ = ()
     success: bool
     message: str
-    data: Optional[Union[Person, Student, Teacher]] = None
-    errors: Optional[List[str]] = None
+    data: Person | Student | Teacher | None = None
+    errors: list[str] | None = None
 
 
 class ClassResponse(BaseModel):
     """Response model for class operations."""
+    __slots__ = ()
     success: bool
     message: str
-    data: Optional[Class] = None
-    errors: Optional[List[str]] = None
+    data: Class | None = None
+    errors: list[str] | None = None
 
 
 class BulkOperationResponse(BaseModel):
     """Response model for bulk operations."""
+    __slots__ = ()
     success: bool
     message: str
     total_processed: int
     successful: int
     failed: int
-    errors: Optional[List[str]] = None
+    errors: list[str] | None = None
 
 
 class AggregateResponse(BaseModel):
     """Response model for aggregate queries."""
+    __slots__ = ()
     success: bool
     message: str
-    data: Optional[Dict[str, Any]] = None
-    count: Optional[int] = None
-    errors: Optional[List[str]] = None
+    data: dict[str, Any] | None = None
+    count: int | None = None
+    errors: list[str] | None = None
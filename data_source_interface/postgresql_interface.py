@@ -2,32 +2,740 @@
 PostgreSQL implementation of the database interface.
 """
 
-import json
+import contextlib
+import functools
+import os
 import uuid
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+from datetime import datetime, time
+from operator import attrgetter
+from time import time_ns
+from typing import List, Dict, Any, NamedTuple, Optional, AsyncIterator, Union
 
-from .database_interface import DatabaseInterface
+import orjson
+from cachetools import TTLCache
+
+from .database_interface import CLASS_OVERVIEW_KEYS, DatabaseInterface, cursor_sort_value, next_page_cursor
 from .models import (
     Person, Student, Teacher, Class, ClassEnrollment, 
     TeacherAssignment, Score, BulkOperation, AggregateQuery,
-    PersonResponse, ClassResponse, BulkOperationResponse, AggregateResponse
+    PersonResponse, ClassResponse, BulkOperationResponse, AggregateResponse,
+    GatheringTypeEnum, utcnow
 )
 
 
+# add_students_to_class switches from an array parameter to COPY at this size
+ENROLLMENT_COPY_THRESHOLD = 200
+
+# add_scores_to_students switches from executemany to COPY above this size
+SCORE_COPY_THRESHOLD = 500
+
+# Rows fetched per cursor round trip by the aggregate queries
+AGGREGATE_PREFETCH = 1000
+
+# bulk_operation loads creates of at least this many rows with binary COPY
+BULK_COPY_THRESHOLD = 200
+
+# Pools shared by every PostgreSQLInterface in the process, keyed by their
+# settings: key -> [pool, number of connected interfaces]
+_SHARED_POOLS: Dict[tuple, list] = {}
+
+# Advisory lock key held while _create_tables applies the schema
+_SCHEMA_LOCK_ID = 4242
+
+_SCHEMA_SQL = """
+-- Create persons table
+CREATE TABLE IF NOT EXISTS persons (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    first_name VARCHAR(100) NOT NULL,
+    last_name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    phone VARCHAR(20),
+    date_of_birth DATE,
+    address TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create students table
+CREATE TABLE IF NOT EXISTS students (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    first_name VARCHAR(100) NOT NULL,
+    last_name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    phone VARCHAR(20),
+    date_of_birth DATE,
+    address TEXT,
+    student_id VARCHAR(50) UNIQUE,
+    grade_level INTEGER CHECK (grade_level >= 1 AND grade_level <= 12),
+    enrollment_date TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    is_active BOOLEAN DEFAULT TRUE,
+    guardian_contact TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create teachers table
+CREATE TABLE IF NOT EXISTS teachers (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    first_name VARCHAR(100) NOT NULL,
+    last_name VARCHAR(100) NOT NULL,
+    email VARCHAR(255) UNIQUE NOT NULL,
+    phone VARCHAR(20),
+    date_of_birth DATE,
+    address TEXT,
+    employee_id VARCHAR(50) UNIQUE,
+    subjects TEXT[], -- Array of subjects
+    hire_date TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    is_active BOOLEAN DEFAULT TRUE,
+    department VARCHAR(100),
+    qualification TEXT,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create classes table
+CREATE TABLE IF NOT EXISTS classes (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    name VARCHAR(200) NOT NULL,
+    description TEXT,
+    gathering_type VARCHAR(50) NOT NULL DEFAULT 'class',
+    capacity INTEGER CHECK (capacity > 0),
+    location VARCHAR(200),
+    class_code VARCHAR(50) UNIQUE,
+    grade_level INTEGER CHECK (grade_level >= 1 AND grade_level <= 12),
+    academic_year VARCHAR(20) NOT NULL,
+    semester VARCHAR(20),
+    schedule JSONB,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Create class_enrollments table
+CREATE TABLE IF NOT EXISTS class_enrollments (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    student_id UUID NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+    class_id UUID NOT NULL REFERENCES classes(id) ON DELETE CASCADE,
+    enrollment_date TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    is_active BOOLEAN DEFAULT TRUE,
+    UNIQUE(student_id, class_id)
+);
+
+-- Create teacher_assignments table
+CREATE TABLE IF NOT EXISTS teacher_assignments (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    teacher_id UUID NOT NULL REFERENCES teachers(id) ON DELETE CASCADE,
+    class_id UUID NOT NULL REFERENCES classes(id) ON DELETE CASCADE,
+    subject VARCHAR(100) NOT NULL,
+    assignment_date TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    is_active BOOLEAN DEFAULT TRUE,
+    UNIQUE(teacher_id, class_id, subject)
+);
+
+-- Create scores table
+CREATE TABLE IF NOT EXISTS scores (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    student_id UUID NOT NULL REFERENCES students(id) ON DELETE CASCADE,
+    class_id UUID NOT NULL REFERENCES classes(id) ON DELETE CASCADE,
+    subject VARCHAR(100) NOT NULL,
+    score DECIMAL(5,2) NOT NULL CHECK (score >= 0 AND score <= 100),
+    max_score DECIMAL(5,2) NOT NULL DEFAULT 100 CHECK (max_score > 0),
+    assessment_type VARCHAR(100) NOT NULL,
+    assessment_date TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    teacher_id UUID REFERENCES teachers(id),
+    comments TEXT
+);
+
+-- Create indexes for better performance
+CREATE INDEX IF NOT EXISTS idx_students_email ON students(email);
+CREATE INDEX IF NOT EXISTS idx_teachers_email ON teachers(email);
+CREATE INDEX IF NOT EXISTS idx_classes_academic_year ON classes(academic_year);
+CREATE INDEX IF NOT EXISTS idx_class_enrollments_student_id ON class_enrollments(student_id);
+CREATE INDEX IF NOT EXISTS idx_class_enrollments_class_id ON class_enrollments(class_id);
+CREATE INDEX IF NOT EXISTS idx_teacher_assignments_teacher_id ON teacher_assignments(teacher_id);
+CREATE INDEX IF NOT EXISTS idx_teacher_assignments_class_id ON teacher_assignments(class_id);
+CREATE INDEX IF NOT EXISTS idx_scores_student_id ON scores(student_id);
+CREATE INDEX IF NOT EXISTS idx_scores_subject ON scores(subject);
+
+-- Covering indexes for the per-class aggregates: active enrollments and
+-- assignments are partial indexes, and scores carry the averaged column,
+-- so the aggregate joins can be answered with index-only scans
+CREATE INDEX IF NOT EXISTS idx_class_enrollments_active_class
+    ON class_enrollments(class_id) INCLUDE (student_id) WHERE is_active = true;
+CREATE INDEX IF NOT EXISTS idx_teacher_assignments_active_class
+    ON teacher_assignments(class_id) INCLUDE (teacher_id, subject) WHERE is_active = true;
+CREATE INDEX IF NOT EXISTS idx_scores_class_score ON scores(class_id) INCLUDE (score);
+
+-- Keyset pagination in aggregate_query walks (sort column, id) in order;
+-- these cover the name and creation-time sorts
+CREATE INDEX IF NOT EXISTS idx_students_last_name_id ON students(last_name, id);
+CREATE INDEX IF NOT EXISTS idx_students_created_at_id ON students(created_at, id);
+"""
+
+# The schema is applied as one implicit transaction, so its last object
+# existing means all of it does; keep this pointing at the final statement.
+# The name is unqualified so it resolves in the interface's schema.
+_SCHEMA_PROBE_SQL = "SELECT to_regclass('idx_students_created_at_id') IS NOT NULL"
+
+# Column values read straight off each model, in the order the INSERT and
+# UPDATE statements bind them between id and the timestamps
+_PERSON_COLUMNS = ('first_name', 'last_name', 'email', 'phone', 'date_of_birth', 'address')
+_STUDENT_COLUMNS = (*_PERSON_COLUMNS, 'student_id', 'grade_level', 'enrollment_date',
+                    'is_active', 'guardian_contact')
+_TEACHER_COLUMNS = (*_PERSON_COLUMNS, 'employee_id', 'subjects', 'hire_date',
+                    'is_active', 'department', 'qualification')
+_CLASS_COLUMNS = ('name', 'description', 'gathering_type', 'capacity', 'location',
+                  'class_code', 'grade_level', 'academic_year', 'semester', 'schedule')
+_PERSON_FIELDS = attrgetter(*_PERSON_COLUMNS)
+_STUDENT_FIELDS = attrgetter(*_STUDENT_COLUMNS)
+_TEACHER_FIELDS = attrgetter(*_TEACHER_COLUMNS)
+_CLASS_FIELDS = attrgetter(*_CLASS_COLUMNS)
+_SCORE_COLUMNS = ('student_id', 'class_id', 'subject', 'score', 'max_score',
+                  'assessment_type', 'assessment_date', 'teacher_id', 'comments')
+_SCORE_FIELDS = attrgetter(*_SCORE_COLUMNS)
+_SCORE_COPY_COLUMNS = ['id', *_SCORE_COLUMNS]
+
+
+# Statement text is kept at module level so every call sends the identical
+# string, which is also the key of asyncpg's prepared statement cache.
+# INSERTs bind the model's id as $1 and let the server generate one when
+# it is NULL.
+_SQL_GET_BY_IDS = {
+    table: f"SELECT * FROM {table} WHERE id = ANY($1::uuid[])"
+    for table in ('persons', 'students', 'teachers', 'classes')
+}
+
+_SQL_CREATE_PERSON = """
+INSERT INTO persons (id, first_name, last_name, email, phone, date_of_birth, address, created_at, updated_at)
+VALUES (COALESCE($1, gen_random_uuid()), $2, $3, $4, $5, $6, $7, $8, $9)
+RETURNING *
+"""
+
+_SQL_CREATE_STUDENT = """
+INSERT INTO students (id, first_name, last_name, email, phone, date_of_birth, address,
+                    student_id, grade_level, enrollment_date, is_active, guardian_contact,
+                    created_at, updated_at)
+VALUES (COALESCE($1, gen_random_uuid()), $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+RETURNING *
+"""
+
+_SQL_CREATE_TEACHER = """
+INSERT INTO teachers (id, first_name, last_name, email, phone, date_of_birth, address,
+                    employee_id, subjects, hire_date, is_active, department, qualification,
+                    created_at, updated_at)
+VALUES (COALESCE($1, gen_random_uuid()), $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
+RETURNING *
+"""
+
+_SQL_CREATE_CLASS = """
+INSERT INTO classes (id, name, description, gathering_type, capacity, location,
+                   class_code, grade_level, academic_year, semester, schedule,
+                   created_at, updated_at)
+VALUES (COALESCE($1, gen_random_uuid()), $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
+RETURNING *
+"""
+
+# Partial updates: a NULL parameter leaves its column unchanged
+_SQL_UPDATE_PERSON = """
+UPDATE persons
+SET first_name = COALESCE($2, first_name), last_name = COALESCE($3, last_name),
+    email = COALESCE($4, email), phone = COALESCE($5, phone),
+    date_of_birth = COALESCE($6, date_of_birth), address = COALESCE($7, address),
+    updated_at = $8
+WHERE id = $1
+RETURNING *
+"""
+
+_SQL_UPDATE_STUDENT = """
+UPDATE students
+SET first_name = COALESCE($2, first_name), last_name = COALESCE($3, last_name),
+    email = COALESCE($4, email), phone = COALESCE($5, phone),
+    date_of_birth = COALESCE($6, date_of_birth), address = COALESCE($7, address),
+    student_id = COALESCE($8, student_id), grade_level = COALESCE($9, grade_level),
+    enrollment_date = COALESCE($10, enrollment_date),
+    is_active = COALESCE($11, is_active),
+    guardian_contact = COALESCE($12, guardian_contact), updated_at = $13
+WHERE id = $1
+RETURNING *
+"""
+
+_SQL_UPDATE_TEACHER = """
+UPDATE teachers
+SET first_name = COALESCE($2, first_name), last_name = COALESCE($3, last_name),
+    email = COALESCE($4, email), phone = COALESCE($5, phone),
+    date_of_birth = COALESCE($6, date_of_birth), address = COALESCE($7, address),
+    employee_id = COALESCE($8, employee_id), subjects = COALESCE($9, subjects),
+    hire_date = COALESCE($10, hire_date), is_active = COALESCE($11, is_active),
+    department = COALESCE($12, department), qualification = COALESCE($13, qualification),
+    updated_at = $14
+WHERE id = $1
+RETURNING *
+"""
+
+_SQL_UPDATE_CLASS = """
+UPDATE classes
+SET name = COALESCE($2, name), description = COALESCE($3, description),
+    gathering_type = COALESCE($4, gathering_type), capacity = COALESCE($5, capacity),
+    location = COALESCE($6, location), class_code = COALESCE($7, class_code),
+    grade_level = COALESCE($8, grade_level), academic_year = COALESCE($9, academic_year),
+    semester = COALESCE($10, semester), schedule = COALESCE($11, schedule),
+    updated_at = $12
+WHERE id = $1
+RETURNING *
+"""
+
+_SQL_DELETE_PERSON = "DELETE FROM persons WHERE id = $1 RETURNING id"
+
+_SQL_DELETE_STUDENT = "DELETE FROM students WHERE id = $1 RETURNING id"
+
+_SQL_DELETE_TEACHER = "DELETE FROM teachers WHERE id = $1 RETURNING id"
+
+_SQL_DELETE_CLASS = "DELETE FROM classes WHERE id = $1 RETURNING id"
+
+_SQL_ASSIGN_TEACHER = """
+INSERT INTO teacher_assignments (teacher_id, class_id, subject, assignment_date, is_active)
+VALUES ($1, $2, $3, $4, $5)
+"""
+
+# One row per subject, all bound as a single text[] parameter
+_SQL_ASSIGN_TEACHER_SUBJECTS = """
+INSERT INTO teacher_assignments (teacher_id, class_id, subject, assignment_date, is_active)
+SELECT $1::uuid, $2::uuid, subject, $4::timestamptz, true FROM unnest($3::text[]) AS subject
+"""
+
+_SQL_INSERT_STUDENTS = """
+INSERT INTO students (id, first_name, last_name, email, phone, date_of_birth, address,
+                    student_id, grade_level, enrollment_date, is_active, guardian_contact,
+                    created_at, updated_at)
+VALUES (COALESCE($1, gen_random_uuid()), $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
+"""
+
+# Scores are bound column-wise: one array per column, so a whole batch is a
+# single Bind message that asyncpg encodes one column at a time
+_SQL_INSERT_SCORES = """
+INSERT INTO scores (id, student_id, class_id, subject, score, max_score,
+                  assessment_type, assessment_date, teacher_id, comments)
+SELECT COALESCE(id, gen_random_uuid()), student_id, class_id, subject, score, max_score,
+       assessment_type, assessment_date, teacher_id, comments
+FROM unnest($1::uuid[], $2::uuid[], $3::uuid[], $4::text[], $5::float8[], $6::float8[],
+            $7::text[], $8::timestamptz[], $9::uuid[], $10::text[])
+    AS s(id, student_id, class_id, subject, score, max_score,
+         assessment_type, assessment_date, teacher_id, comments)
+"""
+
+# One statement enrolls every existing student; ids that are unknown or
+# already enrolled are skipped and come back as failures by diffing
+# against RETURNING
+_SQL_ENROLL_STUDENTS = """
+INSERT INTO class_enrollments (id, student_id, class_id, enrollment_date, is_active)
+SELECT gen_random_uuid(), s.id, $2::uuid, $3, TRUE
+FROM students s
+WHERE s.id = ANY($1::uuid[])
+ON CONFLICT (student_id, class_id) DO NOTHING
+RETURNING student_id
+"""
+
+# Large lists are streamed into a temp table with COPY instead of being
+# bound as one array parameter
+_SQL_CREATE_ENROLLMENT_STAGE = "CREATE TEMP TABLE enrollment_stage (student_id UUID) ON COMMIT DROP"
+_SQL_ENROLL_STAGED = """
+INSERT INTO class_enrollments (id, student_id, class_id, enrollment_date, is_active)
+SELECT gen_random_uuid(), s.id, $1::uuid, $2, TRUE
+FROM students s
+WHERE s.id IN (SELECT student_id FROM enrollment_stage)
+ON CONFLICT (student_id, class_id) DO NOTHING
+RETURNING student_id
+"""
+
+
+# Class, enrollments and teacher assignment in one statement: the CTEs run
+# atomically in a single round trip, and foreign keys to the new class are
+# checked once the whole statement has finished
+_SQL_CREATE_CLASS_WITH_ROSTER = """
+WITH new_class AS (
+    INSERT INTO classes (id, name, description, gathering_type, capacity, location,
+                       class_code, grade_level, academic_year, semester, schedule,
+                       created_at, updated_at)
+    VALUES (COALESCE($1, gen_random_uuid()), $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
+    RETURNING *
+), enrolled AS (
+    INSERT INTO class_enrollments (id, student_id, class_id, enrollment_date, is_active)
+    SELECT gen_random_uuid(), s.id, new_class.id, $13, TRUE
+    FROM students s, new_class
+    WHERE s.id = ANY($14::uuid[])
+    RETURNING student_id
+), assigned AS (
+    INSERT INTO teacher_assignments (id, teacher_id, class_id, subject, assignment_date, is_active)
+    SELECT gen_random_uuid(), $15::uuid, new_class.id, $16, $13, TRUE
+    FROM new_class
+    WHERE $15::uuid IS NOT NULL
+)
+SELECT new_class.*, ARRAY(SELECT student_id FROM enrolled) AS enrolled_ids
+FROM new_class
+"""
+
+
+def _per_class_sql(select: str) -> tuple:
+    """All-classes and single-class statements for a per-class aggregate."""
+    tail = "GROUP BY c.id, c.name ORDER BY c.name"
+    return select + tail, select + "WHERE c.id = $1\n" + tail
+
+
+# Per-class aggregates, as (all classes, one class) pairs so each variant
+# is fixed text that asyncpg's statement cache prepares once per connection.
+# Nested lists are built with JSONB_AGG so each class row carries one jsonb
+# value, decoded by a single orjson call, rather than an array of json
+# elements decoded one at a time. The FILTER drops the all-NULL row a LEFT
+# JOIN yields for a class with nothing to join, so an empty class gets empty
+# lists, the same shape _SQL_CLASS_OVERVIEW returns.
+_SQL_STUDENTS_PER_CLASS = _per_class_sql("""
+SELECT
+    c.id as class_id,
+    c.name as class_name,
+    COUNT(s.id) as student_count,
+    COALESCE(JSONB_AGG(
+        JSONB_BUILD_OBJECT(
+            'id', s.id,
+            'first_name', s.first_name,
+            'last_name', s.last_name,
+            'email', s.email
+        )
+    ) FILTER (WHERE s.id IS NOT NULL), '[]'::jsonb) as students
+FROM classes c
+LEFT JOIN class_enrollments ce ON c.id = ce.class_id AND ce.is_active = true
+LEFT JOIN students s ON ce.student_id = s.id
+""")
+
+# Counts only: no students join and no per-class jsonb to build or decode
+# count_only rows carry the class id and student_count alone, as MongoDB's do
+_SQL_STUDENT_COUNT_PER_CLASS = _per_class_sql("""
+SELECT
+    c.id as class_id,
+    COUNT(ce.student_id) as student_count
+FROM classes c
+LEFT JOIN class_enrollments ce ON c.id = ce.class_id AND ce.is_active = true
+""")
+
+_SQL_AVG_SCORE_PER_CLASS = _per_class_sql("""
+SELECT
+    c.id as class_id,
+    c.name as class_name,
+    AVG(sc.score) as average_score,
+    COUNT(sc.id) as total_scores
+FROM classes c
+LEFT JOIN scores sc ON c.id = sc.class_id
+""")
+
+_SQL_TEACHERS_PER_CLASS = _per_class_sql("""
+SELECT
+    c.id as class_id,
+    c.name as class_name,
+    COUNT(DISTINCT t.id) as teacher_count,
+    COALESCE(JSONB_AGG(
+        DISTINCT JSONB_BUILD_OBJECT(
+            'teacher', JSONB_BUILD_OBJECT(
+                'id', t.id,
+                'first_name', t.first_name,
+                'last_name', t.last_name,
+                'email', t.email
+            ),
+            'subject', ta.subject
+        )
+    ) FILTER (WHERE t.id IS NOT NULL), '[]'::jsonb) as teachers
+FROM classes c
+LEFT JOIN teacher_assignments ta ON c.id = ta.class_id AND ta.is_active = true
+LEFT JOIN teachers t ON ta.teacher_id = t.id
+""")
+
+_SQL_SUBJECTS_PER_CLASS = _per_class_sql("""
+SELECT
+    c.id as class_id,
+    c.name as class_name,
+    COALESCE(ARRAY_AGG(DISTINCT ta.subject) FILTER (WHERE ta.subject IS NOT NULL), '{}') as subjects,
+    COUNT(DISTINCT ta.subject) as subject_count
+FROM classes c
+LEFT JOIN teacher_assignments ta ON c.id = ta.class_id AND ta.is_active = true
+""")
+
+# All four per-class aggregates in one statement: one scan of classes, with
+# each aggregate computed by a LATERAL subquery over that class's rows.
+_SQL_CLASS_OVERVIEW_SELECT = """
+SELECT
+    b.id as class_id,
+    b.name as class_name,
+    st.student_count,
+    st.students,
+    sc.average_score,
+    sc.total_scores,
+    te.teacher_count,
+    te.teachers,
+    te.subjects,
+    te.subject_count
+FROM base b
+CROSS JOIN LATERAL (
+    SELECT
+        COUNT(s.id) as student_count,
+        COALESCE(JSONB_AGG(
+            JSONB_BUILD_OBJECT(
+                'id', s.id,
+                'first_name', s.first_name,
+                'last_name', s.last_name,
+                'email', s.email
+            )
+        ), '[]'::jsonb) as students
+    FROM class_enrollments ce
+    JOIN students s ON ce.student_id = s.id
+    WHERE ce.class_id = b.id AND ce.is_active = true
+) st
+CROSS JOIN LATERAL (
+    SELECT AVG(score) as average_score, COUNT(*) as total_scores
+    FROM scores
+    WHERE class_id = b.id
+) sc
+CROSS JOIN LATERAL (
+    SELECT
+        COUNT(DISTINCT ta.teacher_id) as teacher_count,
+        COALESCE(JSONB_AGG(
+            DISTINCT JSONB_BUILD_OBJECT(
+                'teacher', JSONB_BUILD_OBJECT(
+                    'id', t.id,
+                    'first_name', t.first_name,
+                    'last_name', t.last_name,
+                    'email', t.email
+                ),
+                'subject', ta.subject
+            )
+        ), '[]'::jsonb) as teachers,
+        COALESCE(ARRAY_AGG(DISTINCT ta.subject), '{}') as subjects,
+        COUNT(DISTINCT ta.subject) as subject_count
+    FROM teacher_assignments ta
+    JOIN teachers t ON ta.teacher_id = t.id
+    WHERE ta.class_id = b.id AND ta.is_active = true
+) te
+ORDER BY b.name
+"""
+_SQL_CLASS_OVERVIEW = (
+    "WITH base AS (SELECT id, name FROM classes)" + _SQL_CLASS_OVERVIEW_SELECT,
+    "WITH base AS (SELECT id, name FROM classes WHERE id = $1)" + _SQL_CLASS_OVERVIEW_SELECT,
+)
+
+# Columns of an overview row that make up each per-class aggregate's row,
+# in CLASS_OVERVIEW_KEYS order
+_CLASS_OVERVIEW_COLUMNS = (
+    ('class_id', 'class_name', 'student_count', 'students'),
+    ('class_id', 'class_name', 'average_score', 'total_scores'),
+    ('class_id', 'class_name', 'teacher_count', 'teachers'),
+    ('class_id', 'class_name', 'subjects', 'subject_count'),
+)
+
+
+class _TableSpec(NamedTuple):
+    """How one entity maps onto its table, statements and response type."""
+    table: str
+    label: str
+    model: type
+    response: type
+    columns: tuple
+    fields: attrgetter
+    insert_sql: str
+    update_sql: str
+    delete_sql: str
+    bulk_delete_sql: str
+    bulk_lock_sql: str
+
+
+_PERSONS = _TableSpec('persons', 'Person', Person, PersonResponse, _PERSON_COLUMNS, _PERSON_FIELDS,
+                      _SQL_CREATE_PERSON, _SQL_UPDATE_PERSON, _SQL_DELETE_PERSON,
+                      "DELETE FROM persons WHERE id = ANY($1::uuid[]) RETURNING id",
+                      "SELECT id FROM persons WHERE id = ANY($1::uuid[]) FOR UPDATE")
+_STUDENTS = _TableSpec('students', 'Student', Student, PersonResponse, _STUDENT_COLUMNS, _STUDENT_FIELDS,
+                       _SQL_CREATE_STUDENT, _SQL_UPDATE_STUDENT, _SQL_DELETE_STUDENT,
+                       "DELETE FROM students WHERE id = ANY($1::uuid[]) RETURNING id",
+                       "SELECT id FROM students WHERE id = ANY($1::uuid[]) FOR UPDATE")
+_TEACHERS = _TableSpec('teachers', 'Teacher', Teacher, PersonResponse, _TEACHER_COLUMNS, _TEACHER_FIELDS,
+                       _SQL_CREATE_TEACHER, _SQL_UPDATE_TEACHER, _SQL_DELETE_TEACHER,
+                       "DELETE FROM teachers WHERE id = ANY($1::uuid[]) RETURNING id",
+                       "SELECT id FROM teachers WHERE id = ANY($1::uuid[]) FOR UPDATE")
+_CLASSES = _TableSpec('classes', 'Class', Class, ClassResponse, _CLASS_COLUMNS, _CLASS_FIELDS,
+                      _SQL_CREATE_CLASS, _SQL_UPDATE_CLASS, _SQL_DELETE_CLASS,
+                      "DELETE FROM classes WHERE id = ANY($1::uuid[]) RETURNING id",
+                      "SELECT id FROM classes WHERE id = ANY($1::uuid[]) FOR UPDATE")
+
+# bulk_operation entity_type -> table spec
+_BULK_SPECS = {'person': _PERSONS, 'student': _STUDENTS, 'teacher': _TEACHERS, 'class': _CLASSES}
+
+# Tables bulk creates may COPY into; classes.schedule is jsonb, whose codec
+# on the pool is text-format and cannot be used by binary COPY
+_COPY_TABLES = {'persons', 'students', 'teachers'}
+
+
+@functools.lru_cache(maxsize=64)
+def _multirow_insert_sql(spec: _TableSpec, rows: int) -> str:
+    """INSERT of `rows` entities in one statement; cached per table and row count."""
+    width = len(spec.columns) + 3
+    values = ",\n".join(
+        "(COALESCE(${}, gen_random_uuid()), {})".format(
+            row * width + 1, ", ".join(f"${row * width + col}" for col in range(2, width + 1))
+        )
+        for row in range(rows)
+    )
+    return (f"INSERT INTO {spec.table} (id, {', '.join(spec.columns)}, created_at, updated_at)\n"
+            f"VALUES {values}")
+
+
+# Columns aggregate_query may filter or sort on
+_AGGREGATE_COLUMNS = frozenset(('id', *_STUDENT_COLUMNS, 'created_at', 'updated_at'))
+
+
+@functools.lru_cache(maxsize=256)
+def _aggregate_sql(filter_keys: tuple, sort_by: Optional[str], descending: bool,
+                   limited: bool, keyset: bool) -> str:
+    """
+    aggregate_query statement for one shape of query; cached so the text is
+    built once. Parameters are the filter values in filter_keys order, then
+    the keyset cursor values, then the limit.
+    """
+    sql_parts = ["SELECT * FROM students"]
+    conditions = [f"{column} = ${position}" for position, column in enumerate(filter_keys, 1)]
+    position = len(filter_keys) + 1
+    direction = 'DESC' if descending else 'ASC'
+    if keyset:
+        # Rows past the previous page's last (sort_by, id) in sort order
+        past = '<' if descending else '>'
+        if sort_by:
+            conditions.append(f"({sort_by}, id) {past} (${position}, ${position + 1})")
+            position += 2
+        else:
+            conditions.append(f"id {past} ${position}")
+            position += 1
+    if conditions:
+        sql_parts.append(f"WHERE {' AND '.join(conditions)}")
+    if sort_by:
+        # id breaks ties so every page boundary is a unique position
+        sql_parts.append(f"ORDER BY {sort_by} {direction}, id {direction}")
+    elif keyset:
+        sql_parts.append(f"ORDER BY id {direction}")
+    if limited:
+        sql_parts.append(f"LIMIT ${position}")
+    return " ".join(sql_parts)
+
+
+def _partial(model_cls, data: Dict[str, Any]) -> Any:
+    """Validate only the fields present in data; the rest stay unset for the partial UPDATE."""
+    obj = model_cls.model_construct(_fields_set=set())
+    for name, value in data.items():
+        if name in model_cls.model_fields:
+            model_cls.__pydantic_validator__.validate_assignment(obj, name, value)
+    return obj
+
+
+_UUID7_VERSION = 7 << 76
+_UUID7_VARIANT = 0b10 << 62
+_LOW_62_BITS = (1 << 62) - 1
+
+
+def _uuid7_batch(count: int) -> List[uuid.UUID]:
+    """
+    `count` time-ordered (version 7) UUIDs from one clock read and one
+    random draw. They increase through the batch, so bulk loads append to
+    the primary key index rather than dirtying pages all over it.
+    """
+    timestamp = (time_ns() // 1_000_000) << 80
+    # 73 random bits leave headroom to count up in the 74-bit random field
+    start = int.from_bytes(os.urandom(10), 'big') >> 7
+    return [
+        uuid.UUID(int=timestamp | _UUID7_VERSION | (n >> 62) << 64 | _UUID7_VARIANT | (n & _LOW_62_BITS))
+        for n in range(start, start + count)
+    ]
+
+
+def _encode_json(value: Any) -> str:
+    return orjson.dumps(value).decode()
+
+
+async def _init_connection(conn) -> None:
+    """Encode and decode JSON/JSONB columns with orjson on every pooled connection."""
+    for type_name in ('json', 'jsonb'):
+        await conn.set_type_codec(
+            type_name, encoder=_encode_json, decoder=orjson.loads, schema='pg_catalog'
+        )
+
+
 class PostgreSQLInterface(DatabaseInterface):
     """PostgreSQL implementation of the database interface."""
     
-    def __init__(self, connection_string: str):
+    supports_bulk_abort = True
+    
+    def __init__(self, connection_string: str, min_size: int = 10, max_size: int = 50,
+                 max_inactive_connection_lifetime: float = 300, command_timeout: float = 30,
+                 statement_cache_size: int = 1024, max_cached_statement_lifetime: float = 300,
+                 cache_size: int = 10_000, cache_ttl: float = 0, schema: Optional[str] = None):
         self.connection_string = connection_string
+        # Tables live in this schema (created if missing) instead of public,
+        # so several interfaces can share one database without seeing each other's rows
+        self.schema = schema
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_inactive_connection_lifetime = max_inactive_connection_lifetime
+        self.command_timeout = command_timeout
+        self.statement_cache_size = statement_cache_size
+        # 0 keeps prepared statements for the life of the connection; lower it
+        # if a cached generic plan goes bad as the data changes
+        self.max_cached_statement_lifetime = max_cached_statement_lifetime
         self.pool = None
+        # Opt-in cache of models fetched by id, keyed by (table, id). update_*
+        # and delete_* evict their entry, but only in this process: writes made
+        # elsewhere stay invisible for up to cache_ttl seconds. Off by default.
+        self._cache: Optional[TTLCache] = (
+            TTLCache(maxsize=cache_size, ttl=cache_ttl) if cache_ttl > 0 else None
+        )
+    
+    def _pool_key(self) -> tuple:
+        return (self.connection_string, self.min_size, self.max_size,
+                self.max_inactive_connection_lifetime, self.command_timeout,
+                self.statement_cache_size, self.max_cached_statement_lifetime, self.schema)
     
     async def connect(self) -> bool:
         """Connect to PostgreSQL."""
         try:
             import asyncpg
-            self.pool = await asyncpg.create_pool(self.connection_string)
-            await self._create_tables()
+            # Interfaces with the same settings share one pool per process
+            shared = _SHARED_POOLS.get(self._pool_key())
+            if shared:
+                shared[1] += 1
+                self.pool = shared[0]
+                return True
+            
+            # CRUD statements are fixed SQL text, so asyncpg's per-connection
+            # statement cache prepares each one once and reuses the plan;
+            # size it to hold every statement the interface issues
+            pool = await asyncpg.create_pool(
+                self.connection_string,
+                min_size=self.min_size,
+                max_size=self.max_size,
+                max_inactive_connection_lifetime=self.max_inactive_connection_lifetime,
+                command_timeout=self.command_timeout,
+                statement_cache_size=self.statement_cache_size,
+                max_cached_statement_lifetime=self.max_cached_statement_lifetime,
+                init=_init_connection,
+                server_settings={'search_path': self.schema} if self.schema else None
+            )
+            # Apply the schema before sharing the pool, so an interface that
+            # picks it up from _SHARED_POOLS never sees missing tables
+            self.pool = pool
+            try:
+                await self._create_tables()
+            except BaseException:
+                self.pool = None
+                await pool.close()
+                raise
+            shared = _SHARED_POOLS.get(self._pool_key())
+            if shared:
+                # Another interface connected while this pool was opening
+                await pool.close()
+                shared[1] += 1
+                self.pool = shared[0]
+                return True
+            _SHARED_POOLS[self._pool_key()] = [pool, 1]
             return True
         except Exception as e:
             print(f"PostgreSQL connection error: {e}")
@@ -37,685 +745,340 @@ class PostgreSQLInterface(DatabaseInterface):
         """Disconnect from PostgreSQL."""
         try:
             if self.pool:
-                await self.pool.close()
+                pool, self.pool = self.pool, None
+                shared = _SHARED_POOLS.get(self._pool_key())
+                if shared and shared[0] is pool:
+                    shared[1] -= 1
+                    if shared[1] > 0:
+                        return True
+                    del _SHARED_POOLS[self._pool_key()]
+                await pool.close()
             return True
         except Exception as e:
             print(f"PostgreSQL disconnection error: {e}")
             return False
     
+    async def ping(self) -> bool:
+        """Ping PostgreSQL."""
+        async with self.pool.acquire() as conn:
+            await conn.fetchval('SELECT 1')
+        return True
+    
     async def _create_tables(self):
-        """Create tables with appropriate schemas."""
-        create_tables_sql = """
-        -- Create persons table
-        CREATE TABLE IF NOT EXISTS persons (
-            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-            first_name VARCHAR(100) NOT NULL,
-            last_name VARCHAR(100) NOT NULL,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            phone VARCHAR(20),
-            date_of_birth DATE,
-            address TEXT,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-        );
-        
-        -- Create students table
-        CREATE TABLE IF NOT EXISTS students (
-            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-            first_name VARCHAR(100) NOT NULL,
-            last_name VARCHAR(100) NOT NULL,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            phone VARCHAR(20),
-            date_of_birth DATE,
-            address TEXT,
-            student_id VARCHAR(50) UNIQUE,
-            grade_level INTEGER CHECK (grade_level >= 1 AND grade_level <= 12),
-            enrollment_date TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            is_active BOOLEAN DEFAULT TRUE,
-            guardian_contact TEXT,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-        );
-        
-        -- Create teachers table
-        CREATE TABLE IF NOT EXISTS teachers (
-            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-            first_name VARCHAR(100) NOT NULL,
-            last_name VARCHAR(100) NOT NULL,
-            email VARCHAR(255) UNIQUE NOT NULL,
-            phone VARCHAR(20),
-            date_of_birth DATE,
-            address TEXT,
-            employee_id VARCHAR(50) UNIQUE,
-            subjects TEXT[], -- Array of subjects
-            hire_date TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            is_active BOOLEAN DEFAULT TRUE,
-            department VARCHAR(100),
-            qualification TEXT,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-        );
-        
-        -- Create classes table
-        CREATE TABLE IF NOT EXISTS classes (
-            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-            name VARCHAR(200) NOT NULL,
-            description TEXT,
-            gathering_type VARCHAR(50) NOT NULL DEFAULT 'class',
-            capacity INTEGER CHECK (capacity > 0),
-            location VARCHAR(200),
-            class_code VARCHAR(50) UNIQUE,
-            grade_level INTEGER CHECK (grade_level >= 1 AND grade_level <= 12),
-            academic_year VARCHAR(20) NOT NULL,
-            semester VARCHAR(20),
-            schedule JSONB,
-            created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
-        );
-        
-        -- Create class_enrollments table
-        CREATE TABLE IF NOT EXISTS class_enrollments (
-            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-            student_id UUID NOT NULL REFERENCES students(id) ON DELETE CASCADE,
-            class_id UUID NOT NULL REFERENCES classes(id) ON DELETE CASCADE,
-            enrollment_date TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            is_active BOOLEAN DEFAULT TRUE,
-            UNIQUE(student_id, class_id)
-        );
-        
-        -- Create teacher_assignments table
-        CREATE TABLE IF NOT EXISTS teacher_assignments (
-            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-            teacher_id UUID NOT NULL REFERENCES teachers(id) ON DELETE CASCADE,
-            class_id UUID NOT NULL REFERENCES classes(id) ON DELETE CASCADE,
-            subject VARCHAR(100) NOT NULL,
-            assignment_date TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            is_active BOOLEAN DEFAULT TRUE,
-            UNIQUE(teacher_id, class_id, subject)
-        );
-        
-        -- Create scores table
-        CREATE TABLE IF NOT EXISTS scores (
-            id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
-            student_id UUID NOT NULL REFERENCES students(id) ON DELETE CASCADE,
-            class_id UUID NOT NULL REFERENCES classes(id) ON DELETE CASCADE,
-            subject VARCHAR(100) NOT NULL,
-            score DECIMAL(5,2) NOT NULL CHECK (score >= 0 AND score <= 100),
-            max_score DECIMAL(5,2) NOT NULL DEFAULT 100 CHECK (max_score > 0),
-            assessment_type VARCHAR(100) NOT NULL,
-            assessment_date TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
-            teacher_id UUID REFERENCES teachers(id),
-            comments TEXT
-        );
-        
-        -- Create indexes for better performance
-        CREATE INDEX IF NOT EXISTS idx_students_email ON students(email);
-        CREATE INDEX IF NOT EXISTS idx_teachers_email ON teachers(email);
-        CREATE INDEX IF NOT EXISTS idx_classes_academic_year ON classes(academic_year);
-        CREATE INDEX IF NOT EXISTS idx_class_enrollments_student_id ON class_enrollments(student_id);
-        CREATE INDEX IF NOT EXISTS idx_class_enrollments_class_id ON class_enrollments(class_id);
-        CREATE INDEX IF NOT EXISTS idx_teacher_assignments_teacher_id ON teacher_assignments(teacher_id);
-        CREATE INDEX IF NOT EXISTS idx_teacher_assignments_class_id ON teacher_assignments(class_id);
-        CREATE INDEX IF NOT EXISTS idx_scores_student_id ON scores(student_id);
-        CREATE INDEX IF NOT EXISTS idx_scores_class_id ON scores(class_id);
-        CREATE INDEX IF NOT EXISTS idx_scores_subject ON scores(subject);
-        """
-        
+        """Create tables with appropriate schemas unless they already exist."""
         async with self.pool.acquire() as conn:
-            await conn.execute(create_tables_sql)
+            if self.schema:
+                await conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{self.schema}"')
+            if await conn.fetchval(_SCHEMA_PROBE_SQL):
+                return
+            # Several workers may start against a fresh database at once;
+            # the lock makes them apply the DDL one at a time
+            await conn.execute("SELECT pg_advisory_lock($1)", _SCHEMA_LOCK_ID)
+            try:
+                await conn.execute(_SCHEMA_SQL)
+            finally:
+                await conn.execute("SELECT pg_advisory_unlock($1)", _SCHEMA_LOCK_ID)
     
-    def _generate_id(self) -> str:
-        """Generate a unique ID."""
-        return str(uuid.uuid4())
+    def _generate_id(self) -> uuid.UUID:
+        """Generate a unique, time-ordered ID (bound to UUID columns without a text round trip)."""
+        return _uuid7_batch(1)[0]
     
-    def _prepare_data(self, obj: Any) -> Dict[str, Any]:
-        """Prepare a Pydantic model for PostgreSQL storage."""
-        data = obj.dict()
-        if not data.get('id'):
-            data['id'] = self._generate_id()
-        data['updated_at'] = datetime.utcnow()
-        
-        # Convert datetime objects to strings for JSON serialization
-        for key, value in data.items():
-            if isinstance(value, datetime):
-                data[key] = value.isoformat()
+    def _insert_args(self, obj: Any, fields: attrgetter, now: Optional[datetime] = None) -> tuple:
+        """
+        INSERT bind arguments: id (None for a server-generated one), the
+        entity's fields, created_at, updated_at.
+
+        A bulk write passes one `now` for all its rows, which then becomes
+        both timestamps of every row.
+        """
+        if now is None:
+            return (obj.id, *fields(obj), obj.created_at, utcnow())
+        return (obj.id, *fields(obj), now, now)
+    
+    def _update_args(self, entity_id: Union[str, uuid.UUID], obj: Any, columns: tuple,
+                     now: Optional[datetime] = None) -> tuple:
+        """
+        UPDATE bind arguments: id, the entity's fields, updated_at.
+
+        Fields the caller did not set bind NULL, which the COALESCE in the
+        UPDATE statements turns into "keep the stored value".
+        """
+        fields_set = obj.model_fields_set
+        values = [getattr(obj, column) if column in fields_set else None for column in columns]
+        return (entity_id, *values, now or utcnow())
+    
+    @contextlib.asynccontextmanager
+    async def _connection(self, conn=None) -> AsyncIterator[Any]:
+        """
+        Yield `conn` if the caller already holds one, otherwise acquire a
+        pooled connection for the duration of the block.
+        """
+        if conn is not None:
+            yield conn
+        else:
+            async with self.pool.acquire() as acquired:
+                yield acquired
+    
+    def _to_model(self, model_cls, row) -> Any:
+        """
+        Build a model from a row without re-validating it.
+
+        Rows already satisfy the schema's constraints; only the id, DATE
+        columns and the gathering type enum differ from the model types and
+        are converted, on a single dict copy of the record.
+        """
+        data = dict(row)
+        # Entity tables have no UUID column other than their primary key
+        data['id'] = str(data['id'])
+        date_of_birth = data.get('date_of_birth')
+        if date_of_birth is not None:
+            data['date_of_birth'] = datetime.combine(date_of_birth, time())
+        if 'gathering_type' in data:
+            data['gathering_type'] = GatheringTypeEnum(data['gathering_type'])
+        return model_cls.model_construct(**data)
+    
+    async def _fetch_by_ids(self, table: str, model_cls, ids: List[Union[str, uuid.UUID]], conn=None) -> Dict[str, Any]:
+        """
+        Fetch rows of `table` for many ids in one round trip, keyed by id.
+
+        ids may be strings or UUIDs; asyncpg's UUID codec accepts both, so
+        they are bound unchanged rather than re-parsed in Python. Ids found
+        in the model cache are not sent to the database; callers get copies
+        of cached models, so mutating a result never changes the cache.
+        """
+        found = {}
+        missing = ids
+        if self._cache is not None:
+            missing = []
+            for entity_id in ids:
+                model = self._cache.get((table, str(entity_id).lower()))
+                if model is None:
+                    missing.append(entity_id)
+                else:
+                    found[model.id] = model.model_copy(deep=True)
+            if not missing:
+                return found
         
-        return data
+        async with self._connection(conn) as conn:
+            rows = await conn.fetch(_SQL_GET_BY_IDS[table], missing)
+        for row in rows:
+            model = self._to_model(model_cls, row)
+            found[model.id] = model
+            if self._cache is not None:
+                self._cache[(table, model.id)] = model.model_copy(deep=True)
+        return found
     
-    async def create_person(self, person: Person) -> PersonResponse:
-        """Create a new person in PostgreSQL."""
+    def _evict(self, table: str, entity_id: Union[str, uuid.UUID]):
+        """Drop a cached model after its row is updated or deleted."""
+        if self._cache is not None:
+            self._cache.pop((table, str(entity_id).lower()), None)
+    
+    def clear_cache(self) -> None:
+        """Drop every cached model."""
+        if self._cache is not None:
+            self._cache.clear()
+    
+    async def get_persons_by_ids(self, person_ids: List[str], conn=None) -> Dict[str, Person]:
+        """Fetch several persons in one round trip, keyed by id; unknown ids are omitted."""
+        return await self._fetch_by_ids('persons', Person, person_ids, conn)
+    
+    async def get_students_by_ids(self, student_ids: List[str], conn=None) -> Dict[str, Student]:
+        """Fetch several students in one round trip, keyed by id; unknown ids are omitted."""
+        return await self._fetch_by_ids('students', Student, student_ids, conn)
+    
+    async def get_teachers_by_ids(self, teacher_ids: List[str], conn=None) -> Dict[str, Teacher]:
+        """Fetch several teachers in one round trip, keyed by id; unknown ids are omitted."""
+        return await self._fetch_by_ids('teachers', Teacher, teacher_ids, conn)
+    
+    async def get_classes_by_ids(self, class_ids: List[str], conn=None) -> Dict[str, Class]:
+        """Fetch several classes in one round trip, keyed by id; unknown ids are omitted."""
+        return await self._fetch_by_ids('classes', Class, class_ids, conn)
+    
+    async def _create_entity(self, spec: _TableSpec, obj: Any):
+        """INSERT one entity and return the stored row as the spec's response."""
         try:
-            data = self._prepare_data(person)
-            
-            sql = """
-            INSERT INTO persons (id, first_name, last_name, email, phone, date_of_birth, address, created_at, updated_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
-            RETURNING *
-            """
-            
             async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    sql, 
-                    data['id'], data['first_name'], data['last_name'], data['email'],
-                    data.get('phone'), data.get('date_of_birth'), data.get('address'),
-                    data['created_at'], data['updated_at']
-                )
-                
-                return PersonResponse(
-                    success=True,
-                    message="Person created successfully",
-                    data=Person(**dict(row))
-                )
+                row = await conn.fetchrow(spec.insert_sql, *self._insert_args(obj, spec.fields))
+            return spec.response(
+                success=True,
+                message=f"{spec.label} created successfully",
+                data=self._to_model(spec.model, row)
+            )
         except Exception as e:
-            return PersonResponse(
+            return spec.response(
                 success=False,
-                message=f"Failed to create person: {str(e)}",
+                message=f"Failed to create {spec.label.lower()}: {str(e)}",
                 errors=[str(e)]
             )
     
-    async def create_student(self, student: Student) -> PersonResponse:
-        """Create a new student in PostgreSQL."""
+    async def _get_entity(self, spec: _TableSpec, entity_id: Union[str, uuid.UUID]):
+        """Fetch one entity by id through the cached batch getter."""
         try:
-            data = self._prepare_data(student)
-            
-            sql = """
-            INSERT INTO students (id, first_name, last_name, email, phone, date_of_birth, address, 
-                                student_id, grade_level, enrollment_date, is_active, guardian_contact, 
-                                created_at, updated_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
-            RETURNING *
-            """
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    sql,
-                    data['id'], data['first_name'], data['last_name'], data['email'],
-                    data.get('phone'), data.get('date_of_birth'), data.get('address'),
-                    data.get('student_id'), data.get('grade_level'), data['enrollment_date'],
-                    data['is_active'], data.get('guardian_contact'), data['created_at'], data['updated_at']
-                )
-                
-                return PersonResponse(
+            found = await self._fetch_by_ids(spec.table, spec.model, [entity_id])
+            if found:
+                return spec.response(
                     success=True,
-                    message="Student created successfully",
-                    data=Student(**dict(row))
+                    message=f"{spec.label} found",
+                    data=next(iter(found.values()))
+                )
+            else:
+                return spec.response(
+                    success=False,
+                    message=f"{spec.label} not found"
                 )
         except Exception as e:
-            return PersonResponse(
+            return spec.response(
                 success=False,
-                message=f"Failed to create student: {str(e)}",
+                message=f"Failed to get {spec.label.lower()}: {str(e)}",
                 errors=[str(e)]
             )
     
-    async def create_teacher(self, teacher: Teacher) -> PersonResponse:
-        """Create a new teacher in PostgreSQL."""
+    async def _update_entity(self, spec: _TableSpec, entity_id: Union[str, uuid.UUID], obj: Any):
+        """UPDATE the fields set on obj and evict the cached entity."""
         try:
-            data = self._prepare_data(teacher)
-            
-            sql = """
-            INSERT INTO teachers (id, first_name, last_name, email, phone, date_of_birth, address,
-                                employee_id, subjects, hire_date, is_active, department, qualification,
-                                created_at, updated_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15)
-            RETURNING *
-            """
-            
             async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    sql,
-                    data['id'], data['first_name'], data['last_name'], data['email'],
-                    data.get('phone'), data.get('date_of_birth'), data.get('address'),
-                    data.get('employee_id'), data.get('subjects', []), data['hire_date'],
-                    data['is_active'], data.get('department'), data.get('qualification'),
-                    data['created_at'], data['updated_at']
-                )
-                
-                return PersonResponse(
+                row = await conn.fetchrow(spec.update_sql, *self._update_args(entity_id, obj, spec.columns))
+            self._evict(spec.table, entity_id)
+            
+            if row:
+                return spec.response(
                     success=True,
-                    message="Teacher created successfully",
-                    data=Teacher(**dict(row))
+                    message=f"{spec.label} updated successfully",
+                    data=self._to_model(spec.model, row)
+                )
+            else:
+                return spec.response(
+                    success=False,
+                    message=f"{spec.label} not found"
                 )
         except Exception as e:
-            return PersonResponse(
+            return spec.response(
                 success=False,
-                message=f"Failed to create teacher: {str(e)}",
+                message=f"Failed to update {spec.label.lower()}: {str(e)}",
                 errors=[str(e)]
             )
     
-    async def create_class(self, class_obj: Class) -> ClassResponse:
-        """Create a new class in PostgreSQL."""
+    async def _delete_entity(self, spec: _TableSpec, entity_id: Union[str, uuid.UUID]):
+        """DELETE one entity and evict it from the cache."""
         try:
-            data = self._prepare_data(class_obj)
-            
-            sql = """
-            INSERT INTO classes (id, name, description, gathering_type, capacity, location,
-                               class_code, grade_level, academic_year, semester, schedule,
-                               created_at, updated_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13)
-            RETURNING *
-            """
-            
             async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    sql,
-                    data['id'], data['name'], data.get('description'), data['gathering_type'],
-                    data.get('capacity'), data.get('location'), data.get('class_code'),
-                    data.get('grade_level'), data['academic_year'], data.get('semester'),
-                    json.dumps(data.get('schedule')) if data.get('schedule') else None,
-                    data['created_at'], data['updated_at']
-                )
-                
-                return ClassResponse(
+                row = await conn.fetchrow(spec.delete_sql, entity_id)
+            self._evict(spec.table, entity_id)
+            
+            if row:
+                return spec.response(
                     success=True,
-                    message="Class created successfully",
-                    data=Class(**dict(row))
+                    message=f"{spec.label} deleted successfully"
+                )
+            else:
+                return spec.response(
+                    success=False,
+                    message=f"{spec.label} not found"
                 )
         except Exception as e:
-            return ClassResponse(
+            return spec.response(
                 success=False,
-                message=f"Failed to create class: {str(e)}",
+                message=f"Failed to delete {spec.label.lower()}: {str(e)}",
                 errors=[str(e)]
             )
     
-    async def get_person(self, person_id: str) -> PersonResponse:
+    async def create_person(self, person: Person) -> PersonResponse:
+        """Create a new person in PostgreSQL."""
+        return await self._create_entity(_PERSONS, person)
+    
+    async def create_student(self, student: Student) -> PersonResponse:
+        """Create a new student in PostgreSQL."""
+        return await self._create_entity(_STUDENTS, student)
+    
+    async def create_teacher(self, teacher: Teacher) -> PersonResponse:
+        """Create a new teacher in PostgreSQL."""
+        return await self._create_entity(_TEACHERS, teacher)
+    
+    async def create_class(self, class_obj: Class) -> ClassResponse:
+        """Create a new class in PostgreSQL."""
+        return await self._create_entity(_CLASSES, class_obj)
+    
+    async def get_person(self, person_id: Union[str, uuid.UUID]) -> PersonResponse:
         """Get a person by ID from PostgreSQL."""
-        try:
-            sql = "SELECT * FROM persons WHERE id = $1"
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(sql, person_id)
-                
-                if row:
-                    return PersonResponse(
-                        success=True,
-                        message="Person found",
-                        data=Person(**dict(row))
-                    )
-                else:
-                    return PersonResponse(
-                        success=False,
-                        message="Person not found"
-                    )
-        except Exception as e:
-            return PersonResponse(
-                success=False,
-                message=f"Failed to get person: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._get_entity(_PERSONS, person_id)
     
-    async def get_student(self, student_id: str) -> PersonResponse:
+    async def get_student(self, student_id: Union[str, uuid.UUID]) -> PersonResponse:
         """Get a student by ID from PostgreSQL."""
-        try:
-            sql = "SELECT * FROM students WHERE id = $1"
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(sql, student_id)
-                
-                if row:
-                    return PersonResponse(
-                        success=True,
-                        message="Student found",
-                        data=Student(**dict(row))
-                    )
-                else:
-                    return PersonResponse(
-                        success=False,
-                        message="Student not found"
-                    )
-        except Exception as e:
-            return PersonResponse(
-                success=False,
-                message=f"Failed to get student: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._get_entity(_STUDENTS, student_id)
     
-    async def get_teacher(self, teacher_id: str) -> PersonResponse:
+    async def get_teacher(self, teacher_id: Union[str, uuid.UUID]) -> PersonResponse:
         """Get a teacher by ID from PostgreSQL."""
-        try:
-            sql = "SELECT * FROM teachers WHERE id = $1"
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(sql, teacher_id)
-                
-                if row:
-                    return PersonResponse(
-                        success=True,
-                        message="Teacher found",
-                        data=Teacher(**dict(row))
-                    )
-                else:
-                    return PersonResponse(
-                        success=False,
-                        message="Teacher not found"
-                    )
-        except Exception as e:
-            return PersonResponse(
-                success=False,
-                message=f"Failed to get teacher: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._get_entity(_TEACHERS, teacher_id)
     
-    async def get_class(self, class_id: str) -> ClassResponse:
+    async def get_class(self, class_id: Union[str, uuid.UUID]) -> ClassResponse:
         """Get a class by ID from PostgreSQL."""
-        try:
-            sql = "SELECT * FROM classes WHERE id = $1"
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(sql, class_id)
-                
-                if row:
-                    return ClassResponse(
-                        success=True,
-                        message="Class found",
-                        data=Class(**dict(row))
-                    )
-                else:
-                    return ClassResponse(
-                        success=False,
-                        message="Class not found"
-                    )
-        except Exception as e:
-            return ClassResponse(
-                success=False,
-                message=f"Failed to get class: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._get_entity(_CLASSES, class_id)
     
     async def update_person(self, person_id: str, person: Person) -> PersonResponse:
         """Update a person in PostgreSQL."""
-        try:
-            data = self._prepare_data(person)
-            data['id'] = person_id
-            
-            sql = """
-            UPDATE persons 
-            SET first_name = $2, last_name = $3, email = $4, phone = $5, 
-                date_of_birth = $6, address = $7, updated_at = $8
-            WHERE id = $1
-            RETURNING *
-            """
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    sql,
-                    person_id, data['first_name'], data['last_name'], data['email'],
-                    data.get('phone'), data.get('date_of_birth'), data.get('address'),
-                    data['updated_at']
-                )
-                
-                if row:
-                    return PersonResponse(
-                        success=True,
-                        message="Person updated successfully",
-                        data=Person(**dict(row))
-                    )
-                else:
-                    return PersonResponse(
-                        success=False,
-                        message="Person not found"
-                    )
-        except Exception as e:
-            return PersonResponse(
-                success=False,
-                message=f"Failed to update person: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._update_entity(_PERSONS, person_id, person)
     
     async def update_student(self, student_id: str, student: Student) -> PersonResponse:
         """Update a student in PostgreSQL."""
-        try:
-            data = self._prepare_data(student)
-            data['id'] = student_id
-            
-            sql = """
-            UPDATE students 
-            SET first_name = $2, last_name = $3, email = $4, phone = $5, 
-                date_of_birth = $6, address = $7, student_id = $8, grade_level = $9,
-                enrollment_date = $10, is_active = $11, guardian_contact = $12, updated_at = $13
-            WHERE id = $1
-            RETURNING *
-            """
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    sql,
-                    student_id, data['first_name'], data['last_name'], data['email'],
-                    data.get('phone'), data.get('date_of_birth'), data.get('address'),
-                    data.get('student_id'), data.get('grade_level'), data['enrollment_date'],
-                    data['is_active'], data.get('guardian_contact'), data['updated_at']
-                )
-                
-                if row:
-                    return PersonResponse(
-                        success=True,
-                        message="Student updated successfully",
-                        data=Student(**dict(row))
-                    )
-                else:
-                    return PersonResponse(
-                        success=False,
-                        message="Student not found"
-                    )
-        except Exception as e:
-            return PersonResponse(
-                success=False,
-                message=f"Failed to update student: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._update_entity(_STUDENTS, student_id, student)
     
     async def update_teacher(self, teacher_id: str, teacher: Teacher) -> PersonResponse:
         """Update a teacher in PostgreSQL."""
-        try:
-            data = self._prepare_data(teacher)
-            data['id'] = teacher_id
-            
-            sql = """
-            UPDATE teachers 
-            SET first_name = $2, last_name = $3, email = $4, phone = $5, 
-                date_of_birth = $6, address = $7, employee_id = $8, subjects = $9,
-                hire_date = $10, is_active = $11, department = $12, qualification = $13, updated_at = $14
-            WHERE id = $1
-            RETURNING *
-            """
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    sql,
-                    teacher_id, data['first_name'], data['last_name'], data['email'],
-                    data.get('phone'), data.get('date_of_birth'), data.get('address'),
-                    data.get('employee_id'), data.get('subjects', []), data['hire_date'],
-                    data['is_active'], data.get('department'), data.get('qualification'),
-                    data['updated_at']
-                )
-                
-                if row:
-                    return PersonResponse(
-                        success=True,
-                        message="Teacher updated successfully",
-                        data=Teacher(**dict(row))
-                    )
-                else:
-                    return PersonResponse(
-                        success=False,
-                        message="Teacher not found"
-                    )
-        except Exception as e:
-            return PersonResponse(
-                success=False,
-                message=f"Failed to update teacher: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._update_entity(_TEACHERS, teacher_id, teacher)
     
     async def update_class(self, class_id: str, class_obj: Class) -> ClassResponse:
         """Update a class in PostgreSQL."""
-        try:
-            data = self._prepare_data(class_obj)
-            data['id'] = class_id
-            
-            sql = """
-            UPDATE classes 
-            SET name = $2, description = $3, gathering_type = $4, capacity = $5,
-                location = $6, class_code = $7, grade_level = $8, academic_year = $9,
-                semester = $10, schedule = $11, updated_at = $12
-            WHERE id = $1
-            RETURNING *
-            """
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(
-                    sql,
-                    class_id, data['name'], data.get('description'), data['gathering_type'],
-                    data.get('capacity'), data.get('location'), data.get('class_code'),
-                    data.get('grade_level'), data['academic_year'], data.get('semester'),
-                    json.dumps(data.get('schedule')) if data.get('schedule') else None,
-                    data['updated_at']
-                )
-                
-                if row:
-                    return ClassResponse(
-                        success=True,
-                        message="Class updated successfully",
-                        data=Class(**dict(row))
-                    )
-                else:
-                    return ClassResponse(
-                        success=False,
-                        message="Class not found"
-                    )
-        except Exception as e:
-            return ClassResponse(
-                success=False,
-                message=f"Failed to update class: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._update_entity(_CLASSES, class_id, class_obj)
     
     async def delete_person(self, person_id: str) -> PersonResponse:
         """Delete a person from PostgreSQL."""
-        try:
-            sql = "DELETE FROM persons WHERE id = $1 RETURNING id"
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(sql, person_id)
-                
-                if row:
-                    return PersonResponse(
-                        success=True,
-                        message="Person deleted successfully"
-                    )
-                else:
-                    return PersonResponse(
-                        success=False,
-                        message="Person not found"
-                    )
-        except Exception as e:
-            return PersonResponse(
-                success=False,
-                message=f"Failed to delete person: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._delete_entity(_PERSONS, person_id)
     
     async def delete_student(self, student_id: str) -> PersonResponse:
         """Delete a student from PostgreSQL."""
-        try:
-            sql = "DELETE FROM students WHERE id = $1 RETURNING id"
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(sql, student_id)
-                
-                if row:
-                    return PersonResponse(
-                        success=True,
-                        message="Student deleted successfully"
-                    )
-                else:
-                    return PersonResponse(
-                        success=False,
-                        message="Student not found"
-                    )
-        except Exception as e:
-            return PersonResponse(
-                success=False,
-                message=f"Failed to delete student: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._delete_entity(_STUDENTS, student_id)
     
     async def delete_teacher(self, teacher_id: str) -> PersonResponse:
         """Delete a teacher from PostgreSQL."""
-        try:
-            sql = "DELETE FROM teachers WHERE id = $1 RETURNING id"
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(sql, teacher_id)
-                
-                if row:
-                    return PersonResponse(
-                        success=True,
-                        message="Teacher deleted successfully"
-                    )
-                else:
-                    return PersonResponse(
-                        success=False,
-                        message="Teacher not found"
-                    )
-        except Exception as e:
-            return PersonResponse(
-                success=False,
-                message=f"Failed to delete teacher: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._delete_entity(_TEACHERS, teacher_id)
     
     async def delete_class(self, class_id: str) -> ClassResponse:
         """Delete a class from PostgreSQL."""
-        try:
-            sql = "DELETE FROM classes WHERE id = $1 RETURNING id"
-            
-            async with self.pool.acquire() as conn:
-                row = await conn.fetchrow(sql, class_id)
-                
-                if row:
-                    return ClassResponse(
-                        success=True,
-                        message="Class deleted successfully"
-                    )
-                else:
-                    return ClassResponse(
-                        success=False,
-                        message="Class not found"
-                    )
-        except Exception as e:
-            return ClassResponse(
-                success=False,
-                message=f"Failed to delete class: {str(e)}",
-                errors=[str(e)]
-            )
+        return await self._delete_entity(_CLASSES, class_id)
     
     async def add_students_to_class(self, class_id: str, student_ids: List[str]) -> BulkOperationResponse:
-        """Add students to a class in PostgreSQL."""
+        """Add students to a class in PostgreSQL; a repeated id is enrolled and counted once."""
         try:
-            successful = 0
-            failed = 0
-            errors = []
-            
+            # Canonical UUID strings, so differently formatted repeats count once
+            student_ids = list(dict.fromkeys(str(uuid.UUID(str(student_id))) for student_id in student_ids))
+            now = utcnow()
             async with self.pool.acquire() as conn:
-                for student_id in student_ids:
-                    try:
-                        enrollment_id = self._generate_id()
-                        sql = """
-                        INSERT INTO class_enrollments (id, student_id, class_id, enrollment_date, is_active)
-                        VALUES ($1, $2, $3, $4, $5)
-                        """
-                        await conn.execute(sql, enrollment_id, student_id, class_id, datetime.utcnow(), True)
-                        successful += 1
-                    except Exception as e:
-                        failed += 1
-                        errors.append(f"Failed to enroll student {student_id}: {str(e)}")
+                if len(student_ids) >= ENROLLMENT_COPY_THRESHOLD:
+                    async with conn.transaction():
+                        await conn.execute(_SQL_CREATE_ENROLLMENT_STAGE)
+                        await conn.copy_records_to_table(
+                            'enrollment_stage',
+                            records=[(student_id,) for student_id in student_ids],
+                            columns=['student_id']
+                        )
+                        rows = await conn.fetch(_SQL_ENROLL_STAGED, class_id, now)
+                else:
+                    rows = await conn.fetch(_SQL_ENROLL_STUDENTS, student_ids, class_id, now)
+            
+            # RETURNING yields uuid.UUID values, so compare on those rather
+            # than on caller-formatted strings
+            enrolled = {row['student_id'] for row in rows}
+            errors = [
+                f"Failed to enroll student {student_id}: student not found or already enrolled"
+                for student_id in student_ids if uuid.UUID(student_id) not in enrolled
+            ]
             
             return BulkOperationResponse(
-                success=failed == 0,
+                success=not errors,
                 message="Students added to class",
                 total_processed=len(student_ids),
-                successful=successful,
-                failed=failed,
+                successful=len(student_ids) - len(errors),
+                failed=len(errors),
                 errors=errors if errors else None
             )
         except Exception as e:
@@ -728,17 +1091,41 @@ class PostgreSQLInterface(DatabaseInterface):
                 errors=[str(e)]
             )
     
+    async def create_class_with_roster(self, class_obj: Class, student_ids: List[str],
+                                       teacher_id: Optional[str] = None,
+                                       subject: Optional[str] = None) -> ClassResponse:
+        """Create a class, its enrollments and teacher assignment in one PostgreSQL statement."""
+        try:
+            args = self._insert_args(class_obj, _CLASS_FIELDS)
+            async with self.pool.acquire() as conn:
+                row = await conn.fetchrow(
+                    _SQL_CREATE_CLASS_WITH_ROSTER, *args, student_ids, teacher_id, subject
+                )
+            
+            enrolled = set(row['enrolled_ids'])
+            errors = [
+                f"Failed to enroll student {student_id}: student not found"
+                for student_id in student_ids if uuid.UUID(str(student_id)) not in enrolled
+            ]
+            
+            return ClassResponse(
+                success=not errors,
+                message="Class created with roster" if not errors else "Class created; roster partially applied",
+                data=self._to_model(Class, row),
+                errors=errors or None
+            )
+        except Exception as e:
+            return ClassResponse(
+                success=False,
+                message=f"Failed to create class with roster: {str(e)}",
+                errors=[str(e)]
+            )
+    
     async def add_teacher_to_class(self, class_id: str, teacher_id: str, subject: str) -> PersonResponse:
         """Add a teacher to a class for a specific subject in PostgreSQL."""
         try:
-            assignment_id = self._generate_id()
-            sql = """
-            INSERT INTO teacher_assignments (id, teacher_id, class_id, subject, assignment_date, is_active)
-            VALUES ($1, $2, $3, $4, $5, $6)
-            """
-            
             async with self.pool.acquire() as conn:
-                await conn.execute(sql, assignment_id, teacher_id, class_id, subject, datetime.utcnow(), True)
+                await conn.execute(_SQL_ASSIGN_TEACHER, teacher_id, class_id, subject, utcnow(), True)
                 
                 return PersonResponse(
                     success=True,
@@ -751,39 +1138,63 @@ class PostgreSQLInterface(DatabaseInterface):
                 errors=[str(e)]
             )
     
-    async def add_scores_to_students(self, scores: List[Score]) -> BulkOperationResponse:
-        """Add scores to students in PostgreSQL."""
+    async def add_teacher_subjects(self, class_id: str, teacher_id: str, subjects: List[str]) -> BulkOperationResponse:
+        """Assign a teacher to a class for several subjects with one INSERT in PostgreSQL."""
         try:
-            successful = 0
-            failed = 0
-            errors = []
+            async with self.pool.acquire() as conn:
+                await conn.execute(_SQL_ASSIGN_TEACHER_SUBJECTS, teacher_id, class_id, subjects, utcnow())
             
+            return BulkOperationResponse(
+                success=True,
+                message="Teacher subjects added successfully",
+                total_processed=len(subjects),
+                successful=len(subjects),
+                failed=0
+            )
+        except Exception as e:
+            return BulkOperationResponse(
+                success=False,
+                message=f"Failed to add teacher subjects: {str(e)}",
+                total_processed=len(subjects),
+                successful=0,
+                failed=len(subjects),
+                errors=[str(e)]
+            )
+    
+    async def add_scores_to_students(self, scores: List[Score], batch_size: int = 500) -> BulkOperationResponse:
+        """
+        Add scores to students in PostgreSQL.
+
+        Up to SCORE_COPY_THRESHOLD scores are inserted batch_size rows at a
+        time, each batch as one unnest() statement over per-column arrays;
+        larger lists are streamed with COPY.
+        Both run in one transaction, so the insert is all-or-nothing.
+        """
+        try:
             async with self.pool.acquire() as conn:
-                for score in scores:
-                    try:
-                        data = self._prepare_data(score)
-                        sql = """
-                        INSERT INTO scores (id, student_id, class_id, subject, score, max_score,
-                                          assessment_type, assessment_date, teacher_id, comments)
-                        VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10)
-                        """
-                        await conn.execute(
-                            sql, data['id'], data['student_id'], data['class_id'], data['subject'],
-                            data['score'], data['max_score'], data['assessment_type'],
-                            data['assessment_date'], data.get('teacher_id'), data.get('comments')
+                async with conn.transaction():
+                    if len(scores) > SCORE_COPY_THRESHOLD:
+                        # COPY bypasses the COALESCE default, so ids are filled in here
+                        await conn.copy_records_to_table(
+                            'scores',
+                            records=[
+                                (score.id or new_id, *_SCORE_FIELDS(score))
+                                for score, new_id in zip(scores, _uuid7_batch(len(scores)))
+                            ],
+                            columns=_SCORE_COPY_COLUMNS
                         )
-                        successful += 1
-                    except Exception as e:
-                        failed += 1
-                        errors.append(f"Failed to add score: {str(e)}")
+                    else:
+                        for start in range(0, len(scores), batch_size):
+                            batch = scores[start:start + batch_size]
+                            columns = zip(*[(score.id, *_SCORE_FIELDS(score)) for score in batch])
+                            await conn.execute(_SQL_INSERT_SCORES, *columns)
             
             return BulkOperationResponse(
-                success=failed == 0,
+                success=True,
                 message="Scores added successfully",
                 total_processed=len(scores),
-                successful=successful,
-                failed=failed,
-                errors=errors if errors else None
+                successful=len(scores),
+                failed=0
             )
         except Exception as e:
             return BulkOperationResponse(
@@ -795,36 +1206,148 @@ class PostgreSQLInterface(DatabaseInterface):
                 errors=[str(e)]
             )
     
+    async def create_students(self, students: List[Student], concurrency: int = 10) -> BulkOperationResponse:
+        """Create many students in PostgreSQL with one executemany in a transaction."""
+        try:
+            now = utcnow()
+            rows = [self._insert_args(student, _STUDENT_FIELDS, now) for student in students]
+            
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.executemany(_SQL_INSERT_STUDENTS, rows)
+            
+            return BulkOperationResponse(
+                success=True,
+                message="Students created successfully",
+                total_processed=len(students),
+                successful=len(students),
+                failed=0
+            )
+        except Exception as e:
+            return BulkOperationResponse(
+                success=False,
+                message=f"Failed to create students: {str(e)}",
+                total_processed=len(students),
+                successful=0,
+                failed=len(students),
+                errors=[str(e)]
+            )
+    
+    async def _copy_entities(self, conn, spec: _TableSpec, items: List[Dict[str, Any]], now: datetime):
+        """Validate items as spec.model and stream them into spec.table with binary COPY."""
+        records = []
+        # COPY skips the COALESCE id default, so ids are filled in here
+        for item, new_id in zip(items, _uuid7_batch(len(items))):
+            obj = spec.model(**item)
+            records.append((obj.id or new_id, *spec.fields(obj), now, now))
+        await conn.copy_records_to_table(
+            spec.table,
+            records=records,
+            columns=['id', *spec.columns, 'created_at', 'updated_at'],
+            timeout=60
+        )
+    
+    async def _apply_bulk_chunk(self, conn, operation: BulkOperation, spec: _TableSpec,
+                                chunk: List[Dict[str, Any]], start: int, now: datetime,
+                                use_copy: bool) -> tuple[int, List[str]]:
+        """
+        Apply one chunk of a bulk operation in its own transaction.
+
+        Returns the number of rows applied and the error messages. With
+        on_error="split_retry" a chunk that fails is retried in halves until
+        the failing rows are isolated, so one bad row costs a few extra
+        statements instead of rolling back the rest of its chunk.
+        """
+        try:
+            async with conn.transaction():
+                if use_copy:
+                    await self._copy_entities(conn, spec, chunk, now)
+                    done = len(chunk)
+                elif operation.operation_type == "create":
+                    args = [
+                        arg for item in chunk
+                        for arg in self._insert_args(spec.model(**item), spec.fields, now)
+                    ]
+                    await conn.execute(_multirow_insert_sql(spec, len(chunk)), *args)
+                    done = len(chunk)
+                elif operation.operation_type == "update":
+                    # executemany reports no row counts, so first lock the rows
+                    # that exist; only those are updated and counted, and the
+                    # lock keeps them from being deleted before the UPDATE
+                    rows = await conn.fetch(spec.bulk_lock_sql, [item['id'] for item in chunk])
+                    found = {row['id'] for row in rows}
+                    matched = [item for item in chunk if uuid.UUID(str(item['id'])) in found]
+                    if matched:
+                        await conn.executemany(spec.update_sql, [
+                            self._update_args(item['id'], _partial(spec.model, item), spec.columns, now)
+                            for item in matched
+                        ])
+                    done = len(matched)
+                else:
+                    rows = await conn.fetch(spec.bulk_delete_sql, [item['id'] for item in chunk])
+                    done = len(chunk) if operation.ignore_missing else len(rows)
+        except Exception as e:
+            if operation.on_error != "split_retry" or len(chunk) == 1:
+                return 0, [f"Items {start}-{start + len(chunk) - 1} rolled back: {str(e)}"]
+            mid = len(chunk) // 2
+            done_first, errors_first = await self._apply_bulk_chunk(
+                conn, operation, spec, chunk[:mid], start, now, use_copy
+            )
+            done_second, errors_second = await self._apply_bulk_chunk(
+                conn, operation, spec, chunk[mid:], start + mid, now, use_copy
+            )
+            return done_first + done_second, errors_first + errors_second
+        
+        if operation.operation_type != "create":
+            for item in chunk:
+                self._evict(spec.table, item['id'])
+        if done < len(chunk):
+            return done, [f"Items {start}-{start + len(chunk) - 1}: {len(chunk) - done} not found"]
+        return done, []
+    
     async def bulk_operation(self, operation: BulkOperation) -> BulkOperationResponse:
-        """Perform bulk operations in PostgreSQL."""
+        """
+        Perform bulk operations in PostgreSQL.
+
+        Each chunk of batch_size items is one statement per operation: a
+        multi-row INSERT, an executemany of the partial UPDATE, or a DELETE
+        over an id array, committed in its own transaction. Creates of at
+        least BULK_COPY_THRESHOLD rows are instead loaded with one binary
+        COPY, all-or-nothing; triggers and rules do not fire under COPY.
+        A failing chunk is rolled back whole unless on_error is
+        "split_retry", which isolates its failing rows.
+        """
         try:
-            table_name = f"{operation.entity_type}s"
+            spec = _BULK_SPECS.get(operation.entity_type)
+            if spec is None:
+                raise ValueError(f"Unsupported entity type: {operation.entity_type}")
+            if operation.operation_type not in ("create", "update", "delete"):
+                raise ValueError(f"Unsupported operation type: {operation.operation_type}")
+            
             successful = 0
             failed = 0
             errors = []
+            now = utcnow()
+            use_copy = (operation.operation_type == "create" and spec.table in _COPY_TABLES
+                        and len(operation.data) >= BULK_COPY_THRESHOLD)
+            # Stay under PostgreSQL's limit of 65535 bind parameters per
+            # statement; COPY has no such limit and takes every row at once
+            if use_copy:
+                chunk_size = len(operation.data)
+            else:
+                chunk_size = min(operation.batch_size, 65535 // (len(spec.columns) + 3))
             
             async with self.pool.acquire() as conn:
-                for item in operation.data:
-                    try:
-                        if operation.operation_type == "create":
-                            # This is a simplified implementation
-                            # In practice, you'd need specific SQL for each entity type
-                            if not item.get('id'):
-                                item['id'] = self._generate_id()
-                            item['created_at'] = datetime.utcnow()
-                            item['updated_at'] = datetime.utcnow()
-                            # Execute appropriate INSERT statement based on entity type
-                            successful += 1
-                        elif operation.operation_type == "update":
-                            item['updated_at'] = datetime.utcnow()
-                            # Execute appropriate UPDATE statement based on entity type
-                            successful += 1
-                        elif operation.operation_type == "delete":
-                            # Execute appropriate DELETE statement based on entity type
-                            successful += 1
-                    except Exception as e:
-                        failed += 1
-                        errors.append(str(e))
+                # Each chunk commits once; a failing chunk rolls back on its
+                # own and the next one still runs
+                for start in range(0, len(operation.data), chunk_size):
+                    chunk = operation.data[start:start + chunk_size]
+                    done, chunk_errors = await self._apply_bulk_chunk(
+                        conn, operation, spec, chunk, start, now, use_copy
+                    )
+                    successful += done
+                    failed += len(chunk) - done
+                    errors.extend(chunk_errors)
             
             return BulkOperationResponse(
                 success=failed == 0,
@@ -844,45 +1367,48 @@ class PostgreSQLInterface(DatabaseInterface):
                 errors=[str(e)]
             )
     
+    async def _fetch_dicts(self, conn, sql: str, *args) -> List[Dict[str, Any]]:
+        """
+        Run an aggregate query through a server-side cursor, converting rows
+        to dicts AGGREGATE_PREFETCH at a time so the full set of records is
+        never held alongside the converted results.
+        """
+        # dict(record) goes through the mapping protocol (keys(), then a
+        # lookup per key); items() walks the record's values once
+        async with conn.transaction():
+            return [dict(record.items()) async for record in conn.cursor(sql, *args, prefetch=AGGREGATE_PREFETCH)]
+    
     async def aggregate_query(self, query: AggregateQuery) -> AggregateResponse:
         """Perform aggregate queries in PostgreSQL."""
         try:
-            # This is a simplified implementation
-            # In practice, you'd build more complex SQL queries based on the query parameters
-            base_table = "students"  # Default table
-            
-            sql_parts = [f"SELECT * FROM {base_table}"]
-            params = []
-            
-            # Add WHERE clause if filters are provided
-            if query.filters:
-                where_conditions = []
-                param_count = 1
-                for field, value in query.filters.items():
-                    where_conditions.append(f"{field} = ${param_count}")
-                    params.append(value)
-                    param_count += 1
-                sql_parts.append(f"WHERE {' AND '.join(where_conditions)}")
+            # This is a simplified implementation that queries students;
+            # column names are checked against the table before they reach
+            # the SQL text, values are always bound as parameters
+            filter_keys = tuple(sorted(query.filters)) if query.filters else ()
+            for column in (*filter_keys, query.sort_by):
+                if column is not None and column not in _AGGREGATE_COLUMNS:
+                    raise ValueError(f"Unknown column: {column}")
             
-            # Add ORDER BY clause if sort_by is provided
-            if query.sort_by:
-                order_direction = "ASC" if query.sort_order == "asc" else "DESC"
-                sql_parts.append(f"ORDER BY {query.sort_by} {order_direction}")
-            
-            # Add LIMIT clause if limit is provided
+            sql = _aggregate_sql(filter_keys, query.sort_by, query.sort_order == "desc",
+                                 bool(query.limit), bool(query.after))
+            params = [query.filters[key] for key in filter_keys]
+            if query.after:
+                if query.sort_by:
+                    # asyncpg binds timestamptz only from datetime, not its ISO text
+                    last_value, last_id = query.after
+                    params.extend((cursor_sort_value(query.sort_by, last_value), last_id))
+                else:
+                    params.append(query.after[-1])
             if query.limit:
-                sql_parts.append(f"LIMIT {query.limit}")
-            
-            sql = " ".join(sql_parts)
+                params.append(query.limit)
             
             async with self.pool.acquire() as conn:
-                rows = await conn.fetch(sql, *params)
-                results = [dict(row) for row in rows]
+                results = await self._fetch_dicts(conn, sql, *params)
                 
                 return AggregateResponse(
                     success=True,
                     message="Aggregate query executed successfully",
-                    data={"results": results},
+                    data={"results": results, "next_after": next_page_cursor(results, query)},
                     count=len(results)
                 )
         except Exception as e:
@@ -892,37 +1418,17 @@ class PostgreSQLInterface(DatabaseInterface):
                 errors=[str(e)]
             )
     
-    async def get_students_per_class(self, class_id: Optional[str] = None) -> AggregateResponse:
+    async def get_students_per_class(self, class_id: Optional[str] = None, *,
+                                     count_only: bool = False) -> AggregateResponse:
         """Get students per class from PostgreSQL."""
         try:
-            sql = """
-            SELECT 
-                c.id as class_id,
-                c.name as class_name,
-                COUNT(ce.student_id) as student_count,
-                ARRAY_AGG(
-                    JSON_BUILD_OBJECT(
-                        'id', s.id,
-                        'first_name', s.first_name,
-                        'last_name', s.last_name,
-                        'email', s.email
-                    )
-                ) as students
-            FROM classes c
-            LEFT JOIN class_enrollments ce ON c.id = ce.class_id AND ce.is_active = true
-            LEFT JOIN students s ON ce.student_id = s.id
-            """
-            
-            params = []
-            if class_id:
-                sql += " WHERE c.id = $1"
-                params.append(class_id)
-            
-            sql += " GROUP BY c.id, c.name ORDER BY c.name"
+            sql_all, sql_one = _SQL_STUDENT_COUNT_PER_CLASS if count_only else _SQL_STUDENTS_PER_CLASS
             
             async with self.pool.acquire() as conn:
-                rows = await conn.fetch(sql, *params)
-                results = [dict(row) for row in rows]
+                if class_id:
+                    results = await self._fetch_dicts(conn, sql_one, class_id)
+                else:
+                    results = await self._fetch_dicts(conn, sql_all)
                 
                 return AggregateResponse(
                     success=True,
@@ -940,26 +1446,13 @@ class PostgreSQLInterface(DatabaseInterface):
     async def get_avg_score_per_class(self, class_id: Optional[str] = None) -> AggregateResponse:
         """Get average score per class from PostgreSQL."""
         try:
-            sql = """
-            SELECT 
-                c.id as class_id,
-                c.name as class_name,
-                AVG(sc.score) as average_score,
-                COUNT(sc.id) as total_scores
-            FROM classes c
-            LEFT JOIN scores sc ON c.id = sc.class_id
-            """
-            
-            params = []
-            if class_id:
-                sql += " WHERE c.id = $1"
-                params.append(class_id)
-            
-            sql += " GROUP BY c.id, c.name ORDER BY c.name"
+            sql_all, sql_one = _SQL_AVG_SCORE_PER_CLASS
             
             async with self.pool.acquire() as conn:
-                rows = await conn.fetch(sql, *params)
-                results = [dict(row) for row in rows]
+                if class_id:
+                    results = await self._fetch_dicts(conn, sql_one, class_id)
+                else:
+                    results = await self._fetch_dicts(conn, sql_all)
                 
                 return AggregateResponse(
                     success=True,
@@ -977,37 +1470,13 @@ class PostgreSQLInterface(DatabaseInterface):
     async def get_teachers_per_class(self, class_id: Optional[str] = None) -> AggregateResponse:
         """Get teachers per class from PostgreSQL."""
         try:
-            sql = """
-            SELECT 
-                c.id as class_id,
-                c.name as class_name,
-                COUNT(DISTINCT ta.teacher_id) as teacher_count,
-                ARRAY_AGG(
-                    DISTINCT JSON_BUILD_OBJECT(
-                        'teacher', JSON_BUILD_OBJECT(
-                            'id', t.id,
-                            'first_name', t.first_name,
-                            'last_name', t.last_name,
-                            'email', t.email
-                        ),
-                        'subject', ta.subject
-                    )
-                ) as teachers
-            FROM classes c
-            LEFT JOIN teacher_assignments ta ON c.id = ta.class_id AND ta.is_active = true
-            LEFT JOIN teachers t ON ta.teacher_id = t.id
-            """
-            
-            params = []
-            if class_id:
-                sql += " WHERE c.id = $1"
-                params.append(class_id)
-            
-            sql += " GROUP BY c.id, c.name ORDER BY c.name"
+            sql_all, sql_one = _SQL_TEACHERS_PER_CLASS
             
             async with self.pool.acquire() as conn:
-                rows = await conn.fetch(sql, *params)
-                results = [dict(row) for row in rows]
+                if class_id:
+                    results = await self._fetch_dicts(conn, sql_one, class_id)
+                else:
+                    results = await self._fetch_dicts(conn, sql_all)
                 
                 return AggregateResponse(
                     success=True,
@@ -1025,26 +1494,13 @@ class PostgreSQLInterface(DatabaseInterface):
     async def get_subjects_per_class(self, class_id: Optional[str] = None) -> AggregateResponse:
         """Get subjects per class from PostgreSQL."""
         try:
-            sql = """
-            SELECT 
-                c.id as class_id,
-                c.name as class_name,
-                ARRAY_AGG(DISTINCT ta.subject) as subjects,
-                COUNT(DISTINCT ta.subject) as subject_count
-            FROM classes c
-            LEFT JOIN teacher_assignments ta ON c.id = ta.class_id AND ta.is_active = true
-            """
-            
-            params = []
-            if class_id:
-                sql += " WHERE c.id = $1"
-                params.append(class_id)
-            
-            sql += " GROUP BY c.id, c.name ORDER BY c.name"
+            sql_all, sql_one = _SQL_SUBJECTS_PER_CLASS
             
             async with self.pool.acquire() as conn:
-                rows = await conn.fetch(sql, *params)
-                results = [dict(row) for row in rows]
+                if class_id:
+                    results = await self._fetch_dicts(conn, sql_one, class_id)
+                else:
+                    results = await self._fetch_dicts(conn, sql_all)
                 
                 return AggregateResponse(
                     success=True,
@@ -1058,3 +1514,31 @@ class PostgreSQLInterface(DatabaseInterface):
                 message=f"Failed to get subjects per class: {str(e)}",
                 errors=[str(e)]
             )
+    
+    async def get_class_overview(self, class_id: Optional[str] = None) -> AggregateResponse:
+        """Get all four per-class aggregates from PostgreSQL in one query."""
+        try:
+            sql_all, sql_one = _SQL_CLASS_OVERVIEW
+            
+            async with self.pool.acquire() as conn:
+                if class_id:
+                    rows = await self._fetch_dicts(conn, sql_one, class_id)
+                else:
+                    rows = await self._fetch_dicts(conn, sql_all)
+            
+            data = {
+                key: [{column: row[column] for column in columns} for row in rows]
+                for key, columns in zip(CLASS_OVERVIEW_KEYS, _CLASS_OVERVIEW_COLUMNS)
+            }
+            return AggregateResponse(
+                success=True,
+                message="Class overview retrieved successfully",
+                data=data,
+                count=len(rows)
+            )
+        except Exception as e:
+            return AggregateResponse(
+                success=False,
+                message=f"Failed to get class overview: {str(e)}",
+                errors=[str(e)]
+            )
@@ -114,8 +114,9 @@ echo "  4. Aggregate Operations (all databases)"
 echo "  5. MCP Client Functionality"
 echo ""
 
-# Run tests in the app container
-if docker-compose exec -T app python -m pytest tests/ -v --tb=short; then
+# Run tests in the app container across pytest-xdist workers; each worker
+# has its own databases, so tests are distributed freely
+if docker-compose exec -T app python -m pytest tests/ -v --tb=short -n auto; then
     print_success "All integration tests passed!"
 else
     test_exit_code=1
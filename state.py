@@ -1,23 +1,37 @@
-from typing_extensions import TypedDict
-from typing import Annotated, List
+from dataclasses import dataclass, field, fields
+from typing import Annotated, Any, Dict, Mapping
 from langgraph.graph.message import AnyMessage, add_messages
 from langgraph.managed.is_last_step import RemainingSteps
 
-class State(TypedDict):
+@dataclass(slots=True)
+class State:
     """
     State schema for the multi-agent customer support workflow.
-    
+
     This defines the shared data structure that flows between nodes in the graph,
     representing the current snapshot of the conversation and agent state.
+
+    LangGraph accepts dataclass schemas, so nodes read fields as attributes
+    (slot lookups rather than dict probes) and return partial dicts such as
+    {"messages": [...]} for the reducers to merge.
     """
     # Customer identifier retrieved from account verification
-    customer_id: str
-    
+    customer_id: str = ""
+
     # Conversation history with automatic message aggregation
-    messages: Annotated[list[AnyMessage], add_messages]
-    
+    messages: Annotated[list[AnyMessage], add_messages] = field(default_factory=list)
+
     # User preferences and context loaded from long-term memory store
-    loaded_memory: str
-    
+    loaded_memory: str = ""
+
     # Counter to prevent infinite recursion in agent workflow
-    remaining_steps: RemainingSteps 
\ No newline at end of file
+    remaining_steps: RemainingSteps = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return a shallow mapping for code that needs the old dict shape."""
+        return {f.name: getattr(self, f.name) for f in fields(self)}
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "State":
+        """Build a State from a mapping, ignoring keys the schema doesn't define."""
+        return cls(**{f.name: data[f.name] for f in fields(cls) if f.name in data})
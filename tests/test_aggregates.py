@@ -1,9 +1,16 @@
 """
 Integration tests for aggregate operations across all database backends.
 """
+import asyncio
+import logging
 import pytest
 from typing import Dict, Any, List
 
+from data_source_interface.database_interface import CLASS_OVERVIEW_KEYS
+from data_source_interface.models import Class
+
+log = logging.getLogger(__name__)
+
 
 class TestAggregateOperations:
     """Test aggregate operations for all database backends."""
@@ -14,16 +21,13 @@ class TestAggregateOperations:
         interface, db_type = database_interface
         
         # Create multiple classes
-        class_data_1 = sample_class_data.copy()
-        class_data_1["class_code"] = "MATH-10A"
-        class_data_1["name"] = "Mathematics 10A"
+        class_data_1 = dict(sample_class_data, class_code="MATH-10A", name="Mathematics 10A")
+        class_data_2 = dict(sample_class_data, class_code="MATH-10B", name="Mathematics 10B")
         
-        class_data_2 = sample_class_data.copy()
-        class_data_2["class_code"] = "MATH-10B"
-        class_data_2["name"] = "Mathematics 10B"
-        
-        class_id_1 = await interface.create_class(class_data_1)
-        class_id_2 = await interface.create_class(class_data_2)
+        class_id_1, class_id_2 = await asyncio.gather(
+            interface.create_class(class_data_1),
+            interface.create_class(class_data_2)
+        )
         
         # Create students
         students_data = [
@@ -37,24 +41,24 @@ class TestAggregateOperations:
             for i in range(1, 8)  # 7 students
         ]
         
-        student_ids = []
-        for student_data in students_data:
-            student_id = await interface.create_student(student_data)
-            student_ids.append(student_id)
+        # gather keeps results in argument order, so ids line up with students_data
+        student_ids = list(await asyncio.gather(
+            *(interface.create_student(student_data) for student_data in students_data)
+        ))
         
         # Add students to classes (5 to class 1, 3 to class 2, 1 overlap)
-        await interface.add_students_to_class(class_id_1, student_ids[:5])
-        await interface.add_students_to_class(class_id_2, student_ids[4:7])  # student_ids[4] is in both
+        await asyncio.gather(
+            interface.add_students_to_class(class_id_1, student_ids[:5]),
+            interface.add_students_to_class(class_id_2, student_ids[4:7])  # student_ids[4] is in both
+        )
         
         # Test aggregate for specific class
-        result_1 = await interface.get_students_per_class(class_id_1)
+        result_1 = await interface.get_students_per_class(class_id_1, count_only=True)
         assert result_1["class_id"] == class_id_1
-        assert len(result_1["students"]) == 5
         assert result_1["total_students"] == 5
         
-        result_2 = await interface.get_students_per_class(class_id_2)
+        result_2 = await interface.get_students_per_class(class_id_2, count_only=True)
         assert result_2["class_id"] == class_id_2
-        assert len(result_2["students"]) == 3
         assert result_2["total_students"] == 3
         
         # Test aggregate for all classes
@@ -62,25 +66,12 @@ class TestAggregateOperations:
         assert len(all_classes_result["classes"]) >= 2
         
         # Find our classes in the results
-        class_1_found = False
-        class_2_found = False
-        for class_info in all_classes_result["classes"]:
-            if class_info["class_id"] == class_id_1:
-                assert class_info["student_count"] == 5
-                class_1_found = True
-            elif class_info["class_id"] == class_id_2:
-                assert class_info["student_count"] == 3
-                class_2_found = True
-        
-        assert class_1_found and class_2_found
-        
-        print(f"✓ [{db_type}] Students per class aggregate working correctly")
-        
-        # Cleanup
-        for student_id in student_ids:
-            await interface.delete_student(student_id)
-        await interface.delete_class(class_id_1)
-        await interface.delete_class(class_id_2)
+        classes_by_id = {c["class_id"]: c for c in all_classes_result["classes"]}
+        assert {class_id_1, class_id_2} <= classes_by_id.keys()
+        assert classes_by_id[class_id_1]["student_count"] == 5
+        assert classes_by_id[class_id_2]["student_count"] == 3
+        
+        log.debug("✓ [%s] Students per class aggregate working correctly", db_type)
 
     @pytest.mark.asyncio
     async def test_avg_score_per_class_aggregate(self, database_interface, sample_class_data):
@@ -101,10 +92,9 @@ class TestAggregateOperations:
             for i in range(1, 4)  # 3 students
         ]
         
-        student_ids = []
-        for student_data in students_data:
-            student_id = await interface.create_student(student_data)
-            student_ids.append(student_id)
+        student_ids = list(await asyncio.gather(
+            *(interface.create_student(student_data) for student_data in students_data)
+        ))
         
         teacher_data = {
             "first_name": "Score",
@@ -117,9 +107,10 @@ class TestAggregateOperations:
         teacher_id = await interface.create_teacher(teacher_data)
         
         # Add students to class and teacher assignments
-        await interface.add_students_to_class(class_id, student_ids)
-        await interface.add_teacher_to_class(class_id, teacher_id, "mathematics")
-        await interface.add_teacher_to_class(class_id, teacher_id, "physics")
+        await asyncio.gather(
+            interface.add_students_to_class(class_id, student_ids),
+            interface.add_teacher_subjects(class_id, teacher_id, ["mathematics", "physics"])
+        )
         
         # Add scores for different subjects
         scores_data = [
@@ -165,13 +156,7 @@ class TestAggregateOperations:
         all_classes_result = await interface.get_avg_score_per_class()
         assert len(all_classes_result["classes"]) >= 1
         
-        print(f"✓ [{db_type}] Average score per class aggregate working correctly")
-        
-        # Cleanup
-        for student_id in student_ids:
-            await interface.delete_student(student_id)
-        await interface.delete_teacher(teacher_id)
-        await interface.delete_class(class_id)
+        log.debug("✓ [%s] Average score per class aggregate working correctly", db_type)
 
     @pytest.mark.asyncio
     async def test_teachers_per_class_aggregate(self, database_interface, sample_class_data):
@@ -209,17 +194,16 @@ class TestAggregateOperations:
             }
         ]
         
-        teacher_ids = []
-        for teacher_data in teachers_data:
-            teacher_id = await interface.create_teacher(teacher_data)
-            teacher_ids.append(teacher_id)
+        teacher_ids = list(await asyncio.gather(
+            *(interface.create_teacher(teacher_data) for teacher_data in teachers_data)
+        ))
         
         # Assign teachers to class for different subjects
-        await interface.add_teacher_to_class(class_id, teacher_ids[0], "mathematics")
-        await interface.add_teacher_to_class(class_id, teacher_ids[0], "algebra")
-        await interface.add_teacher_to_class(class_id, teacher_ids[1], "physics")
-        await interface.add_teacher_to_class(class_id, teacher_ids[1], "chemistry")
-        await interface.add_teacher_to_class(class_id, teacher_ids[2], "literature")
+        await asyncio.gather(
+            interface.add_teacher_subjects(class_id, teacher_ids[0], ["mathematics", "algebra"]),
+            interface.add_teacher_subjects(class_id, teacher_ids[1], ["physics", "chemistry"]),
+            interface.add_teacher_to_class(class_id, teacher_ids[2], "literature")
+        )
         
         # Test aggregate for specific class
         result = await interface.get_teachers_per_class(class_id)
@@ -241,21 +225,12 @@ class TestAggregateOperations:
         assert len(all_classes_result["classes"]) >= 1
         
         # Find our class in the results
-        our_class = None
-        for class_info in all_classes_result["classes"]:
-            if class_info["class_id"] == class_id:
-                our_class = class_info
-                break
-        
+        classes_by_id = {c["class_id"]: c for c in all_classes_result["classes"]}
+        our_class = classes_by_id.get(class_id)
         assert our_class is not None
         assert our_class["teacher_count"] == 3
         
-        print(f"✓ [{db_type}] Teachers per class aggregate working correctly")
-        
-        # Cleanup
-        for teacher_id in teacher_ids:
-            await interface.delete_teacher(teacher_id)
-        await interface.delete_class(class_id)
+        log.debug("✓ [%s] Teachers per class aggregate working correctly", db_type)
 
     @pytest.mark.asyncio
     async def test_subjects_per_class_aggregate(self, database_interface, sample_class_data):
@@ -277,8 +252,7 @@ class TestAggregateOperations:
         
         # Assign teacher to multiple subjects
         subjects = ["mathematics", "physics", "chemistry", "biology"]
-        for subject in subjects:
-            await interface.add_teacher_to_class(class_id, teacher_id, subject)
+        await interface.add_teacher_subjects(class_id, teacher_id, subjects)
         
         # Test aggregate for specific class
         result = await interface.get_subjects_per_class(class_id)
@@ -300,20 +274,12 @@ class TestAggregateOperations:
         assert len(all_classes_result["classes"]) >= 1
         
         # Find our class in the results
-        our_class = None
-        for class_info in all_classes_result["classes"]:
-            if class_info["class_id"] == class_id:
-                our_class = class_info
-                break
-        
+        classes_by_id = {c["class_id"]: c for c in all_classes_result["classes"]}
+        our_class = classes_by_id.get(class_id)
         assert our_class is not None
         assert our_class["subject_count"] == 4
         
-        print(f"✓ [{db_type}] Subjects per class aggregate working correctly")
-        
-        # Cleanup
-        await interface.delete_teacher(teacher_id)
-        await interface.delete_class(class_id)
+        log.debug("✓ [%s] Subjects per class aggregate working correctly", db_type)
 
     @pytest.mark.asyncio
     async def test_custom_aggregate_query(self, database_interface, sample_class_data):
@@ -334,10 +300,9 @@ class TestAggregateOperations:
             for i in range(1, 6)  # 5 students
         ]
         
-        student_ids = []
-        for student_data in students_data:
-            student_id = await interface.create_student(student_data)
-            student_ids.append(student_id)
+        student_ids = list(await asyncio.gather(
+            *(interface.create_student(student_data) for student_data in students_data)
+        ))
         
         await interface.add_students_to_class(class_id, student_ids)
         
@@ -368,12 +333,7 @@ class TestAggregateOperations:
         
         assert grade_10_count + grade_11_count == 5
         
-        print(f"✓ [{db_type}] Custom aggregate query working correctly")
-        
-        # Cleanup
-        for student_id in student_ids:
-            await interface.delete_student(student_id)
-        await interface.delete_class(class_id)
+        log.debug("✓ [%s] Custom aggregate query working correctly", db_type)
 
     @pytest.mark.asyncio
     async def test_empty_aggregate_results(self, database_interface, sample_class_data):
@@ -383,27 +343,95 @@ class TestAggregateOperations:
         # Create an empty class
         class_id = await interface.create_class(sample_class_data)
         
-        # Test aggregates on empty class
-        students_result = await interface.get_students_per_class(class_id)
+        # Test aggregates on empty class; the four queries are independent
+        students_result, teachers_result, subjects_result, avg_scores_result = await asyncio.gather(
+            interface.get_students_per_class(class_id),
+            interface.get_teachers_per_class(class_id),
+            interface.get_subjects_per_class(class_id),
+            interface.get_avg_score_per_class(class_id)
+        )
+        
         assert students_result["class_id"] == class_id
         assert len(students_result["students"]) == 0
         assert students_result["total_students"] == 0
         
-        teachers_result = await interface.get_teachers_per_class(class_id)
         assert teachers_result["class_id"] == class_id
         assert len(teachers_result["teachers"]) == 0
         assert teachers_result["total_teachers"] == 0
         
-        subjects_result = await interface.get_subjects_per_class(class_id)
         assert subjects_result["class_id"] == class_id
         assert len(subjects_result["subjects"]) == 0
         assert subjects_result["total_subjects"] == 0
         
-        avg_scores_result = await interface.get_avg_score_per_class(class_id)
         assert avg_scores_result["class_id"] == class_id
         assert len(avg_scores_result["class_averages"]) == 0
         
-        print(f"✓ [{db_type}] Empty aggregate results handled correctly")
+        log.debug("✓ [%s] Empty aggregate results handled correctly", db_type)
+
+    @pytest.mark.asyncio
+    async def test_class_overview_matches_per_class_aggregates(self, database_interface, sample_class_data):
+        """Test that the overview of an empty class matches the four per-class aggregates."""
+        interface, db_type = database_interface
+        
+        created = await interface.create_class(Class(**sample_class_data))
+        class_id = created.data.id
+        
+        overview, *per_class = await asyncio.gather(
+            interface.get_class_overview(class_id),
+            interface.get_students_per_class(class_id),
+            interface.get_avg_score_per_class(class_id),
+            interface.get_teachers_per_class(class_id),
+            interface.get_subjects_per_class(class_id)
+        )
+        
+        assert overview.success is True
+        for key, response in zip(CLASS_OVERVIEW_KEYS, per_class):
+            assert overview.data[key] == response.data["results"]
+        
+        # An empty class has empty lists, not one entry of nulls
+        for row in overview.data["students_per_class"]:
+            assert row["students"] == []
+        for row in overview.data["teachers_per_class"]:
+            assert row["teachers"] == []
+        for row in overview.data["subjects_per_class"]:
+            assert row["subjects"] == []
+        
+        log.debug("✓ [%s] Class overview matches the per-class aggregates", db_type)
+
+    @pytest.mark.asyncio
+    async def test_avg_score_per_class_async(self, database_interface, sample_class_data):
+        """Test that the async average-score search returns the synchronous results once finished."""
+        interface, db_type = database_interface
+        
+        created = await interface.create_class(Class(**sample_class_data))
+        class_id = created.data.id
+        
+        result = await interface.get_avg_score_per_class_async(class_id, wait_for_completion_timeout="5s")
+        while result.success and result.data["is_running"]:
+            await asyncio.sleep(0.1)
+            result = await interface.poll_async_search(result.data["search_id"])
+        
+        expected = await interface.get_avg_score_per_class(class_id)
+        assert result.success is True
+        assert result.data["results"] == expected.data["results"]
+        
+        log.debug("✓ [%s] Async average scores match the synchronous aggregate", db_type)
+
+    @pytest.mark.asyncio
+    async def test_iter_per_class_buckets(self, database_interface, sample_class_data):
+        """Test that iterating per-class buckets yields the same classes as the aggregate."""
+        interface, db_type = database_interface
+        
+        await interface.create_class(Class(**sample_class_data))
+        
+        expected = await interface.get_students_per_class()
+        buckets = [bucket async for bucket in interface.iter_per_class_buckets("students_per_class", page_size=2)]
+        
+        assert expected.success is True
+        assert len(buckets) == len(expected.data["results"])
+        
+        with pytest.raises(ValueError):
+            async for _ in interface.iter_per_class_buckets("no_such_aggregate"):
+                pass
         
-        # Cleanup
-        await interface.delete_class(class_id)
+        log.debug("✓ [%s] Per-class buckets iterated: %d", db_type, len(buckets))
@@ -1,9 +1,49 @@
 """
 Integration tests for bulk operations across all database backends.
 """
+import asyncio
+import logging
+import time
 import pytest
 from typing import Dict, Any, List
 
+from data_source_interface.models import BulkOperation, Student
+
+log = logging.getLogger(__name__)
+
+# Row data is built once at import; tests pass copies since bulk creates
+# write the generated ids back into the rows
+_MIXED_PERSONS = tuple(
+    {
+        "first_name": f"Person{i}",
+        "last_name": "Test",
+        "email": f"person{i}@test.com"
+    }
+    for i in range(1, 4)
+)
+
+_MIXED_TEACHERS = tuple(
+    {
+        "first_name": f"Teacher{i}",
+        "last_name": "Test",
+        "email": f"teacher{i}@test.com",
+        "employee_id": f"EMP{i:03d}",
+        "subjects": ["mathematics"],
+        "department": "Math"
+    }
+    for i in range(1, 4)
+)
+
+_BATCH_TEST_STUDENTS = tuple(
+    {
+        "first_name": f"BatchTest{i}",
+        "last_name": "Student",
+        "email": f"batch{i}@test.com",
+        "student_id": f"BATCH{i:03d}"
+    }
+    for i in range(1, 8)  # 7 students
+)
+
 
 class TestBulkOperations:
     """Test bulk operations for all database backends."""
@@ -25,18 +65,13 @@ class TestBulkOperations:
         assert result["processed"] == len(bulk_students_data)
         assert len(result["created_ids"]) == len(bulk_students_data)
         
-        print(f"✓ [{db_type}] Bulk created {len(bulk_students_data)} students")
+        log.debug("✓ [%s] Bulk created %s students", db_type, len(bulk_students_data))
         
         # Verify students were created
-        for student_id in result["created_ids"]:
-            student = await interface.get_student(student_id)
-            assert student is not None
-        
-        print(f"✓ [{db_type}] All bulk created students verified")
+        fetched = await asyncio.gather(*(interface.get_student(sid) for sid in result["created_ids"]))
+        assert all(student is not None for student in fetched)
         
-        # Cleanup
-        for student_id in result["created_ids"]:
-            await interface.delete_student(student_id)
+        log.debug("✓ [%s] All bulk created students verified", db_type)
 
     @pytest.mark.asyncio
     async def test_bulk_update_students(self, database_interface, bulk_students_data):
@@ -54,13 +89,14 @@ class TestBulkOperations:
         student_ids = create_result["created_ids"]
         
         # Prepare update data
-        update_data = []
-        for i, student_id in enumerate(student_ids):
-            update_data.append({
+        update_data = [
+            {
                 "id": student_id,
                 "grade_level": 12,
                 "guardian_contact": f"updated_parent{i}@test.com"
-            })
+            }
+            for i, student_id in enumerate(student_ids)
+        ]
         
         # Bulk update students
         update_result = await interface.bulk_operation(
@@ -73,19 +109,42 @@ class TestBulkOperations:
         assert update_result["success"] is True
         assert update_result["processed"] == len(update_data)
         
-        print(f"✓ [{db_type}] Bulk updated {len(update_data)} students")
+        log.debug("✓ [%s] Bulk updated %s students", db_type, len(update_data))
+        
+        # Verify updates, reading every student back in one request
+        students = await interface.get_students_by_ids(student_ids)
+        assert len(students) == len(student_ids)
+        assert all(student.grade_level == 12 for student in students.values())
+        assert {student.guardian_contact for student in students.values()} == {
+            update["guardian_contact"] for update in update_data
+        }
+        
+        log.debug("✓ [%s] All bulk updates verified", db_type)
+
+    @pytest.mark.asyncio
+    async def test_bulk_update_missing_ids(self, database_interface, sample_student_data):
+        """Test that bulk updates count only the rows they actually matched."""
+        interface, db_type = database_interface
+        if db_type == "elasticsearch":
+            pytest.skip("indexing a document under an unknown id creates it")
+        
+        created = await interface.create_student(Student(**sample_student_data))
+        fake_id = "00000000-0000-0000-0000-000000000000"
         
-        # Verify updates
-        for student_id in student_ids:
-            student = await interface.get_student(student_id)
-            assert student["grade_level"] == 12
-            assert "updated_parent" in student["guardian_contact"]
+        result = await interface.bulk_operation(BulkOperation(
+            operation_type="update",
+            entity_type="student",
+            data=[
+                dict(sample_student_data, id=created.data.id, grade_level=12),
+                dict(sample_student_data, id=fake_id, grade_level=12)
+            ]
+        ))
         
-        print(f"✓ [{db_type}] All bulk updates verified")
+        assert result.success is False
+        assert result.successful == 1
+        assert result.failed == 1
         
-        # Cleanup
-        for student_id in student_ids:
-            await interface.delete_student(student_id)
+        log.debug("✓ [%s] Bulk update reports unmatched ids as failed", db_type)
 
     @pytest.mark.asyncio
     async def test_bulk_delete_students(self, database_interface, bulk_students_data):
@@ -113,74 +172,126 @@ class TestBulkOperations:
         assert delete_result["success"] is True
         assert delete_result["processed"] == len(student_ids)
         
-        print(f"✓ [{db_type}] Bulk deleted {len(student_ids)} students")
+        log.debug("✓ [%s] Bulk deleted %s students", db_type, len(student_ids))
+        
+        # Verify deletions: none of the ids is found, checked in one request
+        assert await interface.get_students_by_ids(student_ids) == {}
         
-        # Verify deletions
-        for student_id in student_ids:
-            student = await interface.get_student(student_id)
-            assert student is None
+        # Deleting them again succeeds when missing ids are ignored
+        repeat_result = await interface.bulk_operation(BulkOperation(
+            operation_type="delete",
+            entity_type="student",
+            data=[{"id": sid} for sid in student_ids],
+            batch_size=len(student_ids),
+            ignore_missing=True
+        ))
+        assert repeat_result.success is True
+        assert repeat_result.successful == len(student_ids)
         
-        print(f"✓ [{db_type}] All bulk deletions verified")
+        log.debug("✓ [%s] All bulk deletions verified", db_type)
 
     @pytest.mark.asyncio
-    async def test_bulk_mixed_entities(self, database_interface):
-        """Test bulk operations with mixed entity types."""
+    @pytest.mark.benchmark
+    async def test_bulk_create_students_perf(self, database_interface):
+        """Measure bulk create throughput alone, without reading the rows back."""
         interface, db_type = database_interface
-        
-        # Create test data for different entities
-        persons_data = [
+        row_count = 500
+        rows = [
             {
-                "first_name": f"Person{i}",
-                "last_name": "Test",
-                "email": f"person{i}@test.com"
+                "first_name": f"Perf{i}",
+                "last_name": "Student",
+                "email": f"perf{i}@test.com",
+                "student_id": f"PERF{i:04d}"
             }
-            for i in range(1, 4)
+            for i in range(row_count)
         ]
         
-        teachers_data = [
+        start = time.perf_counter_ns()
+        result = await interface.bulk_operation(BulkOperation(
+            operation_type="create",
+            entity_type="student",
+            data=rows,
+            batch_size=100
+        ))
+        elapsed = (time.perf_counter_ns() - start) / 1e9
+        
+        assert result.success is True
+        assert result.successful == row_count
+        log.info("[%s] Bulk created %s students in %.3fs (%.0f rows/s)",
+                 db_type, row_count, elapsed, row_count / elapsed)
+
+    @pytest.mark.asyncio
+    async def test_bulk_create_from_generator(self, database_interface):
+        """Test bulk creation from a generator, one batch in memory at a time."""
+        interface, db_type = database_interface
+        row_count = 12
+        
+        rows = (
             {
-                "first_name": f"Teacher{i}",
-                "last_name": "Test",
-                "email": f"teacher{i}@test.com",
-                "employee_id": f"EMP{i:03d}",
-                "subjects": ["mathematics"],
-                "department": "Math"
+                "first_name": f"Streamed{i}",
+                "last_name": "Student",
+                "email": f"streamed{i}@test.com",
+                "student_id": f"STREAM{i:03d}"
             }
-            for i in range(1, 4)
-        ]
+            for i in range(row_count)
+        )
+        result = await interface.bulk_operation_iter("create", "student", rows, batch_size=5)
         
-        # Bulk create persons
-        persons_result = await interface.bulk_operation(
-            operation_type="create",
-            entity_type="person",
-            data=persons_data,
-            batch_size=2
+        assert result.success is True
+        assert result.total_processed == row_count
+        assert result.successful == row_count
+        
+        log.debug("✓ [%s] Bulk created %s students from a generator", db_type, row_count)
+
+    @pytest.mark.asyncio
+    async def test_bulk_delete_iter_ignore_missing(self, database_interface):
+        """Test that bulk_operation_iter passes ignore_missing through to every batch."""
+        interface, db_type = database_interface
+        missing_ids = (f"00000000-0000-0000-0000-{i:012d}" for i in range(1, 6))
+        
+        result = await interface.bulk_operation_iter(
+            "delete", "student", ({"id": missing_id} for missing_id in missing_ids),
+            batch_size=2, ignore_missing=True
         )
         
-        # Bulk create teachers
-        teachers_result = await interface.bulk_operation(
-            operation_type="create",
-            entity_type="teacher",
-            data=teachers_data,
-            batch_size=2
+        assert result.success is True
+        assert result.successful == 5
+        
+        log.debug("✓ [%s] Streamed bulk delete ignores missing ids", db_type)
+
+    @pytest.mark.asyncio
+    async def test_bulk_mixed_entities(self, database_interface):
+        """Test bulk operations with mixed entity types."""
+        interface, db_type = database_interface
+        
+        # Persons and teachers are separate tables with no foreign key
+        # between them, so the two bulk creates run concurrently
+        persons_result, teachers_result = await asyncio.gather(
+            interface.bulk_operation(
+                operation_type="create",
+                entity_type="person",
+                data=[dict(row) for row in _MIXED_PERSONS],
+                batch_size=2
+            ),
+            interface.bulk_operation(
+                operation_type="create",
+                entity_type="teacher",
+                data=[dict(row) for row in _MIXED_TEACHERS],
+                batch_size=2
+            )
         )
         
         assert persons_result["success"] is True
         assert teachers_result["success"] is True
-        assert len(persons_result["created_ids"]) == 3
-        assert len(teachers_result["created_ids"]) == 3
+        assert len(persons_result["created_ids"]) == len(_MIXED_PERSONS)
+        assert len(teachers_result["created_ids"]) == len(_MIXED_TEACHERS)
         
-        print(f"✓ [{db_type}] Bulk created mixed entities successfully")
-        
-        # Cleanup
-        for person_id in persons_result["created_ids"]:
-            await interface.delete_person(person_id)
-        for teacher_id in teachers_result["created_ids"]:
-            await interface.delete_teacher(teacher_id)
+        log.debug("✓ [%s] Bulk created mixed entities successfully", db_type)
 
     @pytest.mark.asyncio
-    async def test_bulk_operation_error_handling(self, database_interface):
-        """Test bulk operation error handling."""
+    @pytest.mark.parametrize("on_error", ["abort", "split_retry"])
+    async def test_bulk_operation_error_handling(self, database_interface, on_error):
+        """Test what on_error does with the good rows of a failing batch."""
         interface, db_type = database_interface
         
         # Create data with duplicate emails (should cause errors)
@@ -199,59 +310,53 @@ class TestBulkOperations:
             }
         ]
         
-        # This should handle errors gracefully
-        result = await interface.bulk_operation(
+        result = await interface.bulk_operation(BulkOperation(
             operation_type="create",
             entity_type="student",
             data=duplicate_data,
-            batch_size=2
-        )
-        
-        # Should have partial success or proper error handling
-        assert "success" in result
-        assert "processed" in result
-        assert "errors" in result or result["processed"] < len(duplicate_data)
-        
-        print(f"✓ [{db_type}] Bulk operation error handling works correctly")
-        
-        # Cleanup any successfully created records
-        if "created_ids" in result:
-            for student_id in result["created_ids"]:
-                try:
-                    await interface.delete_student(student_id)
-                except:
-                    pass  # Ignore cleanup errors
+            batch_size=2,
+            on_error=on_error
+        ))
+        
+        assert result.total_processed == len(duplicate_data)
+        if on_error == "abort" and not interface.supports_bulk_abort:
+            # Backends that cannot roll a batch back refuse instead of
+            # silently keeping part of it
+            assert result.success is False
+            assert result.successful == 0
+            assert result.errors
+        elif db_type == "postgresql":
+            # The unique email constraint fails the second row
+            assert result.success is False
+            if on_error == "abort":
+                assert result.successful == 0
+                assert result.failed == 2
+            else:
+                assert result.successful == 1
+                assert result.failed == 1
+        else:
+            # MongoDB and Elasticsearch have no unique email constraint, so
+            # split_retry (their row-by-row behaviour) writes both rows
+            assert result.successful + result.failed == len(duplicate_data)
+        
+        log.debug("✓ [%s] Bulk operation error handling (%s) works correctly", db_type, on_error)
 
     @pytest.mark.asyncio
-    async def test_bulk_operation_batch_sizes(self, database_interface):
+    @pytest.mark.parametrize("batch_size", [1, 3, 7, 32])
+    async def test_bulk_operation_batch_sizes(self, database_interface, batch_size):
         """Test bulk operations with different batch sizes."""
         interface, db_type = database_interface
         
-        # Create test data
-        test_data = [
-            {
-                "first_name": f"BatchTest{i}",
-                "last_name": "Student",
-                "email": f"batch{i}@test.com",
-                "student_id": f"BATCH{i:03d}"
-            }
-            for i in range(1, 8)  # 7 students
-        ]
-        
-        # Test with batch size 3 (should create 3 batches: 3, 3, 1)
+        # Batches of 1 and 3 split the rows (7 and 3, 3, 1); 7 and 32 take them in one
         result = await interface.bulk_operation(
             operation_type="create",
             entity_type="student",
-            data=test_data,
-            batch_size=3
+            data=[dict(row) for row in _BATCH_TEST_STUDENTS],
+            batch_size=batch_size
         )
         
         assert result["success"] is True
-        assert result["processed"] == 7
-        assert len(result["created_ids"]) == 7
-        
-        print(f"✓ [{db_type}] Bulk operation with batch size 3 successful")
+        assert result["processed"] == len(_BATCH_TEST_STUDENTS)
+        assert len(result["created_ids"]) == len(_BATCH_TEST_STUDENTS)
         
-        # Cleanup
-        for student_id in result["created_ids"]:
-            await interface.delete_student(student_id)
+        log.debug("✓ [%s] Bulk operation with batch size %s successful", db_type, batch_size)
@@ -1,157 +1,95 @@
 """
 Integration tests for MCP Client functionality.
 """
+import asyncio
+import json
+import logging
 import pytest
-from typing import Dict, Any, List
+from typing import Dict, Any, List, NamedTuple
 
+log = logging.getLogger(__name__)
 
-class TestMCPClient:
-    """Test MCP Client operations."""
 
-    @pytest.mark.asyncio
-    async def test_mcp_client_person_operations(self, mcp_client, sample_person_data):
-        """Test MCP client person operations."""
-        # CREATE
-        person_id = await mcp_client.create_person(
-            first_name=sample_person_data["first_name"],
-            last_name=sample_person_data["last_name"],
-            email=sample_person_data["email"],
-            phone=sample_person_data.get("phone"),
-            address=sample_person_data.get("address")
-        )
-        assert person_id is not None
-        print(f"✓ [MCP Client] Person created with ID: {person_id}")
-        
-        # READ
-        person = await mcp_client.get_person(person_id)
-        assert person is not None
-        assert person["first_name"] == sample_person_data["first_name"]
-        assert person["email"] == sample_person_data["email"]
-        print(f"✓ [MCP Client] Person retrieved successfully")
-        
-        # UPDATE
-        updated_person = await mcp_client.update_person(
-            person_id=person_id,
-            phone="+1-555-9999",
-            address="456 Updated Street"
-        )
-        assert updated_person["phone"] == "+1-555-9999"
-        print(f"✓ [MCP Client] Person updated successfully")
-        
-        # DELETE
-        deleted = await mcp_client.delete_person(person_id)
-        assert deleted is True
-        print(f"✓ [MCP Client] Person deleted successfully")
+class CrudSpec(NamedTuple):
+    """What the MCP CRUD round trip creates, reads back and updates for one entity."""
+    entity: str
+    sample_fixture: str
+    read_fields: tuple
+    update_data: Dict[str, Any]
+    updated_fields: tuple
 
-    @pytest.mark.asyncio
-    async def test_mcp_client_student_operations(self, mcp_client, sample_student_data):
-        """Test MCP client student operations."""
-        # CREATE
-        student_id = await mcp_client.create_student(
-            first_name=sample_student_data["first_name"],
-            last_name=sample_student_data["last_name"],
-            email=sample_student_data["email"],
-            student_id=sample_student_data.get("student_id"),
-            grade_level=sample_student_data.get("grade_level"),
-            guardian_contact=sample_student_data.get("guardian_contact")
-        )
-        assert student_id is not None
-        print(f"✓ [MCP Client] Student created with ID: {student_id}")
-        
-        # READ
-        student = await mcp_client.get_student(student_id)
-        assert student is not None
-        assert student["first_name"] == sample_student_data["first_name"]
-        assert student["student_id"] == sample_student_data["student_id"]
-        print(f"✓ [MCP Client] Student retrieved successfully")
-        
-        # UPDATE
-        updated_student = await mcp_client.update_student(
-            student_id=student_id,
-            grade_level=11,
-            guardian_contact="updated_parent@test.com"
-        )
-        assert updated_student["grade_level"] == 11
-        print(f"✓ [MCP Client] Student updated successfully")
-        
-        # DELETE
-        deleted = await mcp_client.delete_student(student_id)
-        assert deleted is True
-        print(f"✓ [MCP Client] Student deleted successfully")
 
-    @pytest.mark.asyncio
-    async def test_mcp_client_teacher_operations(self, mcp_client, sample_teacher_data):
-        """Test MCP client teacher operations."""
-        # CREATE
-        teacher_id = await mcp_client.create_teacher(
-            first_name=sample_teacher_data["first_name"],
-            last_name=sample_teacher_data["last_name"],
-            email=sample_teacher_data["email"],
-            employee_id=sample_teacher_data.get("employee_id"),
-            subjects=sample_teacher_data.get("subjects", []),
-            department=sample_teacher_data.get("department"),
-            qualification=sample_teacher_data.get("qualification")
-        )
-        assert teacher_id is not None
-        print(f"✓ [MCP Client] Teacher created with ID: {teacher_id}")
-        
-        # READ
-        teacher = await mcp_client.get_teacher(teacher_id)
-        assert teacher is not None
-        assert teacher["first_name"] == sample_teacher_data["first_name"]
-        assert teacher["employee_id"] == sample_teacher_data["employee_id"]
-        print(f"✓ [MCP Client] Teacher retrieved successfully")
-        
-        # UPDATE
-        updated_teacher = await mcp_client.update_teacher(
-            teacher_id=teacher_id,
-            subjects=["mathematics", "statistics", "calculus"],
-            qualification="PhD in Applied Mathematics"
-        )
-        assert len(updated_teacher["subjects"]) == 3
-        print(f"✓ [MCP Client] Teacher updated successfully")
-        
-        # DELETE
-        deleted = await mcp_client.delete_teacher(teacher_id)
-        assert deleted is True
-        print(f"✓ [MCP Client] Teacher deleted successfully")
+_CRUD_SPECS = (
+    CrudSpec(
+        entity="person",
+        sample_fixture="sample_person_data",
+        read_fields=("first_name", "email"),
+        update_data={"phone": "+1-555-9999", "address": "456 Updated Street"},
+        updated_fields=("phone",)
+    ),
+    CrudSpec(
+        entity="student",
+        sample_fixture="sample_student_data",
+        read_fields=("first_name", "student_id"),
+        update_data={"grade_level": 11, "guardian_contact": "updated_parent@test.com"},
+        updated_fields=("grade_level",)
+    ),
+    CrudSpec(
+        entity="teacher",
+        sample_fixture="sample_teacher_data",
+        read_fields=("first_name", "employee_id"),
+        update_data={
+            "subjects": ["mathematics", "statistics", "calculus"],
+            "qualification": "PhD in Applied Mathematics"
+        },
+        updated_fields=("subjects",)
+    ),
+    CrudSpec(
+        entity="class",
+        sample_fixture="sample_class_data",
+        read_fields=("name", "class_code"),
+        update_data={"capacity": 30, "location": "Room 301"},
+        updated_fields=("capacity",)
+    ),
+)
+
+
+class TestMCPClient:
+    """Test MCP Client operations."""
 
     @pytest.mark.asyncio
-    async def test_mcp_client_class_operations(self, mcp_client, sample_class_data):
-        """Test MCP client class operations."""
+    @pytest.mark.parametrize("spec", _CRUD_SPECS, ids=lambda spec: spec.entity)
+    async def test_mcp_client_entity_operations(self, mcp_client, request, spec):
+        """Test MCP client CRUD operations for one entity type."""
+        sample_data = request.getfixturevalue(spec.sample_fixture)
+        label = spec.entity.capitalize()
+        create = getattr(mcp_client, f"create_{spec.entity}")
+        get = getattr(mcp_client, f"get_{spec.entity}")
+        update = getattr(mcp_client, f"update_{spec.entity}")
+        delete = getattr(mcp_client, f"delete_{spec.entity}")
+        
         # CREATE
-        class_id = await mcp_client.create_class(
-            name=sample_class_data["name"],
-            academic_year=sample_class_data["academic_year"],
-            grade_level=sample_class_data.get("grade_level"),
-            capacity=sample_class_data.get("capacity"),
-            location=sample_class_data.get("location"),
-            class_code=sample_class_data.get("class_code"),
-            semester=sample_class_data.get("semester")
-        )
-        assert class_id is not None
-        print(f"✓ [MCP Client] Class created with ID: {class_id}")
+        entity_id = await create(**sample_data)
+        assert entity_id is not None
+        log.debug("✓ [MCP Client] %s created with ID: %s", label, entity_id)
         
         # READ
-        class_obj = await mcp_client.get_class(class_id)
-        assert class_obj is not None
-        assert class_obj["name"] == sample_class_data["name"]
-        assert class_obj["class_code"] == sample_class_data["class_code"]
-        print(f"✓ [MCP Client] Class retrieved successfully")
+        entity = await get(entity_id)
+        assert entity is not None
+        for field in spec.read_fields:
+            assert entity[field] == sample_data[field]
+        log.debug("✓ [MCP Client] %s retrieved successfully", label)
         
         # UPDATE
-        updated_class = await mcp_client.update_class(
-            class_id=class_id,
-            capacity=30,
-            location="Room 301"
-        )
-        assert updated_class["capacity"] == 30
-        print(f"✓ [MCP Client] Class updated successfully")
+        updated_entity = await update(entity_id, **spec.update_data)
+        for field in spec.updated_fields:
+            assert updated_entity[field] == spec.update_data[field]
+        log.debug("✓ [MCP Client] %s updated successfully", label)
         
         # DELETE
-        deleted = await mcp_client.delete_class(class_id)
+        deleted = await delete(entity_id)
         assert deleted is True
-        print(f"✓ [MCP Client] Class deleted successfully")
+        log.debug("✓ [MCP Client] %s deleted successfully", label)
 
     @pytest.mark.asyncio
     async def test_mcp_client_relationship_operations(self, mcp_client, sample_class_data, sample_student_data, sample_teacher_data):
@@ -181,12 +119,12 @@ class TestMCPClient:
         # Add student to class
         result = await mcp_client.add_students_to_class(class_id, [student_id])
         assert result["success"] is True
-        print(f"✓ [MCP Client] Student added to class")
+        log.debug("✓ [MCP Client] Student added to class")
         
         # Add teacher to class
         result = await mcp_client.add_teacher_to_class(class_id, teacher_id, "mathematics")
         assert result["success"] is True
-        print(f"✓ [MCP Client] Teacher added to class")
+        log.debug("✓ [MCP Client] Teacher added to class")
         
         # Add scores
         scores_data = [
@@ -203,12 +141,14 @@ class TestMCPClient:
         
         result = await mcp_client.add_scores_to_students(scores_data)
         assert result["success"] is True
-        print(f"✓ [MCP Client] Scores added to student")
+        log.debug("✓ [MCP Client] Scores added to student")
         
-        # Cleanup
-        await mcp_client.delete_student(student_id)
-        await mcp_client.delete_teacher(teacher_id)
-        await mcp_client.delete_class(class_id)
+        # Cleanup; the three deletes are independent, so issue them together
+        await asyncio.gather(
+            mcp_client.delete_student(student_id),
+            mcp_client.delete_teacher(teacher_id),
+            mcp_client.delete_class(class_id)
+        )
 
     @pytest.mark.asyncio
     async def test_mcp_client_bulk_operations(self, mcp_client, bulk_students_data):
@@ -225,11 +165,45 @@ class TestMCPClient:
         assert result["processed"] == 5
         assert len(result["created_ids"]) == 5
         
-        print(f"✓ [MCP Client] Bulk created 5 students")
+        log.debug("✓ [MCP Client] Bulk created 5 students")
         
-        # Cleanup
-        for student_id in result["created_ids"]:
-            await mcp_client.delete_student(student_id)
+        # Cleanup, as one bulk delete rather than a round trip per student
+        await mcp_client.bulk_operation(
+            operation_type="delete",
+            entity_type="student",
+            data=[{"id": student_id} for student_id in result["created_ids"]],
+            batch_size=len(result["created_ids"])
+        )
+
+    @pytest.mark.asyncio
+    async def test_mcp_client_bulk_update_invalidates_reads(self, mcp_client, sample_student_data):
+        """Test that a get after a bulk update or delete sees the write, not a cached read."""
+        created = await mcp_client.create_student(**sample_student_data)
+        student_id = created["data"]["id"]
+        
+        # Read once so the response is cached
+        before = await mcp_client.get_student(student_id)
+        assert before["data"]["grade_level"] == sample_student_data["grade_level"]
+        
+        result = await mcp_client.bulk_operation(
+            operation_type="update",
+            entity_type="student",
+            data=[dict(sample_student_data, id=student_id, grade_level=12)]
+        )
+        assert result["success"] is True
+        
+        after = await mcp_client.get_student(student_id)
+        assert after["data"]["grade_level"] == 12
+        
+        await mcp_client.bulk_operation(
+            operation_type="delete",
+            entity_type="student",
+            data=[{"id": student_id}]
+        )
+        deleted = await mcp_client.get_student(student_id)
+        assert deleted["data"] is None
+        
+        log.debug("✓ [MCP Client] Bulk writes invalidate cached reads")
 
     @pytest.mark.asyncio
     async def test_mcp_client_aggregate_operations(self, mcp_client, sample_class_data, sample_student_data, sample_teacher_data):
@@ -277,20 +251,20 @@ class TestMCPClient:
         # Test aggregate operations
         students_result = await mcp_client.get_students_per_class(class_id)
         assert students_result["total_students"] == 1
-        print(f"✓ [MCP Client] Students per class aggregate working")
+        log.debug("✓ [MCP Client] Students per class aggregate working")
         
         teachers_result = await mcp_client.get_teachers_per_class(class_id)
         assert teachers_result["total_teachers"] == 1
-        print(f"✓ [MCP Client] Teachers per class aggregate working")
+        log.debug("✓ [MCP Client] Teachers per class aggregate working")
         
         subjects_result = await mcp_client.get_subjects_per_class(class_id)
         assert subjects_result["total_subjects"] == 1
-        print(f"✓ [MCP Client] Subjects per class aggregate working")
+        log.debug("✓ [MCP Client] Subjects per class aggregate working")
         
         avg_scores_result = await mcp_client.get_avg_score_per_class(class_id)
         assert len(avg_scores_result["class_averages"]) == 1
         assert abs(avg_scores_result["class_averages"][0]["average_score"] - 90.0) < 0.1
-        print(f"✓ [MCP Client] Average scores per class aggregate working")
+        log.debug("✓ [MCP Client] Average scores per class aggregate working")
         
         # Test custom aggregate
         custom_query = {
@@ -304,12 +278,51 @@ class TestMCPClient:
         
         custom_result = await mcp_client.aggregate_query(custom_query)
         assert custom_result["success"] is True
-        print(f"✓ [MCP Client] Custom aggregate query working")
+        log.debug("✓ [MCP Client] Custom aggregate query working")
         
-        # Cleanup
-        await mcp_client.delete_student(student_id)
-        await mcp_client.delete_teacher(teacher_id)
-        await mcp_client.delete_class(class_id)
+        # Cleanup; the three deletes are independent, so issue them together
+        await asyncio.gather(
+            mcp_client.delete_student(student_id),
+            mcp_client.delete_teacher(teacher_id),
+            mcp_client.delete_class(class_id)
+        )
+
+    @pytest.mark.asyncio
+    async def test_mcp_client_aggregate_pagination_round_trip(self, mcp_client):
+        """Test that a created_at cursor still works after it has been through JSON."""
+        created = await asyncio.gather(*(
+            mcp_client.create_student(
+                first_name=f"Cursor{i}",
+                last_name="Paging",
+                email=f"cursor{i}@test.com",
+                student_id=f"CUR{i:03d}"
+            )
+            for i in range(3)
+        ))
+        student_ids = [result["data"]["id"] for result in created]
+        
+        query = {"filters": {"last_name": "Paging"}, "sort_by": "created_at", "limit": 2}
+        # The JSON variant hands back next_after as a client would receive
+        # it over the wire: created_at as an ISO 8601 string
+        first_page = json.loads(await mcp_client.aggregate_query_json("students", **query))
+        assert first_page["success"] is True
+        after = first_page["data"]["next_after"]
+        assert isinstance(after[0], str)
+        
+        second_page = await mcp_client.aggregate_query("students", after=after, **query)
+        assert second_page["success"] is True
+        
+        id_key = "_id" if "_id" in first_page["data"]["results"][0] else "id"
+        seen = [str(row[id_key]) for row in first_page["data"]["results"]]
+        seen += [str(row[id_key]) for row in second_page["data"]["results"]]
+        assert sorted(seen) == sorted(student_ids)
+        log.debug("✓ [MCP Client] Keyset cursor survives a JSON round trip")
+        
+        await mcp_client.bulk_operation(
+            operation_type="delete",
+            entity_type="student",
+            data=[{"id": student_id} for student_id in student_ids]
+        )
 
     @pytest.mark.asyncio
     async def test_mcp_client_error_handling(self, mcp_client):
@@ -337,4 +350,4 @@ class TestMCPClient:
         deleted = await mcp_client.delete_person(fake_id)
         assert deleted is False
         
-        print(f"✓ [MCP Client] Error handling working correctly")
+        log.debug("✓ [MCP Client] Error handling working correctly")